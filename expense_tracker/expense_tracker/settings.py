@@ -17,6 +17,7 @@ from pathlib import Path
 from decouple import config
 import dj_database_url
 import os
+import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -58,12 +59,16 @@ INSTALLED_APPS = [
 # ⚙️ MIDDLEWARE
 # ===========================
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'tracker.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Replica reads are scoped per request; writers are pinned to the primary
+    'tracker.routing.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -93,19 +98,58 @@ WSGI_APPLICATION = 'expense_tracker.wsgi.application'
 # ===========================
 # 🧮 DATABASE CONFIG
 # ===========================
+def database_config(url):
+    """A DATABASES entry for ``url``; TLS is only required of PostgreSQL."""
+    database = dj_database_url.parse(url, conn_max_age=600)
+    if database['ENGINE'].endswith('postgresql') and config("DB_SSL_REQUIRE", default=True, cast=bool):
+        database.setdefault('OPTIONS', {})['sslmode'] = 'require'
+    return database
+
+
 DATABASES = {
+    'default': database_config(config("DATABASE_URL")),
+}
+
+# Optional read replica for list, summary and report GETs
+# (tracker.routing). A user who writes reads from the primary for
+# REPLICA_STICKY_SECONDS afterwards; keep it above the replication lag.
+# Locally, point it at a copy of the SQLite file.
+DATABASE_REPLICA_URL = config("DATABASE_REPLICA_URL", default="")
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = {
+        **database_config(DATABASE_REPLICA_URL),
+        # Tests read the primary's test database through this alias
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['tracker.routing.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=15, cast=int)
+
+# Covering indexes (INCLUDE) only exist on PostgreSQL; elsewhere they
+# degrade to plain composite indexes, which is fine for local development.
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+# ===========================
+# 🗃️ CACHE CONFIG
+# ===========================
+# locmem is per process: only use it with a single worker. With several
+# workers pick "db" (run `python manage.py createcachetable`) or "file".
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'expense-tracker'),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'tracker_cache'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, '.cache')),
+}
+CACHE_BACKEND, CACHE_DEFAULT_LOCATION = CACHE_BACKENDS[config("CACHE_BACKEND", default="locmem")]
+
+CACHES = {
     'default': {
-        **dj_database_url.config(
-            default=config("DATABASE_URL"),
-            conn_max_age=600,
-            ssl_require=config("DB_SSL_REQUIRE", default=True, cast=bool),
-        ),
-        "OPTIONS": {
-            "sslmode": "require",
-        },
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config("CACHE_LOCATION", default=CACHE_DEFAULT_LOCATION),
     }
 }
 
+# Seconds a cached dashboard summary may live; writes invalidate it immediately
+SUMMARY_CACHE_TIMEOUT = config("SUMMARY_CACHE_TIMEOUT", default=300, cast=int)
+
 # ===========================
 # 🔑 PASSWORD VALIDATION
 # ===========================
@@ -134,13 +178,26 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Profile pictures over this size are rejected while they upload
+PROFILE_PIC_MAX_UPLOAD_SIZE = config("PROFILE_PIC_MAX_UPLOAD_SIZE", default=5 * 1024 * 1024, cast=int)
+# Thumbnails made after each upload: {label: longest edge in pixels}
+PROFILE_THUMBNAIL_SIZES = {'small': 64, 'medium': 256, 'large': 512}
+
+# ===========================
+# 🧵 BACKGROUND TASKS
+# ===========================
+# Post-request work (thumbnails) runs on a small in-process thread pool.
+# Eager mode runs it inline when the transaction commits instead.
+BACKGROUND_TASK_WORKERS = config("BACKGROUND_TASK_WORKERS", default=2, cast=int)
+BACKGROUND_TASKS_EAGER = config("BACKGROUND_TASKS_EAGER", default=False, cast=bool)
+
 
 # ===========================
 # 🔐 REST FRAMEWORK & JWT
 # ===========================
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tracker.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -157,6 +214,69 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
 
+# Authenticated users are cached per process for this many seconds (0 disables).
+# Writes evict entries in the writing process; others catch up within the TTL.
+AUTH_USER_CACHE_TTL = config("AUTH_USER_CACHE_TTL", default=30, cast=int)
+AUTH_USER_CACHE_SIZE = config("AUTH_USER_CACHE_SIZE", default=1024, cast=int)
+
+# ===========================
+# ⚡ ASYNC SERVING MODE
+# ===========================
+# Serve summary and ledger list GETs from async views (tracker.async_views).
+# Only worth it under ASGI, e.g. gunicorn -c gunicorn_asgi.conf.py; under
+# WSGI every async view would spin up its own event loop.
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# ===========================
+# 🔄 DELTA SYNC
+# ===========================
+# Changes younger than this are held back, so transactions that commit late
+# are not skipped by a client's sync token. Best-effort: keep it above the
+# longest ledger write transaction, or such a write can be missed
+SYNC_SETTLE_SECONDS = config("SYNC_SETTLE_SECONDS", default=2, cast=int)
+
+# ===========================
+# 🗄️ LEDGER ARCHIVE
+# ===========================
+# Seconds each process may keep using a cached archive boundary; archive_ledger
+# waits this long after moving the boundary before it moves any rows
+ARCHIVE_BOUNDARY_CACHE_SECONDS = config("ARCHIVE_BOUNDARY_CACHE_SECONDS", default=60, cast=int)
+
+# ===========================
+# 📈 REQUEST METRICS & LOGGING
+# ===========================
+# Per-request query/timing instrumentation (Server-Timing header, log line,
+# admin metrics endpoint). Cheap enough to leave on in production.
+REQUEST_METRICS = config("REQUEST_METRICS", default=True, cast=bool)
+# Identical SQL run this many times in one request is logged as a likely N+1
+N_PLUS_ONE_THRESHOLD = config("N_PLUS_ONE_THRESHOLD", default=5, cast=int)
+
+# `manage.py test` would otherwise print a JSON line per test request and
+# every upload's info lines; warnings (N+1 hits) still show, and tests can
+# assertLogs() the rest
+TESTING = sys.argv[1:2] == ['test']
+LOG_LEVEL = config("LOG_LEVEL", default="WARNING" if TESTING else "INFO")
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'tracker': {
+            'handlers': ['console'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'tracker.requests': {
+            'handlers': ['console'],
+            'level': config("REQUEST_LOG_LEVEL", default=LOG_LEVEL),
+            'propagate': False,
+        },
+    },
+}
+
 # ===========================
 # 🌐 CORS SETTINGS
 # ===========================
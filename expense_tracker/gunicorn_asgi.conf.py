@@ -0,0 +1,14 @@
+# ASGI serving mode: gunicorn managing uvicorn workers, with the async read
+# views switched on.
+#
+#   gunicorn -c gunicorn_asgi.conf.py expense_tracker.asgi:application
+#
+# Each worker runs one event loop, so a slow summary or list request waits on
+# the database without blocking the worker's other requests.
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = 60
+raw_env = ['ASYNC_VIEWS=True']
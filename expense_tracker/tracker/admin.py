@@ -4,4 +4,6 @@ from .models import *
 # Register your models here.
 admin.site.register(Expense)
 admin.site.register(Category)
-admin.site.register(Income)
\ No newline at end of file
+admin.site.register(Income)
+admin.site.register(Budget)
+admin.site.register(RecurringRule)
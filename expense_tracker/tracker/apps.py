@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        # Register the ledger signal handlers
+        from . import signals  # noqa: F401
+        # Full-text search structures depend on the database backend
+        from .search import install_search_indexes
+        post_migrate.connect(install_search_indexes, sender=self)
+        # Hot + archive union views over the ledger tables
+        from .archive import install_history_views
+        post_migrate.connect(install_history_views, sender=self)
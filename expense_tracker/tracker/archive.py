@@ -0,0 +1,232 @@
+import time
+from datetime import date
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Max, Min
+from django.http import Http404
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+
+from .models import ArchiveBoundary, ArchivedExpense, ArchivedIncome, Expense, ExpenseHistory, Income, IncomeHistory
+from .summary import local_midnight
+
+
+# Hot ledger model: (archive model, history view model)
+ARCHIVES = {
+    Expense: (ArchivedExpense, ExpenseHistory),
+    Income: (ArchivedIncome, IncomeHistory),
+}
+
+BOUNDARY_CACHE_KEY = 'ledger-archive-boundary'
+
+
+def boundary_cache_seconds():
+    return getattr(settings, 'ARCHIVE_BOUNDARY_CACHE_SECONDS', 60)
+
+
+# ============================
+# READ ROUTING
+# ============================
+def boundary_year():
+    """The year whose 1 January splits archived from hot rows, or None if nothing was ever archived."""
+    year = cache.get(BOUNDARY_CACHE_KEY)
+    if year is None:
+        year = ArchiveBoundary.objects.values_list('before_year', flat=True).first() or 0
+        cache.set(BOUNDARY_CACHE_KEY, year, boundary_cache_seconds())
+    return year or None
+
+
+def range_start(params):
+    """
+    The first local day the list filters in ``params`` ask for, or None when
+    the range is unbounded. Invalid dates count as unbounded; the filter set
+    rejects them later anyway.
+    """
+    field = forms.DateField(required=False)
+    days = []
+    for name in ('date_min', 'date__gte'):
+        try:
+            day = field.clean(params.get(name))
+        except forms.ValidationError:
+            continue
+        if day:
+            days.append(day)
+    return max(days) if days else None
+
+
+def source(model, params=None):
+    """
+    The model to read ``model``'s rows through: the hot table itself, or
+    its history view (hot ``UNION ALL`` archive) when the date range in
+    ``params`` starts before the archive boundary.
+    """
+    year = boundary_year()
+    if year is None:
+        return model
+    start = range_start(params) if params is not None else None
+    if start is not None and start >= date(year, 1, 1):
+        return model
+    return ARCHIVES[model][1]
+
+
+# ============================
+# READ-ONLY ARCHIVED ROWS
+# ============================
+# Archived rows are listed, exported and synced like any other, and can be
+# read by id, but never written: the rollup, tombstone and version handlers
+# only follow the hot tables.
+
+ARCHIVED_READ_ONLY = "This entry is archived and read-only."
+
+
+class ArchivedRowConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = ARCHIVED_READ_ONLY
+    default_code = 'archived'
+
+
+def archived_ids(model, user, ids):
+    """The ids among ``ids`` that are ``user``'s archived ``model`` rows."""
+    ids = [pk for pk in ids if isinstance(pk, int)]
+    if not ids or boundary_year() is None:
+        return set()
+    return set(ARCHIVES[model][0].objects.filter(user=user, pk__in=ids).values_list('pk', flat=True))
+
+
+class ArchivedReadOnlyMixin:
+    """
+    Detail view mixin for a ledger table: reads also find archived rows,
+    and writes to one get a 409 instead of a 404.
+    """
+
+    def readable(self, model):
+        """``model``'s history view for reads, its hot table for writes."""
+        return source(model) if self.request.method in SAFE_METHODS else model
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            model = self.get_queryset().model
+            if model in ARCHIVES and archived_ids(model, self.request.user, [self.kwargs[self.lookup_field]]):
+                raise ArchivedRowConflict()
+            raise
+
+
+# ============================
+# VIEW INSTALLATION
+# ============================
+def install_history_views(sender=None, using=DEFAULT_DB_ALIAS, **kwargs):
+    """``post_migrate`` handler: (re)create the history view of each ledger table."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        for model, (archive, history) in ARCHIVES.items():
+            if model._meta.db_table not in tables or archive._meta.db_table not in tables:
+                continue
+            columns = ', '.join(quote(field.column) for field in history._meta.concrete_fields)
+            view = quote(history._meta.db_table)
+            # Dropped and recreated so the column list follows the models
+            cursor.execute(f"DROP VIEW IF EXISTS {view}")
+            cursor.execute(
+                f"CREATE VIEW {view} AS "
+                f"SELECT {columns} FROM {quote(model._meta.db_table)} "
+                f"UNION ALL SELECT {columns} FROM {quote(archive._meta.db_table)}"
+            )
+
+
+# ============================
+# ARCHIVING
+# ============================
+class LedgerArchiver:
+    """
+    Move expenses and incomes dated before 1 January of ``before_year``
+    (local time) into the archive tables.
+
+    Rows move in windows of ``batch_size`` ids, one transaction each, so
+    locks stay short and memory flat; only ids and counts reach Python. On
+    PostgreSQL a window is a single ``DELETE ... RETURNING`` feeding the
+    ``INSERT``, so a concurrent update can never be copied stale.
+
+    The new boundary is saved first and the run then waits
+    ``settle_seconds`` for every process's cached boundary to expire, so no
+    read skips the archive for a range that already has rows in it.
+    Rollups, tombstones and version stamps are left alone: archiving changes
+    where rows are stored, not what the ledger contains.
+    """
+
+    def __init__(self, before_year, batch_size=5000, settle_seconds=None, using=DEFAULT_DB_ALIAS):
+        self.before_year = before_year
+        self.batch_size = batch_size
+        self.settle_seconds = boundary_cache_seconds() if settle_seconds is None else settle_seconds
+        self.using = using
+        self.cutoff = local_midnight(date(before_year, 1, 1))
+
+    def run(self):
+        started = time.monotonic()
+        if self.publish_boundary() and self.settle_seconds:
+            time.sleep(self.settle_seconds)
+
+        report = {'before': self.cutoff.date(), 'batches': 0}
+        for model, (archive, _) in ARCHIVES.items():
+            moved, batches = self.archive(model, archive)
+            report[model._meta.verbose_name_plural] = moved  # 'expenses', 'incomes'
+            report['batches'] += batches
+        report['elapsed_seconds'] = round(time.monotonic() - started, 3)
+        return report
+
+    def publish_boundary(self):
+        """Save the boundary; returns True when it moved forward."""
+        with transaction.atomic(using=self.using):
+            boundary = ArchiveBoundary.objects.using(self.using).select_for_update().first()
+            if boundary is not None and boundary.before_year >= self.before_year:
+                return False
+            if boundary is None:
+                boundary = ArchiveBoundary(before_year=self.before_year)
+            boundary.before_year = self.before_year
+            boundary.save(using=self.using)
+        cache.delete(BOUNDARY_CACHE_KEY)
+        return True
+
+    def archive(self, model, archive):
+        """Move one table's old rows; returns ``(rows moved, batches)``."""
+        old = model.objects.using(self.using).filter(date__lt=self.cutoff)
+        bounds = old.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            return 0, 0
+
+        moved = batches = 0
+        for low in range(bounds['low'], bounds['high'] + 1, self.batch_size):
+            with transaction.atomic(using=self.using):
+                moved += self.move_window(model, archive, low, low + self.batch_size)
+            batches += 1
+        return moved, batches
+
+    def move_window(self, model, archive, low, high):
+        connection = connections[self.using]
+        quote = connection.ops.quote_name
+        attnames = [field.attname for field in model._meta.concrete_fields]
+        columns = ', '.join(quote(model._meta.get_field(name).column) for name in attnames)
+        hot_table, archive_table = quote(model._meta.db_table), quote(archive._meta.db_table)
+        window = model.objects.using(self.using).filter(id__gte=low, id__lt=high, date__lt=self.cutoff)
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {hot_table} WHERE id >= %s AND id < %s AND date < %s "
+                    f"RETURNING {columns}) INSERT INTO {archive_table} ({columns}) SELECT {columns} FROM moved",
+                    [low, high, self.cutoff],
+                )
+                return cursor.rowcount
+            # Writers are serialized elsewhere (SQLite), so copy then delete
+            sql, params = window.order_by().values(*attnames).query.sql_with_params()
+            cursor.execute(f"INSERT INTO {archive_table} ({columns}) {sql}", params)
+            moved = cursor.rowcount
+        # A raw delete: no signals, so the rollups and sync tombstones stay as they are
+        window._raw_delete(self.using)
+        return moved
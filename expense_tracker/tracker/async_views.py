@@ -0,0 +1,259 @@
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django_filters import utils as filter_utils
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import archive, routing, summary_cache, versioning
+from .filters import ExpenseFilter, IncomeFilter
+from .models import Expense, Income
+from .pagination import LedgerPagination
+from .serializers import ExpenseSerializer, IncomeSerializer
+from .summary import asummarize_categories, asummarize_totals, parse_periods
+
+
+# ==========================================================
+# ⚡ ASYNC BASE VIEW
+# ==========================================================
+
+class AsyncReadView(View):
+    """
+    Async GET/HEAD handler for an endpoint otherwise served by a DRF view.
+
+    Reads run on Django's async ORM, so under ASGI a slow aggregate waits on
+    the database without holding a worker. Every other method is handed to
+    ``sync_view`` (the DRF view for the same URL) in a worker thread, so
+    writes keep their validation and signals. Authentication, the
+    ``IsAuthenticated`` check, conditional GETs and error bodies match the
+    DRF view; responses are JSON only.
+    """
+    sync_view = None
+    sync_name = None  # The DRF view's class name, so ETags are interchangeable
+    conditional_daily = False
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token-authenticated like the DRF views, which are CSRF-exempt too
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+        self.validators = None
+        try:
+            drf_request = await self.initial(request)
+            response = await self.get(drf_request, *args, **kwargs)
+        except versioning.NotModified as exc:
+            response = exc.response
+        except exceptions.APIException as exc:
+            response = self.handle_exception(exc)
+        if self.validators and response.status_code in (200, 304):
+            versioning.add_validator_headers(response, self.validators)
+        return response
+
+    async def initial(self, request):
+        self.authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        drf_request = Request(request, authenticators=self.authenticators)
+        # Cache hits make no query, misses do: resolve the user off the loop,
+        # then pick the database for the reads to come (ReplicaReadMixin)
+        user = await sync_to_async(self.authenticate)(drf_request)
+        if not (user and user.is_authenticated):
+            raise exceptions.NotAuthenticated()
+        return drf_request
+
+    def authenticate(self, drf_request):
+        user = drf_request.user
+        routing.read_from_replica(user)
+        return user
+
+    async def conditional(self, request, *lookups):
+        """
+        Answer ``If-None-Match``/``If-Modified-Since`` before any heavy query.
+
+        ``lookups`` are other independent awaitables the handler needs; they
+        are gathered with the version stamp lookup and their results returned.
+        """
+        stamp, *results = await asyncio.gather(versioning.acurrent(request.user), *lookups)
+        self.validators = versioning.conditional_validators(
+            request, self.sync_name, stamp,
+            daily=self.conditional_daily, media_type=JSONRenderer.media_type,
+        )
+        etag, last_modified = self.validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            raise versioning.NotModified(response)
+        return results
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(JSONRenderer().render(data), status=status_code, content_type=JSONRenderer.media_type)
+
+    def handle_exception(self, exc):
+        # Same status codes and bodies as APIView.handle_exception()
+        header = None
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            header = self.authenticators[0].authenticate_header(self.request)
+            exc.status_code = status.HTTP_401_UNAUTHORIZED if header else status.HTTP_403_FORBIDDEN
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = self.render(data, exc.status_code)
+        if header:
+            response['WWW-Authenticate'] = header
+        return response
+
+
+# ==========================================================
+# 📊 ASYNC SUMMARY VIEWS
+# ==========================================================
+
+class AsyncSummaryView(AsyncReadView):
+    """Async ``SummaryView``."""
+    sync_name = 'SummaryView'
+    conditional_daily = True
+
+    async def get(self, request):
+        generation_pair, = await self.conditional(request, summary_cache.agenerations(request.user.pk))
+        return self.render(await summary_cache.acached_summary(
+            'totals', request.user, asummarize_totals, generation_pair))
+
+
+class AsyncCategorySummaryView(AsyncReadView):
+    """Async ``CategorySummaryView``."""
+    sync_name = 'CategorySummaryView'
+    conditional_daily = True
+
+    async def get(self, request):
+        generation_pair, = await self.conditional(request, summary_cache.agenerations(request.user.pk))
+        try:
+            periods = parse_periods(request.query_params.get('periods'))
+        except ValueError as e:
+            return self.render({'periods': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+        name = summary_cache.category_summary_name(periods)
+        return self.render(await summary_cache.acached_summary(
+            name, request.user, lambda user: asummarize_categories(user, periods), generation_pair))
+
+
+# ==========================================================
+# 📜 ASYNC LIST VIEWS
+# ==========================================================
+
+class AsyncLedgerListView(AsyncReadView):
+    """
+    Async list of one ledger table, with the DRF view's filters and pages.
+
+    Page-number pages fetch the page and the total count concurrently;
+    keyset pages are a single query and reuse ``KeysetPagination``.
+    """
+    model = None
+    serializer_class = None
+    filterset_class = None
+
+    async def get(self, request):
+        await self.conditional(request)
+        # Picking the table may read the archive boundary, and validating a
+        # category filter looks the category up
+        queryset = await sync_to_async(self.get_queryset)(request)
+
+        paginator = LedgerPagination()
+        if paginator.use_keyset(request):
+            rows = await sync_to_async(paginator.paginate_queryset)(queryset, request)
+            return self.render(paginator.get_paginated_response(self.serialize(request, rows)).data)
+        return self.render(await self.paginate_page_numbers(paginator, queryset, request))
+
+    def get_queryset(self, request):
+        model = archive.source(self.model, request.query_params)
+        queryset = model.objects.filter(user=request.user).select_related('category')
+        return self.filter_queryset(request, queryset)
+
+    def filter_queryset(self, request, queryset):
+        filterset = self.filterset_class(request.query_params, queryset=queryset, request=request)
+        if not filterset.is_valid():
+            raise filter_utils.translate_validation(filterset.errors)
+        return filterset.qs
+
+    def serialize(self, request, rows):
+        return self.serializer_class(rows, many=True, context={'request': request, 'view': self}).data
+
+    async def paginate_page_numbers(self, paginator, queryset, request):
+        """``PageNumberPagination`` on the async ORM, with the same output."""
+        size = paginator.get_page_size(request)
+        raw = request.query_params.get(paginator.page_query_param) or 1
+
+        async def fetch(number):
+            offset = (number - 1) * size
+            return [row async for row in queryset[offset:offset + size]]
+
+        if raw in paginator.last_page_strings:
+            count = await queryset.acount()
+            number = max(1, math.ceil(count / size))
+            rows = await fetch(number)
+        else:
+            try:
+                number = int(raw)
+            except (TypeError, ValueError):
+                number = 0
+            if number < 1:
+                raise exceptions.NotFound(paginator.invalid_page_message.format(page_number=raw, message=''))
+            # The page does not depend on the count: run both at once
+            count, rows = await asyncio.gather(queryset.acount(), fetch(number))
+            if number > 1 and (number - 1) * size >= count:
+                raise exceptions.NotFound(paginator.invalid_page_message.format(page_number=raw, message=''))
+
+        url = request.build_absolute_uri()
+        next_link = previous_link = None
+        if number * size < count:
+            next_link = replace_query_param(url, paginator.page_query_param, number + 1)
+        if number > 1:
+            previous_link = (remove_query_param(url, paginator.page_query_param) if number == 2
+                             else replace_query_param(url, paginator.page_query_param, number - 1))
+        return {
+            'count': count,
+            'next': next_link,
+            'previous': previous_link,
+            'results': self.serialize(request, rows),
+        }
+
+
+class AsyncExpenseListView(AsyncLedgerListView):
+    """Async GET for ``ExpenseListCreateView``."""
+    sync_name = 'ExpenseListCreateView'
+    model = Expense
+    serializer_class = ExpenseSerializer
+    filterset_class = ExpenseFilter
+
+
+class AsyncIncomeListView(AsyncLedgerListView):
+    """Async GET for ``IncomeListCreateView``."""
+    sync_name = 'IncomeListCreateView'
+    model = Income
+    serializer_class = IncomeSerializer
+    filterset_class = IncomeFilter
+
+
+ASYNC_COUNTERPARTS = {
+    view.sync_name: view
+    for view in (AsyncSummaryView, AsyncCategorySummaryView, AsyncExpenseListView, AsyncIncomeListView)
+}
+
+
+def read_view(view_class):
+    """
+    Return ``view_class.as_view()``, or its async counterpart wrapping it
+    when ``ASYNC_VIEWS`` is on (the ASGI serving mode).
+    """
+    sync_view = view_class.as_view()
+    async_view = ASYNC_COUNTERPARTS.get(view_class.__name__)
+    if async_view is None or not getattr(settings, 'ASYNC_VIEWS', False):
+        return sync_view
+    return async_view.as_view(sync_view=sync_view)
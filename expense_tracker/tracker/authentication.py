@@ -0,0 +1,120 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+# ============================
+# USER CACHE
+# ============================
+class UserCache:
+    """
+    Small thread-safe LRU of ``User`` rows (with their profile) by primary key.
+
+    Entries expire after ``ttl`` seconds, which bounds how stale another
+    worker process can be; in this process saves and deletes evict them at
+    once (see ``tracker.signals``). Callers get deep copies, so changing a
+    returned user never leaks into the cache.
+    """
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every eviction, so a load that raced one is not stored
+        self._evictions = 0
+
+    def get(self, pk, load):
+        """Return a copy of the cached user ``pk``, calling ``load(pk)`` on a miss."""
+        if self.ttl <= 0:
+            return load(pk)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(pk)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(pk)
+                return copy.deepcopy(entry[1])
+            evictions = self._evictions
+
+        user = load(pk)
+        with self._lock:
+            if evictions == self._evictions:
+                self._entries[pk] = (now + self.ttl, user)
+                self._entries.move_to_end(pk)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return copy.deepcopy(user)
+
+    def evict(self, pk):
+        """
+        Forget user ``pk`` now, and again when the current transaction commits
+        so a read made before the commit cannot repopulate stale data.
+        """
+        def drop():
+            with self._lock:
+                self._entries.pop(pk, None)
+                self._evictions += 1
+
+        drop()
+        if transaction.get_connection().in_atomic_block:
+            transaction.on_commit(drop)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+    max_size=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+)
+
+
+def load_user(pk):
+    # The profile is joined in the same query, for the profile endpoints
+    return User.objects.select_related('profile').get(pk=pk)
+
+
+# ============================
+# AUTHENTICATION
+# ============================
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that resolves the token's user through ``user_cache``.
+
+    A cache hit authenticates a request without touching the database; a miss
+    costs one query that also fetches the profile. The usual simplejwt checks
+    (inactive user, revoked token) run on every request against the cached
+    row, and deactivating a user or changing their password saves the user,
+    which evicts the entry.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        try:
+            user = user_cache.get(int(user_id), load_user)
+        except (User.DoesNotExist, ValueError, TypeError) as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,58 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+# ============================
+# BACKGROUND TASKS
+# ============================
+def executor():
+    """Return the process-wide worker pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+                thread_name_prefix='tracker-task',
+            )
+        return _executor
+
+
+def _run(func, args):
+    # Worker threads get their own connections; drop them when done
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Background task %s failed", func.__name__)
+    finally:
+        connections.close_all()
+
+
+def submit(func, *args):
+    """
+    Run ``func(*args)`` off the request once the current transaction commits.
+
+    This is the local stand-in for a task queue: a small thread pool in the
+    web process. With ``BACKGROUND_TASKS_EAGER`` the task runs inline at
+    commit time instead, which is what tests want. Failures are logged, never
+    raised into the request.
+    """
+    def enqueue():
+        if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+            try:
+                func(*args)
+            except Exception:
+                logger.exception("Background task %s failed", func.__name__)
+        else:
+            executor().submit(_run, func, args)
+
+    transaction.on_commit(enqueue)
@@ -0,0 +1,444 @@
+import asyncio
+import importlib
+import io
+import math
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver, clear_url_caches, reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import Budget, Category, Expense, Income, RecurringRule
+
+
+# ============================
+# SCENARIOS
+# ============================
+def bench_fixtures(user, password='seed-password'):
+    """Make sure ``user`` owns one of everything a detail endpoint can point at."""
+    category = Category.objects.filter(user=user, type='expense').first()
+    if category is None:
+        category = Category.objects.create(user=user, name='Bench', type='expense')
+    expense = Expense.objects.filter(user=user).first() or Expense.objects.create(user=user, amount=1)
+    income = Income.objects.filter(user=user).first() or Income.objects.create(user=user, amount=1)
+    budget = Budget.objects.filter(user=user).first() or Budget.objects.create(
+        user=user, category=category, limit=100_000)
+    rule = RecurringRule.objects.filter(user=user).first() or RecurringRule.objects.create(
+        user=user, kind='expense', amount=1, start_date=expense.date.date(), active=False)
+    return {
+        'user': user, 'category': category, 'expense': expense, 'income': income,
+        'budget': budget, 'rule': rule, 'password': password,
+        'refresh': str(RefreshToken.for_user(user)),
+    }
+
+
+def png_upload(i):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), (i % 256, 90, 160)).save(buffer, 'PNG')
+    return SimpleUploadedFile('bench.png', buffer.getvalue(), content_type='image/png')
+
+
+def csv_upload(i):
+    content = f"kind,date,amount,category,description\nexpense,2024-01-05,{i + 1}.00,Bench,Bench import\n"
+    return SimpleUploadedFile('bench.csv', content.encode(), content_type='text/csv')
+
+
+def duplicate_category(category):
+    """A case-variant copy of ``category`` for the merge scenarios to fold back in."""
+    return Category.objects.create(user=category.user, name=category.name.swapcase(), type=category.type)
+
+
+def scenarios(fx):
+    """
+    Return the benchmark scenarios as dicts.
+
+    Each has a unique ``name``, the ``url_name`` it exercises, an HTTP
+    ``method`` and the request ``data`` (or a callable taking the iteration
+    number, for payloads that must differ per request). ``auth`` is False for
+    endpoints hit before logging in.
+    """
+    user, category, expense, income = fx['user'], fx['category'], fx['expense'], fx['income']
+    return [
+        {'name': 'home', 'url_name': None, 'path': '/api/v1.0/', 'method': 'get', 'auth': False},
+        {'name': 'signup', 'url_name': 'sign-up', 'method': 'post', 'auth': False,
+         'data': lambda i: {'username': f'bench-signup-{i}', 'email': f'bench-signup-{i}@example.com',
+                            'password': 'bench-password', 'first_name': 'Bench'}},
+        {'name': 'login', 'url_name': 'token-obtain-pair', 'method': 'post', 'auth': False,
+         'data': {'username': user.username, 'password': fx['password']}},
+        {'name': 'token-refresh', 'url_name': 'token-refresh', 'method': 'post', 'auth': False,
+         'data': {'refresh': fx['refresh']}},
+        {'name': 'user-profile', 'url_name': 'user-profile', 'method': 'get'},
+        {'name': 'profile-update', 'url_name': 'profile-update', 'method': 'post', 'format': 'multipart',
+         'data': lambda i: {'profile_pic': png_upload(i)}},
+
+        {'name': 'expense-list', 'url_name': 'expense-list-create', 'method': 'get'},
+        {'name': 'expense-list-deep-page', 'url_name': 'expense-list-create', 'method': 'get',
+         'data': {'page': 50}},
+        {'name': 'expense-list-cursor', 'url_name': 'expense-list-create', 'method': 'get',
+         'data': {'pagination': 'cursor', 'page_size': 50}},
+        {'name': 'expense-list-filtered', 'url_name': 'expense-list-create', 'method': 'get',
+         'data': {'category': category.pk, 'date_min': '2000-01-01'}},
+        {'name': 'expense-search', 'url_name': 'expense-list-create', 'method': 'get',
+         'data': {'search': 'lunch'}},
+        {'name': 'expense-create', 'url_name': 'expense-list-create', 'method': 'post',
+         'data': {'amount': '1500.00', 'category': category.pk, 'description': 'Bench lunch'}},
+        {'name': 'expense-detail', 'url_name': 'expense-detail', 'kwargs': {'pk': expense.pk}, 'method': 'get'},
+        {'name': 'expense-update', 'url_name': 'expense-detail', 'kwargs': {'pk': expense.pk},
+         'method': 'patch', 'data': lambda i: {'amount': f'{1000 + i}.00'}},
+        {'name': 'expense-bulk', 'url_name': 'expense-bulk', 'method': 'post',
+         'data': {'create': [{'amount': '10.00', 'category': category.pk}] * 100}},
+        # Every expense, alternately to "No Category" and back
+        {'name': 'expense-recategorize', 'url_name': 'expense-recategorize', 'method': 'post',
+         'data': lambda i: {'category': category.pk if i % 2 else None}},
+
+        {'name': 'income-list', 'url_name': 'income-list-create', 'method': 'get'},
+        {'name': 'income-create', 'url_name': 'income-list-create', 'method': 'post',
+         'data': {'amount': '50000.00', 'description': 'Bench salary'}},
+        {'name': 'income-detail', 'url_name': 'income-detail', 'kwargs': {'pk': income.pk}, 'method': 'get'},
+        {'name': 'income-bulk', 'url_name': 'income-bulk', 'method': 'post',
+         'data': {'create': [{'amount': '10.00'}] * 100}},
+        {'name': 'income-recategorize', 'url_name': 'income-recategorize', 'method': 'post',
+         'data': {'category': None}},
+
+        {'name': 'category-list', 'url_name': 'category-list-create', 'method': 'get'},
+        {'name': 'category-create', 'url_name': 'category-list-create', 'method': 'post',
+         'data': lambda i: {'name': f'Bench {i}', 'type': 'expense'}},
+        {'name': 'category-detail', 'url_name': 'category-detail', 'kwargs': {'pk': category.pk}, 'method': 'get'},
+        {'name': 'category-merge', 'url_name': 'category-merge', 'method': 'post',
+         'data': lambda i: {'target': category.pk, 'sources': [duplicate_category(category).pk]}},
+        # The body is ignored; building it adds a duplicate for the request to fold
+        {'name': 'category-dedupe', 'url_name': 'category-dedupe', 'method': 'post',
+         'data': lambda i: {'duplicate': duplicate_category(category).pk}},
+
+        {'name': 'budget-list', 'url_name': 'budget-list-create', 'method': 'get'},
+        {'name': 'budget-detail', 'url_name': 'budget-detail', 'kwargs': {'pk': fx['budget'].pk}, 'method': 'get'},
+        {'name': 'recurring-list', 'url_name': 'recurring-list-create', 'method': 'get'},
+        {'name': 'recurring-detail', 'url_name': 'recurring-detail', 'kwargs': {'pk': fx['rule'].pk},
+         'method': 'get'},
+
+        {'name': 'ledger', 'url_name': 'ledger', 'method': 'get'},
+        {'name': 'ledger-filtered', 'url_name': 'ledger', 'method': 'get',
+         'data': {'category': category.pk, 'date_min': '2000-01-01', 'page_size': 50}},
+
+        {'name': 'sync-initial', 'url_name': 'sync', 'method': 'get'},
+        {'name': 'export-csv', 'url_name': 'ledger-export', 'kwargs': {'export_format': 'csv'}, 'method': 'get'},
+        {'name': 'import-csv', 'url_name': 'ledger-import', 'method': 'post', 'format': 'multipart',
+         'data': lambda i: {'file': csv_upload(i)}},
+
+        {'name': 'summary', 'url_name': 'summary', 'method': 'get'},
+        {'name': 'category-summary', 'url_name': 'category-summary', 'method': 'get'},
+        {'name': 'metrics', 'url_name': 'metrics', 'method': 'get'},
+        {'name': 'timeseries-daily', 'url_name': 'summary-timeseries', 'method': 'get',
+         'data': {'interval': 'day', 'by_category': 'true'}},
+    ]
+
+
+def named_urls(patterns=None):
+    """Return every URL name in ``tracker.urls``."""
+    if patterns is None:
+        from . import urls
+        patterns = urls.urlpatterns
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= named_urls(pattern.url_patterns)
+        elif pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def uncovered_urls(fx):
+    """URL names that no scenario exercises; kept empty as endpoints are added."""
+    return named_urls() - {scenario['url_name'] for scenario in scenarios(fx)}
+
+
+# ============================
+# MEASUREMENT
+# ============================
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class EndpointBenchmark:
+    """Run scenarios in-process through the full middleware/DRF stack."""
+
+    def __init__(self, fixtures, iterations=20, warmup=2):
+        self.fixtures = fixtures
+        self.iterations = iterations
+        self.warmup = warmup
+        access = str(RefreshToken.for_user(fixtures['user']).access_token)
+        self.client = APIClient()
+        self.authenticated = APIClient()
+        # A real bearer token, so authentication cost is part of every timing
+        self.authenticated.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def run(self, scenario):
+        path = scenario.get('path') or reverse(scenario['url_name'], kwargs=scenario.get('kwargs'))
+        client = self.authenticated if scenario.get('auth', True) else self.client
+        method = getattr(client, scenario['method'])
+
+        timings, queries, statuses = [], [], set()
+        for i in range(self.warmup + self.iterations):
+            data = scenario.get('data')
+            if callable(data):
+                data = data(i)
+            kwargs = {'format': scenario.get('format', 'json')} if scenario['method'] != 'get' else {}
+
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = method(path, data, **kwargs)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = (time.perf_counter() - started) * 1000
+            if i < self.warmup:
+                continue
+            timings.append(elapsed)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+
+        return {
+            'url_name': scenario['url_name'],
+            'method': scenario['method'].upper(),
+            'path': path,
+            'status': sorted(statuses),
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p90_ms': round(percentile(timings, 0.90), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'max_ms': round(max(timings), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'queries': max(queries),
+        }
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Return human-readable regressions of ``results`` against ``baseline``.
+
+    A scenario regresses when its p95 latency exceeds the baseline by more
+    than ``tolerance`` (a fraction), or when it runs more queries.
+    """
+    failures = []
+    for name, expected in baseline.get('results', {}).items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+        if 'p95_ms' in expected and actual['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+            failures.append(f"{name}: p95 {actual['p95_ms']} ms > baseline {expected['p95_ms']} ms "
+                            f"(+{tolerance:.0%} allowed)")
+        if 'queries' in expected and actual['queries'] > expected['queries']:
+            failures.append(f"{name}: {actual['queries']} queries > baseline {expected['queries']}")
+    return failures
+
+
+# ============================
+# SERVING MODES
+# ============================
+# Read endpoints that have an async counterpart (tracker.async_views)
+CONCURRENCY_URLS = ('summary', 'category-summary', 'expense-list-create', 'income-list-create')
+
+
+def route_reads(async_views):
+    """Rebuild the URLconf with ``ASYNC_VIEWS`` on or off."""
+    from . import urls
+
+    with override_settings(ASYNC_VIEWS=async_views):
+        importlib.reload(urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+def bench_host():
+    """A host name the configured ``ALLOWED_HOSTS`` accepts."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != '*' and not host.startswith('.'):
+            return host
+    return 'localhost'
+
+
+@contextmanager
+def db_latency(ms):
+    """
+    Add ``ms`` of sleep to every query on every connection opened meanwhile.
+
+    Stands in for the network round trip to a real database server, which a
+    local SQLite file does not have.
+    """
+    if not ms:
+        yield
+        return
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(ms / 1000)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        # Outermost, so execute_wrapper() blocks that are open (and pop their
+        # own wrapper on exit) are not disturbed
+        connection.execute_wrappers.insert(0, delay)
+
+    connection_created.connect(install)
+    existing = connections.all(initialized_only=True)
+    for conn in existing:
+        conn.execute_wrappers.insert(0, delay)
+    try:
+        yield
+    finally:
+        connection_created.disconnect(install)
+        for conn in existing:
+            conn.execute_wrappers.remove(delay)
+
+
+def wsgi_get(app, path, headers):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': bench_host(), 'SERVER_PORT': '80', 'HTTP_HOST': bench_host(),
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(), 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+        'wsgi.run_once': False, 'wsgi.version': (1, 0),
+    }
+    environ.update({f"HTTP_{name.upper().replace('-', '_')}": value for name, value in headers.items()})
+    statuses = []
+    body = app(environ, lambda status, response_headers, exc_info=None: statuses.append(int(status.split()[0])))
+    try:
+        for _chunk in body:
+            pass
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    return statuses[0]
+
+
+async def asgi_get(app, path, headers):
+    host = bench_host()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': b'',
+        'headers': [(b'host', host.encode())] + [(name.lower().encode(), value.encode())
+                                                 for name, value in headers.items()],
+        'client': ('127.0.0.1', 0), 'server': (host, 80),
+    }
+    finished = asyncio.Event()
+    received = []
+    response = {}
+
+    async def receive():
+        if not received:
+            received.append(True)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django listens for a disconnect while the view runs
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            finished.set()
+
+    await app(scope, receive, send)
+    return response['status']
+
+
+class ConcurrencyBenchmark:
+    """
+    Compare throughput of the read endpoints served sync (WSGI) and async (ASGI).
+
+    The WSGI run models ``workers`` gunicorn sync workers: that many threads,
+    each sending one request at a time through ``WSGIHandler``. The ASGI run
+    models one uvicorn worker: up to ``concurrency`` requests in flight on a
+    single event loop through ``ASGIHandler``, with ``ASYNC_VIEWS`` on. Both
+    go through the full middleware stack and authenticate with a real token.
+    """
+
+    def __init__(self, user, requests=400, workers=4, concurrency=32, db_latency_ms=0):
+        self.requests = requests
+        self.workers = workers
+        self.concurrency = concurrency
+        self.db_latency_ms = db_latency_ms
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        self.paths = [reverse(name) for name in CONCURRENCY_URLS]
+        # Both call django.setup(), which reconfigures logging: do it up front
+        self.wsgi_app = get_wsgi_application()
+        self.asgi_app = get_asgi_application()
+
+    def run(self):
+        restore = getattr(settings, 'ASYNC_VIEWS', False)
+        try:
+            with db_latency(self.db_latency_ms):
+                route_reads(False)
+                wsgi = self.run_wsgi()
+                route_reads(True)
+                asgi = self.run_asgi()
+        finally:
+            route_reads(restore)
+        return {'wsgi': wsgi, 'asgi': asgi}
+
+    def run_wsgi(self):
+        app = self.wsgi_app
+        results = []
+        lock = threading.Lock()
+
+        def worker(indexes):
+            try:
+                for i in indexes:
+                    started = time.perf_counter()
+                    status_code = wsgi_get(app, self.paths[i % len(self.paths)], self.headers)
+                    with lock:
+                        results.append((status_code, (time.perf_counter() - started) * 1000))
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(range(n, self.requests, self.workers),))
+                   for n in range(self.workers)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(results, time.perf_counter() - started, workers=self.workers)
+
+    def run_asgi(self):
+        app = self.asgi_app
+
+        async def main():
+            slots = asyncio.Semaphore(self.concurrency)
+
+            async def one(i):
+                async with slots:
+                    started = time.perf_counter()
+                    status_code = await asgi_get(app, self.paths[i % len(self.paths)], self.headers)
+                    return status_code, (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            results = await asyncio.gather(*(one(i) for i in range(self.requests)))
+            return results, time.perf_counter() - started
+
+        results, elapsed = asyncio.run(main())
+        return self.report(results, elapsed, concurrency=self.concurrency)
+
+    def report(self, results, elapsed, **shape):
+        timings = [ms for _status, ms in results]
+        return {
+            **shape,
+            'requests': len(results),
+            'status': sorted({status_code for status_code, _ms in results}),
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_second': round(len(results) / elapsed, 1),
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+        }
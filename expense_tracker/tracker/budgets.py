@@ -0,0 +1,97 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from .models import DailyRollup
+from .summary import period_days, range_q
+
+
+def budget_ranges(today=None):
+    """
+    Map each budget period to the half-open ``(first_day, end_day)`` range
+    of the week, month or year containing ``today``. Unlike the summary
+    periods these are closed, so a future-dated expense counts toward the
+    period it falls in rather than the current one.
+    """
+    days = period_days(today)
+    start_week, start_month, start_year = days['week'][0], days['month'][0], days['year'][0]
+    return {
+        'weekly': (start_week, start_week + timedelta(weeks=1)),
+        'monthly': (start_month, (start_month + timedelta(days=31)).replace(day=1)),
+        'yearly': (start_year, start_year.replace(year=start_year.year + 1)),
+    }
+
+
+# ============================
+# BATCH EVALUATION
+# ============================
+def spent_by_category(user, category_ids, periods, today=None):
+    """
+    Return ``{(category_id, period): spent}`` for the given budget periods.
+
+    Reads the daily rollup in one grouped query with a filtered ``SUM`` per
+    period, so the cost depends on categories and days, not expense rows.
+    """
+    if not category_ids or not periods:
+        return {}
+    all_ranges = budget_ranges(today)
+    ranges = {period: all_ranges[period] for period in periods}
+    earliest = min(start for start, _end in ranges.values())
+    latest = max(end for _start, end in ranges.values())
+
+    rows = (
+        DailyRollup.objects
+        .filter(user=user, kind='expense', category_id__in=category_ids, day__gte=earliest, day__lt=latest)
+        .values('category_id')
+        .annotate(**{
+            period: Sum('total', filter=range_q(start, end, 'day'))
+            for period, (start, end) in ranges.items()
+        })
+        .order_by()
+    )
+    return {
+        (row['category_id'], period): row[period]
+        for row in rows
+        for period in ranges
+        if row[period] is not None
+    }
+
+
+def budget_status(budget, spent):
+    """Build the status payload for one budget given its spend to date."""
+    limit = budget.limit
+    percent_used = (spent * 100 / limit).quantize(Decimal('0.1')) if limit else None
+    if spent > limit:
+        state = 'exceeded'
+    elif limit and spent * 100 >= limit * budget.alert_threshold:
+        state = 'warning'
+    else:
+        state = 'ok'
+    return {
+        'spent': spent,
+        'remaining': limit - spent,
+        'percent_used': percent_used,
+        'status': state,
+    }
+
+
+def evaluate(budgets, today=None):
+    """
+    Return ``{budget_id: status}`` for ``budgets`` (all owned by one user).
+
+    However many budgets are passed, spend is fetched with a single query.
+    """
+    budgets = list(budgets)
+    if not budgets:
+        return {}
+    spent = spent_by_category(
+        budgets[0].user_id,
+        {budget.category_id for budget in budgets},
+        {budget.period for budget in budgets},
+        today,
+    )
+    return {
+        budget.pk: budget_status(budget, spent.get((budget.category_id, budget.period), Decimal('0')))
+        for budget in budgets
+    }
@@ -0,0 +1,211 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from . import archive, rollups, versioning
+from .models import Category, Tombstone
+
+
+# Writable ledger columns, shared by batch updates
+LEDGER_FIELDS = ['amount', 'category', 'description', 'date']
+# bulk_update() skips auto_now, so updated_at is written explicitly
+UPDATE_FIELDS = LEDGER_FIELDS + ['updated_at']
+# Columns the rollup needs to take a deleted or changed row back out
+SNAPSHOT_FIELDS = ('user_id', 'date', 'category_id', 'amount')
+
+
+# ============================
+# SET-BASED LEDGER WRITES
+# ============================
+# bulk_create/bulk_update/raw deletes skip model signals, so these helpers keep
+# the derived state (rollups, version stamps, summary cache) in sync in one
+# pass instead of once per row.
+
+
+def create_rows(model, instances, batch_size=500, update_rollups=True):
+    """
+    Insert ``instances`` in batches. Pass ``update_rollups=False`` when the
+    caller rebuilds the rollup itself afterwards (e.g. after a large import).
+    """
+    created = model.objects.bulk_create(instances, batch_size=batch_size)
+    if update_rollups:
+        rollups.record(created)
+    versioning.ledger_changed(instance.user_id for instance in created)
+    return created
+
+
+def update_rows(model, instances, previous, fields=UPDATE_FIELDS, batch_size=500):
+    """Save modified ``instances``; ``previous`` holds their snapshots from before the change."""
+    now = timezone.now()
+    for instance in instances:
+        instance.updated_at = now
+    model.objects.bulk_update(instances, fields, batch_size=batch_size)
+    kind = rollups.KIND_BY_MODEL[model]
+    deltas = rollups.new_deltas()
+    for row in previous:
+        rollups.add_delta(deltas, kind, row, -1)
+    for instance in instances:
+        rollups.add_delta(deltas, kind, rollups.snapshot(instance), 1)
+    rollups.apply_deltas(deltas)
+    versioning.ledger_changed(row['user_id'] for row in previous)
+
+
+def delete_rows(model, queryset, batch_size=500):
+    """Delete every row matched by ``queryset`` and return the deleted ids."""
+    rows = list(queryset.values('id', *SNAPSHOT_FIELDS))
+    ids = [row['id'] for row in rows]
+    for start in range(0, len(ids), batch_size):
+        # Nothing references ledger rows, so a raw DELETE is safe here
+        chunk = model.objects.filter(pk__in=ids[start:start + batch_size])
+        chunk._raw_delete(chunk.db)
+    rollups.record_rows(rollups.KIND_BY_MODEL[model], rows, -1)
+    Tombstone.objects.bulk_create(
+        (Tombstone(user_id=row['user_id'], kind=model._meta.model_name, object_id=row['id']) for row in rows),
+        batch_size=batch_size,
+    )
+    versioning.ledger_changed(row['user_id'] for row in rows)
+    return ids
+
+
+# ============================
+# BATCH REQUESTS
+# ============================
+INVALID_ID = "A valid integer is required."
+
+
+def is_id(value):
+    # bool is an int subclass, and true would otherwise target row 1
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class LedgerBatch:
+    """
+    Validate and apply one batch request against a ledger table.
+
+    The payload has optional ``create`` (list of objects), ``update`` (list of
+    objects with an ``id``) and ``delete`` (list of ids) sections. Items are
+    validated independently and reported per item; valid items are written in
+    a single transaction. With ``"atomic": true`` nothing is written unless
+    every item is valid.
+    """
+    max_items = 500
+
+    def __init__(self, model, serializer_class, request):
+        self.model = model
+        self.serializer_class = serializer_class
+        self.request = request
+        self.user = request.user
+
+    def run(self, payload):
+        """Return ``(results, status_code)`` for a batch payload."""
+        if not isinstance(payload, dict):
+            raise ValidationError({'detail': "Expected an object with create, update and/or delete lists."})
+
+        creates = self.section(payload, 'create')
+        updates = self.section(payload, 'update')
+        deletes = self.section(payload, 'delete')
+        if len(creates) + len(updates) + len(deletes) > self.max_items:
+            raise ValidationError({'detail': f"A batch may contain at most {self.max_items} items."})
+
+        context = {'request': self.request, 'category_map': self.category_map(creates + updates)}
+        create_results, new_rows = self.validate_creates(creates, context)
+        update_results, changed_rows, previous = self.validate_updates(updates, context)
+        delete_results, delete_ids = self.validate_deletes(deletes)
+
+        results = {'create': create_results, 'update': update_results, 'delete': delete_results}
+        failed = any(item['status'] == 'error' for section in results.values() for item in section)
+        if failed and payload.get('atomic'):
+            return results, status.HTTP_400_BAD_REQUEST
+
+        with transaction.atomic():
+            created = create_rows(self.model, new_rows)
+            if changed_rows:
+                update_rows(self.model, changed_rows, previous)
+            if delete_ids:
+                delete_rows(self.model, self.model.objects.filter(user=self.user, pk__in=delete_ids))
+
+        # Fill in the saved representation (and new ids) of written rows
+        written = iter(self.serializer_class(created + changed_rows, many=True, context=context).data)
+        for item in create_results + update_results:
+            if item['status'] != 'error':
+                item['data'] = next(written)
+                item['id'] = item['data']['id']
+
+        return results, status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK
+
+    def section(self, payload, name):
+        items = payload.get(name) or []
+        if not isinstance(items, list):
+            raise ValidationError({name: "Expected a list."})
+        return items
+
+    def category_map(self, items):
+        # Ownership of every referenced category is checked with one query
+        ids = set()
+        for item in items:
+            try:
+                ids.add(int(item['category']))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return Category.objects.filter(user=self.user, pk__in=ids).in_bulk()
+
+    def validate_creates(self, items, context):
+        results, rows = [], []
+        for index, item in enumerate(items):
+            serializer = self.serializer_class(data=item, context=context)
+            if not serializer.is_valid():
+                results.append({'index': index, 'status': 'error', 'errors': serializer.errors})
+                continue
+            rows.append(self.model(user=self.user, **serializer.validated_data))
+            results.append({'index': index, 'status': 'created'})
+        return results, rows
+
+    def validate_updates(self, items, context):
+        ids = {item.get('id') for item in items if isinstance(item, dict) and is_id(item.get('id'))}
+        instances = self.model.objects.filter(user=self.user, pk__in=ids).select_related('category').in_bulk()
+        archived = archive.archived_ids(self.model, self.user, ids - set(instances))
+        results, rows, previous = [], [], []
+        seen = set()
+        for index, item in enumerate(items):
+            pk = item.get('id') if isinstance(item, dict) else None
+            if not is_id(pk):
+                results.append({'index': index, 'id': pk, 'status': 'error', 'errors': {'id': [INVALID_ID]}})
+                continue
+            instance = instances.get(pk)
+            if instance is None or pk in seen:
+                error = self.missing(pk, archived) if instance is None else "Duplicate id in batch."
+                results.append({'index': index, 'id': pk, 'status': 'error', 'errors': {'id': [error]}})
+                continue
+            serializer = self.serializer_class(instance, data=item, partial=True, context=context)
+            if not serializer.is_valid():
+                results.append({'index': index, 'id': pk, 'status': 'error', 'errors': serializer.errors})
+                continue
+            seen.add(pk)
+            previous.append(rollups.snapshot(instance))
+            for attr, value in serializer.validated_data.items():
+                setattr(instance, attr, value)
+            rows.append(instance)
+            results.append({'index': index, 'id': pk, 'status': 'updated'})
+        return results, rows, previous
+
+    def validate_deletes(self, ids):
+        wanted = {pk for pk in ids if is_id(pk)}
+        existing = set(self.model.objects.filter(user=self.user, pk__in=wanted).values_list('pk', flat=True))
+        archived = archive.archived_ids(self.model, self.user, wanted - existing)
+        results, valid = [], []
+        for index, pk in enumerate(ids):
+            if not is_id(pk):
+                results.append({'index': index, 'id': pk, 'status': 'error', 'errors': {'id': [INVALID_ID]}})
+                continue
+            if pk not in existing:
+                error = self.missing(pk, archived)
+                results.append({'index': index, 'id': pk, 'status': 'error', 'errors': {'id': [error]}})
+                continue
+            existing.discard(pk)  # A repeated id only counts once
+            valid.append(pk)
+            results.append({'index': index, 'id': pk, 'status': 'deleted'})
+        return results, valid
+
+    def missing(self, pk, archived):
+        return archive.ARCHIVED_READ_ONLY if pk in archived else "Not found."
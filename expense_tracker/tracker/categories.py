@@ -0,0 +1,121 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+from django_filters import utils as filter_utils
+
+from . import archive, rollups, versioning
+from .export import EXPORT_SOURCES
+from .models import Budget, Category, RecurringRule
+
+
+# ============================
+# MERGING
+# ============================
+# Every statement below is an UPDATE or DELETE over a whole set of rows, so
+# the cost in Python stays the same for ten rows or a hundred thousand.
+
+def merge_categories(user, target, sources):
+    """
+    Merge the ``sources`` categories into ``target`` and delete them.
+
+    Their expenses, incomes (archived ones included) and recurring rules move
+    over with one UPDATE per table and a fresh ``updated_at``, so sync clients
+    refetch them. A source budget survives for each period the target has
+    no budget for; the rest go with their category. The rollup is re-keyed
+    in the same transaction, and deleting the sources records their
+    tombstones and bumps the ledger version.
+    """
+    source_ids = sorted(category.pk for category in sources)
+    now = timezone.now()
+    report = {'category': target.pk, 'merged': source_ids, 'expenses': 0, 'incomes': 0}
+
+    with transaction.atomic():
+        # Lock the categories so a concurrent write can't point rows at a source mid-merge
+        list(Category.objects.select_for_update().filter(pk__in=[target.pk, *source_ids]).values_list('pk'))
+        for model, (archived, _) in archive.ARCHIVES.items():
+            key = model._meta.verbose_name_plural
+            for table in (model, archived):
+                report[key] += table.objects.filter(user=user, category_id__in=source_ids).update(
+                    category=target, updated_at=now)
+        report['recurring_rules'] = RecurringRule.objects.filter(user=user, category_id__in=source_ids).update(
+            category=target, updated_at=now)
+        move_budgets(target, source_ids, now)
+
+        rollups.merge_categories(user.pk, source_ids, target.pk)
+        Category.objects.filter(user=user, pk__in=source_ids).delete()
+    return report
+
+
+def move_budgets(target, source_ids, now):
+    """Hand each period's oldest source budget to ``target`` unless it already has one."""
+    taken = set(Budget.objects.filter(category=target).values_list('period', flat=True))
+    for pk, period in Budget.objects.filter(category_id__in=source_ids).order_by('pk').values_list('pk', 'period'):
+        if period not in taken:
+            Budget.objects.filter(pk=pk).update(category=target, updated_at=now)
+            taken.add(period)
+
+
+def duplicate_groups(user):
+    """
+    The user's categories that differ only in case or surrounding spaces
+    (and share a type), oldest first in each group.
+    """
+    groups = defaultdict(list)
+    for category in Category.objects.filter(user=user).order_by('pk'):
+        groups[(category.name.strip().casefold(), category.type)].append(category)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def dedupe_categories(user):
+    """Merge every group of duplicate categories into its oldest member, in one transaction."""
+    with transaction.atomic():
+        return [merge_categories(user, group[0], group[1:]) for group in duplicate_groups(user)]
+
+
+# ============================
+# BULK RE-CATEGORIZATION
+# ============================
+def recategorize(user, kind, params, category, request=None):
+    """
+    Move every ``kind`` row matching the list filters in ``params`` to
+    ``category`` (None for "No Category"); returns the number of rows moved.
+
+    One UPDATE per table: the hot one, plus the archive when the date range
+    reaches it. The rollup delta is aggregated per day and category in the
+    database first, so no ledger row is ever loaded; the user's ledger
+    version row is locked before that, as every other ledger write of
+    theirs ends by updating it.
+    """
+    model, filterset_class = EXPORT_SOURCES[kind]
+    tables = [model]
+    if archive.source(model, params) is not model:
+        tables.append(archive.ARCHIVES[model][0])
+    category_id = category.pk if category is not None else None
+
+    querysets = []
+    for table in tables:
+        filterset = filterset_class(params, queryset=table.objects.filter(user=user), request=request)
+        if not filterset.is_valid():
+            raise filter_utils.translate_validation(filterset.errors)
+        # Filtered by id so search joins and ranking never reach the UPDATE
+        matched = table.objects.filter(pk__in=filterset.qs.order_by().values('pk'))
+        querysets.append(matched.exclude(category_id=category_id))
+
+    moved, now = 0, timezone.now()
+    with transaction.atomic():
+        # Locks the user's version row first, so no other ledger write of
+        # theirs lands between the aggregate and the UPDATE
+        versioning.touch(user.pk)
+        deltas = rollups.new_deltas()
+        for queryset in querysets:
+            for row in rollups.day_totals(queryset):
+                for key_category, sign in ((row['category_id'], -1), (category_id, 1)):
+                    entry = deltas[(row['user_id'], row['day'], key_category, kind)]
+                    entry[0] += sign * row['total']
+                    entry[1] += sign * row['count']
+            moved += queryset.update(category_id=category_id, updated_at=now)
+        rollups.apply_deltas(deltas)
+        if moved:
+            versioning.ledger_changed([user.pk])
+    return moved
@@ -0,0 +1,91 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import archive
+from .filters import ExpenseFilter, IncomeFilter
+from .models import Expense, Income
+
+
+# Export formats and the content type each is served with
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+EXPORT_COLUMNS = ['kind', 'id', 'date', 'amount', 'category', 'category_name', 'description']
+
+# Ledger kinds that can be exported, with their model and filter set
+EXPORT_SOURCES = {
+    'expense': (Expense, ExpenseFilter),
+    'income': (Income, IncomeFilter),
+}
+
+# Rows fetched per round trip from the server-side cursor
+CHUNK_SIZE = 2000
+
+
+# ============================
+# ROW SOURCES
+# ============================
+def export_querysets(user, kinds, params):
+    """
+    Build one filtered queryset per requested kind.
+
+    Returns ``(querysets, errors)``; filters are validated up front so bad
+    parameters produce a normal 400 instead of a broken stream.
+    """
+    querysets, errors = [], {}
+    for kind in kinds:
+        model, filterset_class = EXPORT_SOURCES[kind]
+        model = archive.source(model, params)
+        filterset = filterset_class(params, queryset=model.objects.filter(user=user))
+        if not filterset.is_valid():
+            errors.update(filterset.errors)
+            continue
+        queryset = (
+            filterset.qs
+            .order_by('date', 'id')
+            .values_list('id', 'date', 'amount', 'category_id', 'category__name', 'description')
+        )
+        querysets.append((kind, queryset))
+    return querysets, errors
+
+
+def export_rows(querysets):
+    """Yield export rows one at a time, streaming each table from the database."""
+    for kind, queryset in querysets:
+        # iterator() uses a server-side cursor where supported, so memory stays flat
+        for pk, date, amount, category_id, category_name, description in queryset.iterator(chunk_size=CHUNK_SIZE):
+            yield [kind, pk, date, amount, category_id, category_name, description]
+
+
+# ============================
+# ENCODERS
+# ============================
+class Echo:
+    """File-like object whose ``write`` just returns the value, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for kind, pk, date, amount, category_id, category_name, description in rows:
+        yield writer.writerow([
+            kind, pk, date.isoformat(), amount, category_id or '', category_name or '', description or ''
+        ])
+
+
+def ndjson_stream(rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(EXPORT_COLUMNS, row))) + '\n'
+
+
+ENCODERS = {
+    'csv': csv_stream,
+    'ndjson': ndjson_stream,
+}
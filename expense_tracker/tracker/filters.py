@@ -1,18 +1,61 @@
 import django_filters
-from .models import Expense, Income
+from datetime import timedelta
+from django_filters.rest_framework import DjangoFilterBackend
+from .models import Expense, Income, LedgerHistoryRow
+from .search import search as full_text_search
+from .summary import local_midnight
 
-class ExpenseFilter(django_filters.FilterSet):
-    date_min = django_filters.DateFilter(field_name='date', lookup_expr='gte')
-    date_max = django_filters.DateFilter(field_name='date', lookup_expr='lte')
 
+class LedgerFilter(django_filters.FilterSet):
+    """
+    Shared date and search filters for the ledger tables.
+
+    Date bounds are turned into half-open datetime ranges in the active
+    timezone, so the database can use the (user, date) indexes instead of
+    truncating every row to its date.
+    """
+    date_min = django_filters.DateFilter(method='filter_date_from')
+    date_max = django_filters.DateFilter(method='filter_date_to')
+    # Lookup-style aliases for the same bounds
+    date__gte = django_filters.DateFilter(method='filter_date_from')
+    date__lte = django_filters.DateFilter(method='filter_date_to')
+    # Full-text search over descriptions, best matches first
+    search = django_filters.CharFilter(method='filter_search')
+
+    def filter_date_from(self, queryset, name, value):
+        return queryset.filter(date__gte=local_midnight(value))
+
+    def filter_date_to(self, queryset, name, value):
+        # Inclusive end day: everything before the following midnight
+        return queryset.filter(date__lt=local_midnight(value + timedelta(days=1)))
+
+    def filter_search(self, queryset, name, value):
+        user = getattr(self.request, 'user', None)
+        queryset = full_text_search(queryset, value, user_id=getattr(user, 'pk', None))
+        if 'search_rank' in queryset.query.annotations:
+            queryset = queryset.order_by('-search_rank', '-date', '-id')
+        return queryset
+
+
+class ExpenseFilter(LedgerFilter):
     class Meta:
         model = Expense
         fields = ['category', 'date_min', 'date_max']
 
-class IncomeFilter(django_filters.FilterSet):
-    date_min = django_filters.DateFilter(field_name='date', lookup_expr='gte')
-    date_max = django_filters.DateFilter(field_name='date', lookup_expr='lte')
-
+class IncomeFilter(LedgerFilter):
     class Meta:
         model = Income
         fields = ['category', 'date_min', 'date_max']
+
+
+class LedgerFilterBackend(DjangoFilterBackend):
+    """
+    ``DjangoFilterBackend`` that also filters a ledger table's history view
+    (hot + archive rows, see tracker.archive) with the table's filter set;
+    both have the same columns.
+    """
+
+    def get_filterset_class(self, view, queryset=None):
+        if queryset is not None and issubclass(queryset.model, LedgerHistoryRow):
+            return view.filterset_class
+        return super().get_filterset_class(view, queryset)
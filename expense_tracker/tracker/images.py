@@ -0,0 +1,151 @@
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF'}
+# Multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def max_upload_size():
+    return getattr(settings, 'PROFILE_PIC_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+
+
+def thumbnail_sizes():
+    """``{label: longest edge in pixels}`` of the thumbnails to generate."""
+    return getattr(settings, 'PROFILE_THUMBNAIL_SIZES', {'small': 64, 'medium': 256, 'large': 512})
+
+
+# ============================
+# UPLOAD VALIDATION
+# ============================
+class SizeCapUploadHandler(FileUploadHandler):
+    """
+    Abort a multipart upload as soon as any file in it passes ``max_bytes``.
+
+    Chunks are counted as they stream in and handed on unchanged to the
+    default handlers, so an oversized file is never read (or written to a
+    temporary file) beyond the cap plus one chunk. ``exceeded`` tells the view
+    why the file is missing.
+    """
+
+    def __init__(self, max_bytes, request=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.exceeded = False
+        self.received = 0
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.exceeded = True
+            raise StopUpload(connection_reset=True)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def content_too_large(request):
+    """True when the declared request size already rules the upload out."""
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return False
+    return length > max_upload_size() + MULTIPART_OVERHEAD
+
+
+def validate_image(file):
+    """
+    Check that ``file`` is an image Pillow can decode, in an allowed format.
+
+    Only the header is parsed (no pixels are decoded), so this is cheap even
+    for large photos. Raises ``ValueError`` with a client-facing message.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            image_format = image.format
+            image.verify()
+    except Image.DecompressionBombError as e:
+        raise ValueError("Image dimensions are too large.") from e
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise ValueError("Upload a valid image file.") from e
+    finally:
+        file.seek(0)
+    if image_format not in ALLOWED_FORMATS:
+        raise ValueError(f"Unsupported image format {image_format}; use JPEG, PNG, WebP or GIF.")
+
+
+# ============================
+# THUMBNAILS
+# ============================
+def thumbnail_urls(profile):
+    """
+    Return ``{label: url}`` for the profile's thumbnails.
+
+    Thumbnails record the picture they were made from, so ones left over
+    from a previous picture are hidden until the new set is ready.
+    """
+    thumbnails = profile.thumbnails or {}
+    if not profile.profile_pic or thumbnails.get('source') != profile.profile_pic.name:
+        return {}
+    storage = profile.profile_pic.storage
+    return {label: storage.url(name) for label, name in thumbnails.get('sizes', {}).items()}
+
+
+def render_thumbnails(source, sizes):
+    """Yield ``(label, edge, webp_bytes)`` for each size, decoding ``source`` once."""
+    with Image.open(source) as image:
+        # Let the JPEG decoder downscale while decoding, when it can
+        image.draft('RGB', (max(sizes.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+        for label, edge in sorted(sizes.items(), key=lambda item: -item[1]):
+            thumb = image.copy()
+            thumb.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            thumb.save(buffer, 'WEBP', quality=85)
+            yield label, edge, buffer.getvalue()
+
+
+def generate_thumbnails(profile_id, source_name):
+    """
+    Background task: write thumbnails of ``source_name`` and record them.
+
+    Does nothing if the profile has moved on to another picture by the time
+    the work is done; thumbnails of the picture being replaced are deleted.
+    """
+    from .authentication import user_cache
+    from .models import Profile
+
+    storage = Profile._meta.get_field('profile_pic').storage
+    stem = os.path.splitext(os.path.basename(source_name))[0]
+    sizes = {}
+    with storage.open(source_name) as source:
+        for label, edge, content in render_thumbnails(source, thumbnail_sizes()):
+            sizes[label] = storage.save(f'profile_pics/thumbs/{stem}_{edge}.webp', ContentFile(content))
+
+    current = Profile.objects.filter(pk=profile_id).values('user_id', 'thumbnails').first()
+    updated = Profile.objects.filter(pk=profile_id, profile_pic=source_name).update(
+        thumbnails={'source': source_name, 'sizes': sizes})
+    stale = sizes.values() if not updated else (current['thumbnails'] or {}).get('sizes', {}).values()
+    for name in stale:
+        storage.delete(name)
+    if updated:
+        # update() skips post_save, which is what normally evicts the user
+        user_cache.evict(current['user_id'])
+        logger.info("Generated %s thumbnails for profile %s", len(sizes), profile_id)
@@ -0,0 +1,170 @@
+import csv
+import io
+import time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import rollups
+from .bulk import create_rows
+from .models import Category, Expense, Income
+
+
+IMPORT_MODELS = {
+    'expense': Expense,
+    'income': Income,
+}
+
+# Only the first errors are returned in full; the rest are just counted
+MAX_REPORTED_ERRORS = 100
+
+
+def open_text(binary_file, encoding='utf-8-sig'):
+    """Wrap an uploaded/binary file so it can be read lazily line by line."""
+    return io.TextIOWrapper(binary_file, encoding=encoding, newline='')
+
+
+class LedgerImporter:
+    """
+    Import ledger rows from CSV for one user, streaming the input.
+
+    Expected columns: ``date``, ``amount`` and optionally ``kind``
+    (expense/income), ``category`` (a name) and ``description``. Files
+    produced by the CSV export are accepted as-is (``category_name`` is used
+    for the name there).
+
+    Rows are read lazily, validated ``batch_size`` at a time and written with
+    ``bulk_create`` in one transaction per batch, so memory use does not grow
+    with the size of the file. Categories are resolved through an in-memory
+    ``(name, type) -> id`` map and created on demand.
+    """
+
+    def __init__(self, user, batch_size=1000, default_kind=None, create_categories=True,
+                 rebuild_rollups=False):
+        self.user = user
+        self.batch_size = batch_size
+        self.default_kind = default_kind
+        self.create_categories = create_categories
+        # Large imports can skip per-batch rollup updates and rebuild once at the end
+        self.rebuild_rollups = rebuild_rollups
+
+        self.amount_field = Expense._meta.get_field('amount')
+        self.date_field = Expense._meta.get_field('date')
+        self.categories = {
+            (name.lower(), kind): pk
+            for pk, name, kind in Category.objects.filter(user=user).values_list('id', 'name', 'type')
+        }
+
+        self.rows_read = 0
+        self.rows_imported = 0
+        self.categories_created = 0
+        self.errors = []
+        self.error_count = 0
+
+    # ============================
+    # DRIVER
+    # ============================
+    def run(self, text_file):
+        """Import every row of ``text_file`` and return a report dict."""
+        started = time.monotonic()
+        reader = csv.DictReader(text_file)
+        if not reader.fieldnames or not {'date', 'amount'} <= {name.strip() for name in reader.fieldnames}:
+            raise ValidationError("CSV must have a header row with at least 'date' and 'amount' columns.")
+
+        # Data starts on line 2, after the header
+        numbered = enumerate(reader, start=2)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+
+        if self.rebuild_rollups and self.rows_imported:
+            rollups.rebuild(self.user)
+
+        elapsed = time.monotonic() - started
+        return {
+            'rows_read': self.rows_read,
+            'rows_imported': self.rows_imported,
+            'rows_failed': self.error_count,
+            'categories_created': self.categories_created,
+            'errors': self.errors,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.rows_imported / elapsed) if elapsed else None,
+        }
+
+    def import_batch(self, batch):
+        self.rows_read += len(batch)
+        parsed = []
+        for line, row in batch:
+            try:
+                parsed.append(self.parse_row(row))
+            except ValidationError as error:
+                self.add_error(line, error.messages)
+
+        with transaction.atomic():
+            self.resolve_categories(parsed)
+            for kind, model in IMPORT_MODELS.items():
+                instances = [
+                    model(user=self.user, date=date, amount=amount,
+                          category_id=self.categories.get((name.lower(), kind)) if name else None,
+                          description=description)
+                    for row_kind, date, amount, name, description in parsed
+                    if row_kind == kind
+                ]
+                if instances:
+                    create_rows(model, instances, update_rollups=not self.rebuild_rollups)
+                    self.rows_imported += len(instances)
+
+    # ============================
+    # ROW HANDLING
+    # ============================
+    def parse_row(self, row):
+        """Validate one CSV row into ``(kind, date, amount, category_name, description)``."""
+        # csv.DictReader files surplus fields as a list under the key None
+        if None in row:
+            raise ValidationError("Row has more fields than the header.")
+        row = {key.strip(): (value or '').strip() for key, value in row.items()}
+
+        kind = (row.get('kind') or self.default_kind or '').lower()
+        if kind not in IMPORT_MODELS:
+            raise ValidationError("kind must be 'expense' or 'income'.")
+
+        try:
+            amount = self.amount_field.clean(row.get('amount'), None)
+        except ValidationError as error:
+            raise ValidationError([f"amount: {message}" for message in error.messages])
+
+        try:
+            date = self.date_field.to_python(row.get('date') or None)
+        except ValidationError as error:
+            raise ValidationError([f"date: {message}" for message in error.messages])
+        if date is None:
+            raise ValidationError("date: This field is required.")
+        if timezone.is_naive(date):
+            date = timezone.make_aware(date)
+
+        name = row.get('category_name') or row.get('category') or ''
+        if name and not self.create_categories and (name.lower(), kind) not in self.categories:
+            raise ValidationError(f"category: Unknown category '{name}'.")
+
+        return kind, date, amount, name[:100], row.get('description') or None
+
+    def resolve_categories(self, parsed):
+        # Create every category this batch needs with a single insert
+        missing = {}
+        for kind, _date, _amount, name, _description in parsed:
+            if name and (name.lower(), kind) not in self.categories:
+                missing.setdefault((name.lower(), kind), Category(user=self.user, name=name, type=kind))
+        if not missing:
+            return
+        for category in Category.objects.bulk_create(missing.values()):
+            self.categories[(category.name.lower(), category.type)] = category.pk
+        self.categories_created += len(missing)
+
+    def add_error(self, line, messages):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': messages})
@@ -0,0 +1,257 @@
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('tracker.requests')
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open-ended
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = ContextVar('tracker_request_metrics', default=None)
+
+
+# ============================
+# PER-REQUEST METRICS
+# ============================
+class RequestMetrics:
+    """Counters for one request, filled in by the query wrapper and timers."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.view_ms = 0.0
+        # SQL text (with placeholders) -> executions, for N+1 detection
+        self.statements = Counter()
+        self._timer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() hook: time every query of the request
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def repeated_statements(self, threshold):
+        """Return ``[(sql, count)]`` for statements run at least ``threshold`` times."""
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def current():
+    """Return the metrics of the request being handled, if any."""
+    return _current.get()
+
+
+class TimedSerializerMixin:
+    """
+    Add the time spent validating and rendering a serializer to the request's
+    ``serializer_ms``. Nested serializers are only counted once.
+    """
+
+    def _timed(self, method):
+        metrics = _current.get()
+        if metrics is None:
+            return method()
+        metrics._timer_depth += 1
+        started = time.perf_counter()
+        try:
+            return method()
+        finally:
+            metrics._timer_depth -= 1
+            if not metrics._timer_depth:
+                metrics.serializer_ms += (time.perf_counter() - started) * 1000
+
+    def is_valid(self, *args, **kwargs):
+        return self._timed(lambda: super(TimedSerializerMixin, self).is_valid(*args, **kwargs))
+
+    @property
+    def data(self):
+        return self._timed(lambda: super(TimedSerializerMixin, self).data)
+
+
+# ============================
+# PER-ENDPOINT HISTOGRAMS
+# ============================
+_histograms_lock = threading.Lock()
+_histograms = {}
+
+
+def _record(endpoint, status_code, total_ms, metrics, n_plus_one):
+    with _histograms_lock:
+        entry = _histograms.get(endpoint)
+        if entry is None:
+            entry = _histograms[endpoint] = {
+                'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                'db_ms': 0.0, 'serializer_ms': 0.0, 'queries': 0, 'max_queries': 0, 'n_plus_one': 0,
+                'buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+        entry['count'] += 1
+        entry['errors'] += status_code >= 500
+        entry['total_ms'] += total_ms
+        entry['max_ms'] = max(entry['max_ms'], total_ms)
+        entry['db_ms'] += metrics.db_ms
+        entry['serializer_ms'] += metrics.serializer_ms
+        entry['queries'] += metrics.queries
+        entry['max_queries'] = max(entry['max_queries'], metrics.queries)
+        entry['n_plus_one'] += bool(n_plus_one)
+        entry['buckets'][bisect.bisect_left(LATENCY_BUCKETS, total_ms)] += 1
+
+
+def snapshot():
+    """Return per-endpoint counters, averages and latency histograms."""
+    with _histograms_lock:
+        endpoints = {name: dict(entry, buckets=list(entry['buckets'])) for name, entry in _histograms.items()}
+    for entry in endpoints.values():
+        count = entry['count']
+        entry['avg_ms'] = round(entry['total_ms'] / count, 2)
+        entry['avg_db_ms'] = round(entry['db_ms'] / count, 2)
+        entry['avg_serializer_ms'] = round(entry['serializer_ms'] / count, 2)
+        entry['avg_queries'] = round(entry['queries'] / count, 2)
+        entry['max_ms'] = round(entry['max_ms'], 2)
+        labels = [f'le_{bound}' for bound in LATENCY_BUCKETS] + ['le_inf']
+        entry['buckets'] = dict(zip(labels, entry['buckets']))
+        for raw in ('total_ms', 'db_ms', 'serializer_ms', 'queries'):
+            del entry[raw]
+    return endpoints
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+# ============================
+# MIDDLEWARE
+# ============================
+class RequestMetricsMiddleware:
+    """
+    Record query count, DB time, serializer time and view time per request.
+
+    The numbers go out as a ``Server-Timing`` header, one JSON log line on
+    the ``tracker.requests`` logger and the in-process histograms behind the
+    admin metrics endpoint. Statements repeated ``N_PLUS_ONE_THRESHOLD`` times
+    or more are logged as a likely N+1. The cost per query is one timer and a
+    counter increment, so it can stay on in production
+    (``REQUEST_METRICS=False`` turns it off).
+
+    Streaming responses are measured up to the point the stream starts.
+    Works in both sync (WSGI) and async (ASGI) stacks.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS', True)
+        self.threshold = getattr(settings, 'N_PLUS_ONE_THRESHOLD', 5)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+            # Spare the view hook a hop to a worker thread on every request
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, metrics)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics, started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # The async ORM runs queries on the request's sync thread, whose
+                # connections are not this thread's: wrap them over there
+                await sync_to_async(self.wrap_connections)(stack, metrics)
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    await sync_to_async(stack.pop_all().close)()
+        finally:
+            _current.reset(token)
+        self.finish(request, response, metrics, started)
+        return response
+
+    def wrap_connections(self, stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def finish(self, request, response, metrics, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        if getattr(request, '_metrics_view_started', None) is not None:
+            metrics.view_ms = (time.perf_counter() - request._metrics_view_started) * 1000
+        self.report(request, response, metrics, total_ms)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view_started = time.perf_counter()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Not via process_view: on async stacks that name is bound to this method
+        request._metrics_view_started = time.perf_counter()
+
+    def user_id(self, request):
+        # DRF puts the authenticated user on the underlying request
+        user = getattr(request, 'user', None)
+        return user.pk if getattr(user, 'is_authenticated', False) else None
+
+    def report(self, request, response, metrics, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        endpoint = f"{request.method} {match.route if match else '<unresolved>'}"
+        repeated = metrics.repeated_statements(self.threshold)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_ms:.1f};desc="{metrics.queries} queries"',
+            f'ser;dur={metrics.serializer_ms:.1f}',
+            f'view;dur={metrics.view_ms:.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+        _record(endpoint, response.status_code, total_ms, metrics, repeated)
+
+        logger.info(json.dumps({
+            'endpoint': endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'user': self.user_id(request),
+            'total_ms': round(total_ms, 2),
+            'view_ms': round(metrics.view_ms, 2),
+            'db_ms': round(metrics.db_ms, 2),
+            'serializer_ms': round(metrics.serializer_ms, 2),
+            'queries': metrics.queries,
+        }))
+        for sql, count in repeated:
+            logger.warning(json.dumps({
+                'event': 'n_plus_one',
+                'endpoint': endpoint,
+                'count': count,
+                'sql': sql[:500],
+            }))
@@ -0,0 +1,219 @@
+from datetime import timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import CharField, F, Q, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django_filters import utils as filter_utils
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from . import archive
+from .export import EXPORT_SOURCES
+from .models import DailyRollup
+from .pagination import KeysetPagination, decode_cursor, encode_cursor
+
+
+# Columns of a unified ledger row, in SELECT order
+LEDGER_COLUMNS = ('kind', 'id', 'date', 'amount', 'category_id', 'category_name', 'description')
+
+# Newest first; on the same timestamp incomes sort before expenses
+LEDGER_ORDER = ('date', 'kind', 'id')
+
+CENT = Decimal('0.01')
+
+
+def signed(kind, amount):
+    return amount if kind == 'income' else -amount
+
+
+def to_decimal(value):
+    # SQLite hands back numbers from a compound SELECT as int/float
+    return Decimal(str(value)).quantize(CENT)
+
+
+def to_datetime(value):
+    # ...and datetimes as the naive UTC text Django stored
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+# ============================
+# UNIFIED LEDGER
+# ============================
+class UnifiedLedger:
+    """
+    A user's expenses and incomes as one stream, newest first, with a
+    running balance (incomes minus expenses, oldest first).
+
+    Each kind keeps its own filter set, so the list endpoint filters apply
+    unchanged. A page is one statement: a keyset seek and ``LIMIT`` inside
+    each table (served by the ``(user, -date)`` indexes), a ``UNION ALL`` of
+    the two and a final sort and ``LIMIT``. The balance is the total of the
+    matching rows minus those newer than the row; the first page reads that
+    total from the daily rollup in a scalar subquery, later pages carry it in
+    the cursor.
+    """
+
+    def __init__(self, user, kinds, params, request=None):
+        self.user = user
+        self.filtersets = {}
+        for kind in kinds:
+            model, filterset_class = EXPORT_SOURCES[kind]
+            model = archive.source(model, params)
+            filterset = filterset_class(params, queryset=model.objects.filter(user=user), request=request)
+            if not filterset.is_valid():
+                raise filter_utils.translate_validation(filterset.errors)
+            self.filtersets[kind] = filterset
+
+    @property
+    def db(self):
+        return next(iter(self.filtersets.values())).qs.db
+
+    def branch(self, kind, position, limit):
+        """The filtered, seeked and limited rows of one kind."""
+        queryset = self.filtersets[kind].qs
+        if position:
+            date, cursor_kind, pk = position['date'], position['kind'], position['id']
+            if kind > cursor_kind:
+                seek = Q(date__lt=date)
+            elif kind < cursor_kind:
+                seek = Q(date__lte=date)
+            else:
+                seek = Q(date__lt=date) | Q(date=date, id__lt=pk)
+            queryset = queryset.filter(seek)
+        return (
+            queryset
+            .annotate(kind=Value(kind, output_field=CharField()), category_name=F('category__name'))
+            .order_by('-date', '-id')
+            .values(*LEDGER_COLUMNS)[:limit]
+        )
+
+    def total_query(self):
+        """
+        SQL and params for the net total of the matching rows.
+
+        Date and category filters map onto whole rollup rows; a search does
+        not, so it falls back to summing the matching rows themselves.
+        """
+        # Every kind was filtered with the same parameters
+        cleaned = next(iter(self.filtersets.values())).form.cleaned_data
+        if cleaned.get('search'):
+            parts, params = [], []
+            for kind, filterset in self.filtersets.items():
+                sql, branch_params = filterset.qs.order_by().values('amount').query.sql_with_params()
+                sign = '' if kind == 'income' else '-'
+                parts.append(f"{sign}(SELECT COALESCE(SUM(amount), 0) FROM ({sql}) AS {kind}_rows)")
+                params.extend(branch_params)
+            return ' + '.join(parts), params
+
+        rollups = DailyRollup.objects.filter(user=self.user, kind__in=list(self.filtersets))
+        first_days = [day for day in (cleaned.get('date_min'), cleaned.get('date__gte')) if day]
+        last_days = [day for day in (cleaned.get('date_max'), cleaned.get('date__lte')) if day]
+        if first_days:
+            rollups = rollups.filter(day__gte=max(first_days))
+        if last_days:
+            rollups = rollups.filter(day__lte=min(last_days))
+        if cleaned.get('category'):
+            rollups = rollups.filter(category=cleaned['category'])
+        sql, params = rollups.order_by().values('kind', 'total').query.sql_with_params()
+        return (
+            "(SELECT COALESCE(SUM(CASE WHEN kind = 'income' THEN total ELSE -total END), 0) "
+            f"FROM ({sql}) AS rollup_rows)"
+        ), params
+
+    def page(self, position, size):
+        """
+        Return ``(rows, next_position)`` for the ``size`` rows after
+        ``position`` (None for the newest page).
+
+        Rows are dicts of ``LEDGER_COLUMNS`` plus ``balance``.
+        """
+        connection = connections[self.db]
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(column) for column in LEDGER_COLUMNS)
+
+        branches, params = [], []
+        for kind in self.filtersets:
+            sql, branch_params = self.branch(kind, position, size + 1).query.sql_with_params()
+            branches.append(f"SELECT {columns} FROM ({sql}) AS {kind}_page")
+            params.extend(branch_params)
+
+        opening_sql, opening_params = ('NULL', []) if position else self.total_query()
+        order = ', '.join(f"{quote(column)} DESC" for column in LEDGER_ORDER)
+        sql = (
+            f"SELECT {columns}, {opening_sql} AS opening "
+            f"FROM ({' UNION ALL '.join(branches)}) AS ledger "
+            f"ORDER BY {order} LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*opening_params, *params, size + 1])
+            fetched = cursor.fetchall()
+
+        has_more = len(fetched) > size
+        balance = position['balance'] if position else None
+        rows = []
+        for *values, opening in fetched[:size]:
+            row = dict(zip(LEDGER_COLUMNS, values))
+            row['date'] = to_datetime(row['date'])
+            row['amount'] = to_decimal(row['amount'])
+            if balance is None:
+                balance = to_decimal(opening)
+            row['balance'] = balance
+            balance -= signed(row['kind'], row['amount'])
+            rows.append(row)
+
+        if not (has_more and rows):
+            return rows, None
+        last = rows[-1]
+        return rows, {'date': last['date'], 'kind': last['kind'], 'id': last['id'], 'balance': balance}
+
+
+# ============================
+# PAGINATION
+# ============================
+class UnifiedLedgerPagination(KeysetPagination):
+    """
+    Keyset pages over a ``UnifiedLedger``, keyed on ``(date, kind, id)``.
+
+    Pages only go forward: each cursor also carries the balance the next
+    page starts from, which is known only walking from the newest row.
+    """
+
+    def paginate_ledger(self, ledger, request):
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        token = request.query_params.get(self.cursor_query_param)
+        rows, self.next_position = ledger.page(self.decode(token) if token else None, self.get_page_size(request))
+        return rows
+
+    def decode(self, token):
+        position = decode_cursor(token)
+        try:
+            date = parse_datetime(str(position['d']))
+            kind, pk, balance = position['k'], position['i'], Decimal(position['b'])
+        except (KeyError, TypeError, InvalidOperation):
+            raise NotFound("Invalid cursor")
+        if date is None or kind not in EXPORT_SOURCES or not isinstance(pk, int) or not balance.is_finite():
+            raise NotFound("Invalid cursor")
+        return {'date': date, 'kind': kind, 'id': pk, 'balance': balance}
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        position = self.next_position
+        token = encode_cursor({
+            'd': position['date'].isoformat(), 'k': position['kind'], 'i': position['id'], 'b': str(position['balance']),
+        })
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker.archive import LedgerArchiver
+
+
+class Command(BaseCommand):
+    help = "Move expenses and incomes of past years into the archive tables, in batches. Safe to rerun."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before-year', type=int, help="Archive rows dated before 1 January of this year.")
+        parser.add_argument('--keep-years', type=int, default=1,
+                            help="Without --before-year: keep this many years, the current one included.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Ids moved per transaction.")
+        parser.add_argument('--settle-seconds', type=int,
+                            help="Wait for cached archive boundaries to expire; default ARCHIVE_BOUNDARY_CACHE_SECONDS.")
+
+    def handle(self, *args, **options):
+        this_year = timezone.localdate().year
+        before_year = options['before_year']
+        if before_year is None:
+            if options['keep_years'] < 1:
+                raise CommandError("--keep-years must be at least 1.")
+            before_year = this_year - options['keep_years'] + 1
+        if not 1900 < before_year <= this_year:
+            raise CommandError(f"--before-year must be between 1901 and {this_year}.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        report = LedgerArchiver(
+            before_year,
+            batch_size=options['batch_size'],
+            settle_seconds=options['settle_seconds'],
+        ).run()
+        self.stdout.write(
+            f"Archived {report['expenses']} expenses and {report['incomes']} incomes dated before "
+            f"{report['before']} in {report['batches']} batches ({report['elapsed_seconds']}s)."
+        )
@@ -0,0 +1,116 @@
+import json
+import platform
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from tracker import benchmarks
+from tracker.seeding import LedgerSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure latency percentiles and query counts for every API endpoint against the configured "
+        "database. All writes are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Benchmark as this (ideally seeded) user; default: the first seed-* user.")
+        parser.add_argument('--password', default='seed-password', help="The user's password, for the login scenario.")
+        parser.add_argument('--seed-rows', type=int, default=5000,
+                            help="Rows to seed for a temporary user when no seeded user exists.")
+        parser.add_argument('--iterations', type=int, default=20, help="Timed requests per scenario.")
+        parser.add_argument('--warmup', type=int, default=2, help="Untimed requests per scenario.")
+        parser.add_argument('--only', nargs='+', metavar='SCENARIO', help="Only run these scenarios.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--baseline', help="Fail when results regress against this JSON file (same format).")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Allowed p95 slowdown against the baseline, as a fraction.")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as source:
+                    baseline = json.load(source)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline: {e}")
+
+        # The test client needs 'testserver' in ALLOWED_HOSTS; uploads go to a scratch directory
+        try:
+            setup_test_environment()
+            owns_environment = True
+        except RuntimeError:  # Already running under the test runner
+            owns_environment = False
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+                with transaction.atomic():
+                    report = self.run(options)
+                    transaction.set_rollback(True)
+        finally:
+            if owns_environment:
+                teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                json.dump(report, target, indent=2)
+            self.stdout.write(f"Wrote {options['output']}.")
+
+        if baseline is not None:
+            failures = benchmarks.compare(report['results'], baseline, options['tolerance'])
+            for failure in failures:
+                self.stderr.write(f"REGRESSION {failure}")
+            if failures:
+                raise CommandError(f"{len(failures)} benchmark thresholds exceeded.")
+            self.stdout.write(self.style.SUCCESS("All scenarios within the baseline thresholds."))
+
+    def run(self, options):
+        user = self.bench_user(options)
+        fixtures = benchmarks.bench_fixtures(user, options['password'])
+        scenarios = benchmarks.scenarios(fixtures)
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios if scenario['name'] in options['only']]
+        for name in sorted(benchmarks.uncovered_urls(fixtures)):
+            self.stderr.write(f"Warning: no scenario exercises '{name}'.")
+
+        runner = benchmarks.EndpointBenchmark(fixtures, options['iterations'], options['warmup'])
+        results = {}
+        self.stdout.write(f"{'scenario':28} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>7}  status")
+        for scenario in scenarios:
+            result = results[scenario['name']] = runner.run(scenario)
+            self.stdout.write(
+                f"{scenario['name']:28} {result['p50_ms']:8.1f} {result['p95_ms']:8.1f} {result['p99_ms']:8.1f} "
+                f"{result['queries']:7}  {','.join(map(str, result['status']))}"
+            )
+
+        return {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'user': user.username,
+                'expenses': user.expenses.count(),
+                'incomes': user.incomes.count(),
+                'iterations': options['iterations'],
+            },
+            'results': results,
+        }
+
+    def bench_user(self, options):
+        if options['user']:
+            try:
+                return User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist.")
+        user = User.objects.filter(username__startswith='seed-').order_by('id').first()
+        if user is None:
+            # Seeded inside the benchmark transaction, so it is rolled back too
+            LedgerSeeder(users=1, rows=options['seed_rows'], prefix='bench', password=options['password']).run()
+            user = User.objects.filter(username__startswith='bench-').order_by('-id').first()
+        return user
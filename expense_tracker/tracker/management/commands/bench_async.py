@@ -0,0 +1,68 @@
+import logging
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import benchmarks
+from tracker.seeding import LedgerSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the summary and ledger list endpoints under concurrent load, served by "
+        "sync WSGI workers and by one ASGI event loop with ASYNC_VIEWS on. Read-only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Benchmark as this (ideally seeded) user; default: the first seed-* user.")
+        parser.add_argument('--seed-rows', type=int, default=2000,
+                            help="Rows to seed for a temporary user when no seeded user exists.")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per serving mode.")
+        parser.add_argument('--workers', type=int, default=4, help="Sync workers in the WSGI run.")
+        parser.add_argument('--concurrency', type=int, default=32, help="Requests in flight in the ASGI run.")
+        parser.add_argument('--db-latency-ms', type=float, default=0,
+                            help="Sleep added to every query, standing in for a remote database.")
+
+    def handle(self, *args, **options):
+        for option in ('requests', 'workers', 'concurrency'):
+            if options[option] < 1:
+                raise CommandError(f"--{option} must be at least 1.")
+
+        # Other threads read the data, so it has to be committed: a temporary
+        # user is deleted again afterwards
+        user, temporary = self.bench_user(options)
+        requests_logger = logging.getLogger('tracker.requests')
+        level = requests_logger.level
+        try:
+            runner = benchmarks.ConcurrencyBenchmark(
+                user, options['requests'], options['workers'], options['concurrency'], options['db_latency_ms'],
+            )
+            # One log line per request would drown the report
+            requests_logger.setLevel(logging.WARNING)
+            report = runner.run()
+        finally:
+            requests_logger.setLevel(level)
+            if temporary:
+                user.delete()
+
+        self.stdout.write(f"{'mode':6} {'shape':16} {'req/s':>8} {'p50':>8} {'p95':>8}  status")
+        for mode, shape in (('wsgi', f"{options['workers']} workers"), ('asgi', f"{options['concurrency']} in flight")):
+            result = report[mode]
+            self.stdout.write(
+                f"{mode:6} {shape:16} {result['requests_per_second']:8.1f} {result['p50_ms']:8.1f} "
+                f"{result['p95_ms']:8.1f}  {','.join(map(str, result['status']))}"
+            )
+        speedup = report['asgi']['requests_per_second'] / report['wsgi']['requests_per_second']
+        self.stdout.write(f"ASGI throughput is {speedup:.2f}x WSGI ({options['requests']} requests each).")
+
+    def bench_user(self, options):
+        if options['user']:
+            try:
+                return User.objects.get(username=options['user']), False
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist.")
+        user = User.objects.filter(username__startswith='seed-').order_by('id').first()
+        if user is not None:
+            return user, False
+        LedgerSeeder(users=1, rows=options['seed_rows'], prefix='bench-async').run()
+        return User.objects.filter(username__startswith='bench-async-').order_by('-id').first(), True
@@ -0,0 +1,58 @@
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from tracker import recurring
+from tracker.models import RecurringRule
+
+
+class Command(BaseCommand):
+    help = "Benchmark materialize_recurring against many synthetic rules (rolled back unless --keep)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rules', type=int, default=100_000, help="Number of synthetic rules to create.")
+        parser.add_argument('--days', type=int, default=1, help="Days of daily occurrences due per rule.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rules processed per transaction.")
+        parser.add_argument('--keep', action='store_true', help="Commit the generated data instead of rolling back.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+    def run(self, options):
+        today = timezone.localdate()
+        start = today - timedelta(days=options['days'] - 1)
+        user, _ = User.objects.get_or_create(username='bench-recurring')
+
+        started = time.monotonic()
+        RecurringRule.objects.bulk_create(
+            (
+                RecurringRule(user=user, kind='expense' if i % 2 else 'income', amount=10,
+                              frequency='daily', start_date=start, next_run=start)
+                for i in range(options['rules'])
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(f"Created {options['rules']} rules in {time.monotonic() - started:.2f}s.")
+
+        tracemalloc.start()
+        report = recurring.materialize(today, batch_size=options['batch_size'])
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        elapsed = report['elapsed_seconds'] or 0.001
+        self.stdout.write(
+            f"Materialized {report['rows_created']} rows from {report['rules_processed']} rules "
+            f"in {report['batches']} batches: {report['elapsed_seconds']}s "
+            f"({report['rules_processed'] / elapsed:.0f} rules/s), peak Python memory {peak / 2**20:.1f} MiB."
+        )
+
+        rerun = recurring.materialize(today, batch_size=options['batch_size'])
+        self.stdout.write(f"Rerun created {rerun['rows_created']} rows (expected 0).")
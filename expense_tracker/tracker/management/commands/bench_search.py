@@ -0,0 +1,70 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from tracker import search
+from tracker.models import Expense
+
+WORDS = (
+    'lunch dinner breakfast taxi uber bus fuel rent electricity water internet airtime data '
+    'groceries market supermarket pharmacy doctor school fees books gym netflix spotify gift '
+    'church wedding birthday repairs plumber mechanic tyres laundry salon barber shoes clothes'
+).split()
+
+
+class Command(BaseCommand):
+    help = "Compare indexed full-text search with icontains on a seeded ledger (rolled back afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help="Expenses to seed.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per query.")
+        parser.add_argument('--terms', nargs='+', default=['rent', 'lunch taxi', 'plumb', 'spotify netflix'])
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.run(options)
+            transaction.set_rollback(True)
+
+    def run(self, options):
+        rng = random.Random(42)
+        user, _ = User.objects.get_or_create(username='bench-search')
+        started = time.monotonic()
+        # Plain bulk_create: only the search index matters here, not the rollups
+        Expense.objects.bulk_create(
+            (
+                Expense(user=user, amount=1, description=' '.join(rng.choices(WORDS, k=rng.randint(2, 6))))
+                for _ in range(options['rows'])
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(f"Seeded {options['rows']} expenses in {time.monotonic() - started:.1f}s "
+                          f"(search backend: {search.search_backend()}).")
+
+        base = Expense.objects.filter(user=user)
+        for terms in options['terms']:
+            indexed = search.search(base, terms, user_id=user.pk).order_by('-search_rank', '-date', '-id')
+            contains = Q()
+            for token in search.tokenize(terms):
+                contains &= Q(description__icontains=token)
+            scanned = base.filter(contains).order_by('-date', '-id')
+
+            self.stdout.write(
+                f"{terms!r:20} full-text {self.time(indexed, options['repeat']):8.1f} ms   "
+                f"icontains {self.time(scanned, options['repeat']):8.1f} ms   "
+                f"({search.search(base, terms, user_id=user.pk).count()} matches)"
+            )
+
+    def time(self, queryset, repeat):
+        # What a list request costs: the match count plus the first page
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset.count()
+            list(queryset[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.importer import IMPORT_MODELS, LedgerImporter, open_text
+
+
+class Command(BaseCommand):
+    help = "Import expenses and incomes for a user from a CSV file, streaming it in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with date, amount and optional kind/category/description columns.")
+        parser.add_argument('--user', required=True, help="Username that will own the imported rows.")
+        parser.add_argument('--kind', choices=sorted(IMPORT_MODELS), help="Kind for rows without a kind column.")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows validated and inserted per chunk.")
+        parser.add_argument(
+            '--no-create-categories',
+            action='store_true',
+            help="Reject rows whose category does not exist instead of creating it.",
+        )
+        parser.add_argument(
+            '--rebuild-rollups',
+            action='store_true',
+            help="Skip per-chunk rollup updates and rebuild the user's rollup once at the end.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        importer = LedgerImporter(
+            user,
+            batch_size=options['batch_size'],
+            default_kind=options['kind'],
+            create_categories=not options['no_create_categories'],
+            rebuild_rollups=options['rebuild_rollups'],
+        )
+        try:
+            with open(options['path'], 'rb') as source:
+                report = importer.run(open_text(source))
+        except OSError as e:
+            raise CommandError(str(e))
+        except (ValidationError, UnicodeDecodeError) as e:
+            raise CommandError(f"Invalid CSV: {e}")
+
+        for error in report['errors']:
+            self.stderr.write(f"Line {error['line']}: {'; '.join(error['errors'])}")
+        self.stdout.write(
+            f"Imported {report['rows_imported']} of {report['rows_read']} rows "
+            f"({report['rows_failed']} failed, {report['categories_created']} categories created) "
+            f"in {report['elapsed_seconds']}s ({report['rows_per_second'] or 0} rows/s)."
+        )
@@ -0,0 +1,35 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyRollup table from the raw Expense/Income tables and verify it."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only rebuild the rollup of this username.")
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help="Compare the rollup with the raw tables without rewriting it.",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist.")
+
+        if not options['verify_only']:
+            buckets = rollups.rebuild(user)
+            self.stdout.write(f"Rebuilt {buckets} rollup buckets.")
+
+        mismatches = rollups.verify(user)
+        for key, expected, actual in mismatches[:20]:
+            self.stderr.write(f"Mismatch {key}: expected {expected}, found {actual}")
+        if mismatches:
+            raise CommandError(f"Rollup verification failed: {len(mismatches)} mismatched buckets.")
+        self.stdout.write(self.style.SUCCESS("Rollup matches the raw ledger tables."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.seeding import EXPENSE_CATEGORIES, LedgerSeeder
+
+
+class Command(BaseCommand):
+    help = "Generate a realistic multi-user ledger for development and benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help="Users to create.")
+        parser.add_argument('--categories', type=int, default=8,
+                            help=f"Expense categories per user (max {len(EXPENSE_CATEGORIES)}); half as many income ones.")
+        parser.add_argument('--rows', type=int, default=1000, help="Expenses plus incomes per user.")
+        parser.add_argument('--days', type=int, default=365, help="Spread rows over this many past days.")
+        parser.add_argument('--prefix', default='seed', help="Usernames are <prefix>-<n>.")
+        parser.add_argument('--password', default='seed-password', help="Password shared by the seeded users.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, for reproducible datasets.")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per INSERT batch.")
+
+    def handle(self, *args, **options):
+        if not 1 <= options['categories'] <= len(EXPENSE_CATEGORIES):
+            raise CommandError(f"--categories must be between 1 and {len(EXPENSE_CATEGORIES)}.")
+
+        report = LedgerSeeder(
+            users=options['users'],
+            categories=options['categories'],
+            rows=options['rows'],
+            days=options['days'],
+            prefix=options['prefix'],
+            password=options['password'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        ).run()
+        self.stdout.write(
+            f"Seeded {report['users']} users, {report['categories']} categories, {report['expenses']} expenses "
+            f"and {report['incomes']} incomes in {report['elapsed_seconds']}s "
+            f"({report['rows_per_second'] or 0} rows/s)."
+        )
@@ -21,6 +21,13 @@ class Category(models.Model):
     )
     name = models.CharField(max_length=100)
     type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    # Lets offline clients fetch only what changed (see the sync endpoint)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at', 'id'], name='category_user_updated'),
+        ]
 
     def __str__(self):
         # Display the name and whether it’s income or expense
@@ -33,6 +40,25 @@ class Category(models.Model):
 class Expense(models.Model):
     class Meta:
         ordering = ['-date']  # Newest expenses appear first
+        indexes = [
+            # Serves the per-user list views and date range filters
+            models.Index(fields=['user', '-date'], name='expense_user_date'),
+            # Category filters; also covers amount sums on backends with INCLUDE support
+            models.Index(
+                fields=['user', 'category', 'date'],
+                include=['amount'],
+                name='expense_user_category_date'
+            ),
+            # Delta sync walks changes in (updated_at, id) order
+            models.Index(fields=['user', 'updated_at', 'id'], name='expense_user_updated'),
+        ]
+        constraints = [
+            # A recurring rule materializes each occurrence at most once
+            models.UniqueConstraint(
+                fields=['recurring_rule', 'occurrence_date'],
+                name='expense_unique_occurrence'
+            ),
+        ]
 
     user = models.ForeignKey(
         User,
@@ -54,6 +80,16 @@ class Expense(models.Model):
     )
     description = models.TextField(blank=True, null=True)
     date = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set on rows generated by a recurring rule (see materialize_recurring)
+    recurring_rule = models.ForeignKey(
+        'RecurringRule',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='expenses'
+    )
+    occurrence_date = models.DateField(blank=True, null=True)
 
     def __str__(self):
         # Handle case where category might be deleted (avoids AttributeError)
@@ -67,6 +103,25 @@ class Expense(models.Model):
 class Income(models.Model):
     class Meta:
         ordering = ['-date']  # Newest incomes appear first
+        indexes = [
+            # Serves the per-user list views and date range filters
+            models.Index(fields=['user', '-date'], name='income_user_date'),
+            # Category filters; also covers amount sums on backends with INCLUDE support
+            models.Index(
+                fields=['user', 'category', 'date'],
+                include=['amount'],
+                name='income_user_category_date'
+            ),
+            # Delta sync walks changes in (updated_at, id) order
+            models.Index(fields=['user', 'updated_at', 'id'], name='income_user_updated'),
+        ]
+        constraints = [
+            # A recurring rule materializes each occurrence at most once
+            models.UniqueConstraint(
+                fields=['recurring_rule', 'occurrence_date'],
+                name='income_unique_occurrence'
+            ),
+        ]
 
     user = models.ForeignKey(
         User,
@@ -84,6 +139,16 @@ class Income(models.Model):
     )
     description = models.TextField(blank=True, null=True)
     date = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set on rows generated by a recurring rule (see materialize_recurring)
+    recurring_rule = models.ForeignKey(
+        'RecurringRule',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='incomes'
+    )
+    occurrence_date = models.DateField(blank=True, null=True)
 
     def __str__(self):
         # Handle case where category might be deleted
@@ -92,12 +157,325 @@ class Income(models.Model):
 
 
 
+# ============================
+# BUDGET MODEL
+# ============================
+class Budget(models.Model):
+    """
+    Spending limit for one expense category over a calendar period.
+
+    Spend-to-date is not stored here; it is read from the incrementally
+    maintained ``DailyRollup`` (see ``tracker.budgets``).
+    """
+    PERIOD_CHOICES = (
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='budgets'
+    )
+    # A budget is meaningless once its category is gone
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='budgets'
+    )
+    limit = models.DecimalField(max_digits=14, decimal_places=2)
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES, default='monthly')
+    # Percent of the limit at which the budget is reported as "warning"
+    alert_threshold = models.PositiveSmallIntegerField(default=80)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category', 'period'],
+                name='unique_budget_per_period'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.category.name} {self.period}: {self.limit}"
+
+
+# ============================
+# RECURRING RULE MODEL
+# ============================
+class RecurringRule(models.Model):
+    """
+    Schedule for an expense or income that repeats (rent, salary, subscriptions).
+
+    ``next_run`` is the next occurrence still to be created; the
+    ``materialize_recurring`` command turns due occurrences into rows and moves
+    it forward. It is None once the rule has run past its ``end_date``.
+    """
+    KIND_CHOICES = (
+        ('expense', 'Expense'),
+        ('income', 'Income'),
+    )
+    FREQUENCY_CHOICES = (
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recurring_rules'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='recurring_rules'
+    )
+    description = models.TextField(blank=True, null=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, default='monthly')
+    # Every n-th day/week/month/year
+    interval = models.PositiveSmallIntegerField(default=1)
+    start_date = models.DateField()
+    end_date = models.DateField(blank=True, null=True)
+    next_run = models.DateField(blank=True, null=True)
+    active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The scheduler scans due rules in id order
+            models.Index(fields=['next_run', 'id'], name='recurring_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.kind} {self.amount} every {self.interval} {self.frequency}"
+
+
+# ============================
+# TOMBSTONE MODEL
+# ============================
+class Tombstone(models.Model):
+    """
+    Record of a deleted expense, income or category.
+
+    Offline clients learn about deletions from these during delta sync.
+    """
+    KIND_CHOICES = (
+        ('expense', 'Expense'),
+        ('income', 'Income'),
+        ('category', 'Category'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='tombstones'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'id'], name='tombstone_user_deleted'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - deleted {self.kind} #{self.object_id}"
+
+
+# ============================
+# DAILY ROLLUP MODEL
+# ============================
+class DailyRollup(models.Model):
+    """
+    Pre-aggregated totals per user, local day, category and kind.
+
+    Kept up to date incrementally by the signals in ``tracker.signals`` so the
+    summary endpoints never have to rescan a user's full history.
+    """
+    KIND_CHOICES = (
+        ('income', 'Income'),
+        ('expense', 'Expense'),
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+    day = models.DateField()
+    # Rows for a deleted category are folded into the "No Category" bucket first
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='daily_rollups'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'day', 'category', 'kind'],
+                name='unique_daily_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'kind', 'day'], name='rollup_user_kind_day'),
+        ]
+
+    def __str__(self):
+        category_name = self.category.name if self.category else "No Category"
+        return f"{self.user.username} - {self.day} {self.kind} ({category_name}): {self.total}"
+
+
+# ============================
+# LEDGER VERSION MODEL
+# ============================
+class LedgerVersion(models.Model):
+    """
+    Per-user change counter for the ledger (expenses, incomes, categories).
+
+    Bumped on every write; conditional GETs compare against it to answer
+    304 Not Modified without running any list or aggregate query.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ledger_version'
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    modified_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.user.username} - v{self.version}"
+
+
+# ============================
+# ARCHIVE MODELS
+# ============================
+# Old expenses and incomes are moved out of the hot tables by
+# `manage.py archive_ledger` (see tracker.archive). Archived rows keep their
+# id and every column, are read-only and still count in the rollups.
+
+class ArchiveBoundary(models.Model):
+    """
+    Single row: ledger rows dated before 1 January of ``before_year`` (local
+    time) may have been moved to the archive tables. Rows on or after it
+    are always in the hot tables.
+    """
+    before_year = models.PositiveSmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Archived before {self.before_year}"
+
+
+class ArchivedLedgerRow(models.Model):
+    """Columns of an archived expense or income, identical to the hot table's."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    description = models.TextField(blank=True, null=True)
+    date = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    recurring_rule = models.ForeignKey(
+        'RecurringRule',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    occurrence_date = models.DateField(blank=True, null=True)
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedExpense(ArchivedLedgerRow):
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date'], name='archived_expense_user_date'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='archived_expense_user_updated'),
+        ]
+
+
+class ArchivedIncome(ArchivedLedgerRow):
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-date'], name='archived_income_user_date'),
+            models.Index(fields=['user', 'updated_at', 'id'], name='archived_income_user_updated'),
+        ]
+
+
+class LedgerHistoryRow(models.Model):
+    """
+    Read-only columns of a ``*_history`` view: the hot table ``UNION ALL``
+    its archive. The views are created after ``migrate``
+    (``tracker.archive.install_history_views``).
+    """
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    description = models.TextField(blank=True, null=True)
+    date = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    recurring_rule = models.ForeignKey(
+        'RecurringRule',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        blank=True,
+        null=True,
+        related_name='+'
+    )
+    occurrence_date = models.DateField(blank=True, null=True)
+
+    class Meta:
+        abstract = True
+
+
+class ExpenseHistory(LedgerHistoryRow):
+    class Meta:
+        managed = False
+        db_table = 'tracker_expense_history'
+        ordering = ['-date']
+
+
+class IncomeHistory(LedgerHistoryRow):
+    class Meta:
+        managed = False
+        db_table = 'tracker_income_history'
+        ordering = ['-date']
+
+
 # ============================
 # USER PROFILE MODEL
 # ============================
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     profile_pic = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    # {'source': <profile_pic name>, 'sizes': {label: storage name}}, filled in
+    # by a background task after each upload (see tracker.images)
+    thumbnails = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
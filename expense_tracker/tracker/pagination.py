@@ -0,0 +1,136 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# ============================
+# CURSOR TOKENS
+# ============================
+def encode_cursor(position):
+    """Serialize a cursor position dict into an opaque URL-safe token."""
+    raw = json.dumps(position, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Reverse ``encode_cursor``; raises ``NotFound`` for tampered tokens."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError):
+        raise NotFound("Invalid cursor")
+    # Valid JSON is not enough: every cursor we hand out is an object
+    if not isinstance(position, dict):
+        raise NotFound("Invalid cursor")
+    return position
+
+
+# ============================
+# KEYSET PAGINATION
+# ============================
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination over ``(date, id)``, newest first.
+
+    Each page is fetched with a ``WHERE (date, id) < (last_date, last_id)``
+    seek instead of an ``OFFSET``, so deep pages cost the same as the first
+    one, rows inserted while a client is paging never shift the window, and
+    no ``COUNT(*)`` is ever issued.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        page_size = self.get_page_size(request)
+
+        token = request.query_params.get(self.cursor_query_param)
+        position = decode_cursor(token) if token else None
+        reverse = bool(position and position.get('r'))
+
+        if position:
+            date = parse_datetime(str(position.get('d')))
+            pk = position.get('i')
+            if date is None or not isinstance(pk, int):
+                raise NotFound("Invalid cursor")
+            if reverse:
+                seek = Q(date__gt=date) | Q(date=date, id__gt=pk)
+            else:
+                seek = Q(date__lt=date) | Q(date=date, id__lt=pk)
+            queryset = queryset.filter(seek)
+
+        ordering = ('date', 'id') if reverse else ('-date', '-id')
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        # Walking backwards we came from a later page, and vice versa
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else position is not None
+        self.page = rows
+        return rows
+
+    def cursor_link(self, row, reverse):
+        token = encode_cursor({'d': row.date.isoformat(), 'i': row.pk, 'r': int(reverse)})
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.cursor_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.cursor_link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class LedgerPagination(PageNumberPagination):
+    """
+    Page-number pagination by default, keyset pagination on request.
+
+    Clients opt in with ``?pagination=cursor`` (or by following a ``cursor``
+    link), which keeps existing page-number clients working unchanged.
+    """
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return params.get('pagination') == 'cursor' or self.keyset_class.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_class() if self.use_keyset(request) else None
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,174 @@
+import calendar
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import archive
+from .bulk import create_rows
+from .models import Expense, Income, RecurringRule
+from .summary import local_midnight
+
+
+# Ledger model each rule kind materializes into
+RULE_MODELS = {
+    'expense': Expense,
+    'income': Income,
+}
+
+# Occurrences created per rule and run, so a long-paused rule cannot flood one batch
+MAX_CATCH_UP = 400
+
+
+# ============================
+# SCHEDULES
+# ============================
+def add_months(day, months, anchor_day):
+    """Move ``day`` by ``months``, clamping ``anchor_day`` to the month's length."""
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def next_occurrence(rule, day):
+    """Return the occurrence of ``rule`` that follows ``day``."""
+    if rule.frequency == 'daily':
+        return day + timedelta(days=rule.interval)
+    if rule.frequency == 'weekly':
+        return day + timedelta(weeks=rule.interval)
+    # Months and years step from the start date's day, so Jan 31 -> Feb 28 -> Mar 31
+    months = rule.interval * (12 if rule.frequency == 'yearly' else 1)
+    return add_months(day, months, rule.start_date.day)
+
+
+def due_occurrences(rule, today):
+    """
+    Return ``(occurrences, next_run)``: the due occurrence dates of ``rule``
+    up to ``today`` and the next one still to be created (None when finished).
+    """
+    occurrences = []
+    day = rule.next_run
+    while day is not None and day <= today and len(occurrences) < MAX_CATCH_UP:
+        occurrences.append(day)
+        day = next_occurrence(rule, day)
+        if rule.end_date and day > rule.end_date:
+            day = None
+    return occurrences, day
+
+
+def first_run(rule):
+    """Return the first occurrence of ``rule``, or None if its range is empty."""
+    if rule.end_date and rule.start_date > rule.end_date:
+        return None
+    return rule.start_date
+
+
+def resume_run(rule, today):
+    """
+    Return the occurrence of ``rule``'s (edited) schedule to continue from:
+    the first one from ``today`` on that is later than every occurrence
+    already created, so an edit neither backfills nor repeats. None if the
+    schedule has no such occurrence.
+    """
+    model = RULE_MODELS[rule.kind]
+    last = archive.source(model, {'date_min': today}).objects.filter(
+        recurring_rule=rule.pk, occurrence_date__gte=today,
+    ).aggregate(last=Max('occurrence_date'))['last']
+    floor = today if last is None else last + timedelta(days=1)
+
+    day = first_run(rule)
+    while day is not None and day < floor:
+        day = next_occurrence(rule, day)
+        if rule.end_date and day > rule.end_date:
+            day = None
+    return day
+
+
+# ============================
+# MATERIALIZATION
+# ============================
+def materialize(today=None, batch_size=1000, user=None):
+    """
+    Create the ledger rows of every due recurring rule.
+
+    Rules are processed ``batch_size`` at a time in id order, one transaction
+    per batch: due rules are locked (skipping ones another run already holds),
+    occurrences that already exist are skipped, the rest are written with
+    ``bulk_create`` and ``next_run`` is moved forward with ``bulk_update``.
+    The unique ``(recurring_rule, occurrence_date)`` constraint backs this up,
+    so reruns and overlapping runs never create duplicates.
+    """
+    today = today or timezone.localdate()
+    started = time.monotonic()
+    report = {'rules_processed': 0, 'rows_created': 0, 'batches': 0}
+
+    due = RecurringRule.objects.filter(active=True, next_run__lte=today)
+    if user is not None:
+        due = due.filter(user=user)
+
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            rules = list(
+                due.filter(id__gt=last_id)
+                .select_for_update(skip_locked=True)
+                .order_by('id')[:batch_size]
+            )
+            if not rules:
+                break
+            last_id = rules[-1].id
+            report['rows_created'] += materialize_batch(rules, today)
+        report['rules_processed'] += len(rules)
+        report['batches'] += 1
+
+    elapsed = time.monotonic() - started
+    report['elapsed_seconds'] = round(elapsed, 3)
+    return report
+
+
+def materialize_batch(rules, today):
+    """Write the due occurrences of ``rules`` (locked by the caller) and advance them."""
+    schedule = {rule.id: due_occurrences(rule, today) for rule in rules}
+    created = 0
+    for kind, model in RULE_MODELS.items():
+        batch = [rule for rule in rules if rule.kind == kind and schedule[rule.id][0]]
+        if not batch:
+            continue
+        start = min(rule.next_run for rule in batch)
+        # Past occurrences may have been archived, and the archive tables have
+        # no unique constraint to catch a re-created one
+        existing = set(
+            archive.source(model, {'date_min': start}).objects.filter(
+                recurring_rule__in=[rule.id for rule in batch],
+                occurrence_date__gte=start,
+            ).values_list('recurring_rule_id', 'occurrence_date')
+        )
+        rows = [
+            model(
+                user_id=rule.user_id,
+                amount=rule.amount,
+                category_id=rule.category_id,
+                description=rule.description,
+                date=local_midnight(day),
+                recurring_rule_id=rule.id,
+                occurrence_date=day,
+            )
+            for rule in batch
+            for day in schedule[rule.id][0]
+            if (rule.id, day) not in existing
+        ]
+        if rows:
+            created += len(create_rows(model, rows))
+
+    # Most rules advance to one of a few dates, so one UPDATE per distinct
+    # next_run is far cheaper than bulk_update()'s per-row CASE expression
+    advanced = defaultdict(list)
+    for rule in rules:
+        advanced[schedule[rule.id][1]].append(rule.id)
+    for next_run, ids in advanced.items():
+        RecurringRule.objects.filter(pk__in=ids).update(next_run=next_run)
+    return created
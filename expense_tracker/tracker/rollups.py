@@ -0,0 +1,225 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import archive, versioning
+from .models import DailyRollup, Expense, Income
+
+
+# Ledger models and the rollup ``kind`` they feed
+KIND_BY_MODEL = {
+    Expense: 'expense',
+    Income: 'income',
+}
+
+
+# ============================
+# ROLLUP KEYS
+# ============================
+def local_day(value):
+    """Return the local calendar day a stored ``date`` value falls on."""
+    value = Expense._meta.get_field('date').to_python(value)
+    if timezone.is_naive(value):
+        # Naive values are stored in the default timezone, just like Django does
+        value = timezone.make_aware(value, timezone.get_default_timezone())
+    return timezone.localdate(value)
+
+
+def rollup_key(kind, user_id, date, category_id):
+    return (user_id, local_day(date), category_id, kind)
+
+
+def snapshot(instance):
+    """Capture the fields of a ledger row that its rollup contribution depends on."""
+    return {
+        'user_id': instance.user_id,
+        'date': instance.date,
+        'category_id': instance.category_id,
+        'amount': instance.amount,
+    }
+
+
+# ============================
+# INCREMENTAL UPDATES
+# ============================
+def add_delta(deltas, kind, row, sign):
+    """Accumulate ``row`` (a snapshot dict) into ``deltas`` with the given sign."""
+    key = rollup_key(kind, row['user_id'], row['date'], row['category_id'])
+    amount = Expense._meta.get_field('amount').to_python(row['amount'])
+    entry = deltas[key]
+    entry[0] += sign * amount
+    entry[1] += sign
+
+
+def new_deltas():
+    return defaultdict(lambda: [Decimal('0'), 0])
+
+
+def apply_deltas(deltas):
+    """
+    Add each ``(total, count)`` delta to its rollup row, creating rows on demand.
+
+    Updates use ``F()`` expressions so concurrent writers never lose increments.
+    """
+    with transaction.atomic():
+        for (user_id, day, category_id, kind), (total, count) in deltas.items():
+            if not total and not count:
+                continue
+            _apply_one(user_id, day, category_id, kind, total, count)
+
+
+def _apply_one(user_id, day, category_id, kind, total, count):
+    lookup = dict(user_id=user_id, day=day, category_id=category_id, kind=kind)
+    row = (
+        DailyRollup.objects.select_for_update()
+        .filter(**lookup)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if row is None:
+        try:
+            # Savepoint so a concurrent insert of the same key can be retried
+            with transaction.atomic():
+                DailyRollup.objects.create(total=total, count=count, **lookup)
+            return
+        except IntegrityError:
+            row = DailyRollup.objects.filter(**lookup).order_by('pk').values_list('pk', flat=True).first()
+
+    DailyRollup.objects.filter(pk=row).update(total=F('total') + total, count=F('count') + count)
+    if count < 0:
+        # Drop buckets that no longer contain any rows
+        DailyRollup.objects.filter(pk=row, count=0).delete()
+
+
+def record(instances, sign=1):
+    """Add (``sign=1``) or remove (``sign=-1``) ledger rows from the rollup."""
+    deltas = new_deltas()
+    for instance in instances:
+        add_delta(deltas, KIND_BY_MODEL[type(instance)], snapshot(instance), sign)
+    apply_deltas(deltas)
+
+
+def record_rows(kind, rows, sign=1):
+    """Like ``record`` but for snapshot dicts, e.g. rows read with ``values()``."""
+    deltas = new_deltas()
+    for row in rows:
+        add_delta(deltas, kind, row, sign)
+    apply_deltas(deltas)
+
+
+def day_totals(queryset):
+    """Aggregate ledger rows into rollup buckets in the database: one row per user, local day and category."""
+    return (
+        queryset
+        .annotate(day=TruncDate('date', tzinfo=timezone.get_current_timezone()))
+        .values('user_id', 'day', 'category_id')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+
+
+# ============================
+# CATEGORY MERGES
+# ============================
+def merge_categories(user_id, source_ids, target_id):
+    """
+    Fold the rollup rows of ``source_ids`` into ``target_id``.
+
+    Four set-based statements, however many days the categories span:
+    buckets the target already has absorb the sources' totals, and for the
+    other days one source row per bucket is re-keyed to the target and
+    carries the sum of its siblings.
+    """
+    sources = DailyRollup.objects.filter(user_id=user_id, category_id__in=source_ids)
+    targets = DailyRollup.objects.filter(user_id=user_id, category_id=target_id)
+    bucket = sources.filter(day=OuterRef('day'), kind=OuterRef('kind')).order_by()
+    bucket_total = Subquery(bucket.values('kind').annotate(sum=Sum('total')).values('sum'))
+    bucket_count = Subquery(bucket.values('kind').annotate(sum=Sum('count')).values('sum'))
+
+    targets.filter(Exists(bucket)).update(total=F('total') + bucket_total, count=F('count') + bucket_count)
+    sources.filter(Exists(targets.filter(day=OuterRef('day'), kind=OuterRef('kind')))).delete()
+    keepers = sources.filter(pk=Subquery(bucket.order_by('pk').values('pk')[:1]))
+    keepers.update(total=bucket_total, count=bucket_count, category_id=target_id)
+    # Only the folded siblings are left under the source categories
+    sources.delete()
+
+
+# ============================
+# FULL REBUILD & VERIFICATION
+# ============================
+def raw_rollups(user=None):
+    """
+    Aggregate the raw ledger tables into rollup-shaped rows.
+
+    Returns a dict keyed like ``rollup_key`` with ``(total, count)`` values.
+    """
+    result = {}
+    for model, kind in KIND_BY_MODEL.items():
+        # Archived rows still count
+        queryset = archive.source(model).objects.all()
+        if user is not None:
+            queryset = queryset.filter(user=user)
+        for row in day_totals(queryset):
+            result[(row['user_id'], row['day'], row['category_id'], kind)] = (row['total'], row['count'])
+    return result
+
+
+def stored_rollups(user=None):
+    """Read the rollup table in the same shape as ``raw_rollups``."""
+    queryset = DailyRollup.objects.all()
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    rows = (
+        queryset
+        .values('user_id', 'day', 'category_id', 'kind')
+        .annotate(sum_total=Sum('total'), sum_count=Sum('count'))
+        .order_by()
+    )
+    return {
+        (row['user_id'], row['day'], row['category_id'], row['kind']): (row['sum_total'], row['sum_count'])
+        for row in rows
+        if row['sum_count']
+    }
+
+
+def rebuild(user=None, batch_size=1000):
+    """Recreate the rollup from scratch for one user, or for everyone."""
+    with transaction.atomic():
+        raw = raw_rollups(user)
+        existing = DailyRollup.objects.all()
+        if user is not None:
+            existing = existing.filter(user=user)
+        existing.delete()
+        DailyRollup.objects.bulk_create(
+            (
+                DailyRollup(user_id=user_id, day=day, category_id=category_id, kind=kind,
+                            total=total, count=count)
+                for (user_id, day, category_id, kind), (total, count) in raw.items()
+            ),
+            batch_size=batch_size,
+        )
+        # Summaries read the rollup, so their ETags and cache entries are stale now
+        versioning.ledger_changed([user.pk] if user is not None else None)
+    return len(raw)
+
+
+def verify(user=None):
+    """
+    Compare the rollup with the raw tables.
+
+    Returns a list of ``(key, expected, actual)`` tuples; empty means consistent.
+    """
+    raw = raw_rollups(user)
+    stored = stored_rollups(user)
+    mismatches = []
+    for key in raw.keys() | stored.keys():
+        expected = raw.get(key)
+        actual = stored.get(key)
+        if expected != actual:
+            mismatches.append((key, expected, actual))
+    return mismatches
@@ -0,0 +1,147 @@
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import SimpleLazyObject
+from rest_framework.permissions import SAFE_METHODS
+
+
+# Alias of the optional read replica in settings.DATABASES
+REPLICA = 'replica'
+
+# Where the current request's reads go; None leaves Django's default
+_read_alias = ContextVar('tracker_read_alias', default=None)
+
+
+def replica_configured():
+    """
+    True when a replica distinct from the primary is configured.
+
+    An alias that resolves to the primary's own database (a test mirror, or
+    the same URL twice) is no replica, and routing to it is skipped.
+    """
+    if REPLICA not in connections:
+        return False
+    primary, replica = connections[DEFAULT_DB_ALIAS].settings_dict, connections[REPLICA].settings_dict
+    return any(primary[key] != replica[key] for key in ('ENGINE', 'HOST', 'PORT', 'NAME'))
+
+
+# ============================
+# READ-YOUR-WRITES PINNING
+# ============================
+# A user who just wrote reads from the primary for REPLICA_STICKY_SECONDS,
+# so replication lag can never hide their own write from them. The marker
+# lives in the cache, which must be shared between workers for it to follow
+# the user across processes.
+
+def pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def pin_to_primary(user_id):
+    cache.set(pin_key(user_id), 1, getattr(settings, 'REPLICA_STICKY_SECONDS', 15))
+
+
+def pinned_to_primary(user_id):
+    return cache.get(pin_key(user_id)) is not None
+
+
+def read_from_replica(user):
+    """Send the rest of the current request's reads to the replica, unless ``user`` just wrote."""
+    if replica_configured() and user and user.is_authenticated and not pinned_to_primary(user.pk):
+        _read_alias.set(REPLICA)
+
+
+class ReplicaRouter:
+    """
+    Database router for an optional read replica.
+
+    Writes always go to the primary. Reads go to the replica only inside a
+    request that opted in through ``read_from_replica()`` (see
+    ``ReplicaReadMixin``); everything else, commands and background tasks
+    included, reads from the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Also for instances that were loaded from the replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        aliases = {DEFAULT_DB_ALIAS, REPLICA}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    DRF view mixin: serve the view's GET/HEAD reads from the replica.
+
+    The decision is made right after authentication, before any other read
+    (the conditional GET version stamp included), so a response and its
+    ETag always come from the same database.
+    """
+
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
+        if request.method in SAFE_METHODS:
+            read_from_replica(request.user)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Scope replica routing to one request and pin users who write.
+
+    Any unsafe request by an authenticated user pins them to the primary,
+    whether or not it ended up changing anything. Streaming responses read
+    from the primary once the view has returned.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        writer = self.writer(request)
+        if writer is not None:
+            pin_to_primary(writer)
+        return response
+
+    async def __acall__(self, request):
+        token = _read_alias.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        writer = self.writer(request)
+        if writer is not None:
+            await sync_to_async(pin_to_primary)(writer)
+        return response
+
+    def writer(self, request):
+        """Return the id of the user to pin after ``request``, if any."""
+        if request.method in SAFE_METHODS or not replica_configured():
+            return None
+        # DRF hands the user it authenticated back to the Django request; a
+        # still-lazy user means DRF never ran, and resolving it could query
+        user = request.__dict__.get('user')
+        if user is None or isinstance(user, SimpleLazyObject) or not user.is_authenticated:
+            return None
+        return user.pk
@@ -0,0 +1,195 @@
+import re
+
+from django.db import connections
+from django.db.models import F, FloatField, Func, Q
+from django.db.models.expressions import RawSQL
+
+from . import archive
+from .models import ArchivedExpense, ArchivedIncome, Expense, Income
+
+
+# Ledger tables with a searchable description; archive tables are indexed
+# too, so search ranks and matches the same way before and after archiving
+SEARCH_MODELS = (Expense, Income, ArchivedExpense, ArchivedIncome)
+
+# Search terms are reduced to plain word tokens, so user input can never
+# produce tsquery/FTS5 syntax errors
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKENS = 8
+
+
+def tokenize(terms):
+    return TOKEN_RE.findall(terms.lower())[:MAX_TOKENS]
+
+
+# ============================
+# INDEX INSTALLATION
+# ============================
+# The project ships no migrations, so the backend-specific search structures
+# are created after ``migrate`` instead of being declared on the models.
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def indexed_parts(model):
+    """The indexed tables holding ``model``'s rows: a history view's hot table and archive, or itself."""
+    for hot, (archived, history) in archive.ARCHIVES.items():
+        if model is history:
+            return [hot, archived]
+    return [model]
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('description', config='simple')
+
+
+def install_search_indexes(sender=None, using='default', **kwargs):
+    """``post_migrate`` handler: create the full-text index for each ledger table."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        _install_gin_indexes(connection)
+    elif connection.vendor == 'sqlite':
+        _install_fts5_tables(connection)
+    _backends.pop(using, None)
+
+
+def _install_gin_indexes(connection):
+    from django.contrib.postgres.indexes import GinIndex
+
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        for model in SEARCH_MODELS:
+            name = f'{model._meta.model_name}_description_fts'
+            if model._meta.db_table not in tables:
+                continue
+            existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+            if name in existing:
+                continue
+            # The schema editor renders the same to_tsvector() expression that
+            # search() filters on, so the planner can match the index
+            with connection.schema_editor() as editor:
+                editor.add_index(model, GinIndex(search_vector(), name=name))
+
+
+def _install_fts5_tables(connection):
+    with connection.cursor() as cursor:
+        tables = connection.introspection.table_names(cursor)
+        for model in SEARCH_MODELS:
+            table, fts = model._meta.db_table, fts_table(model)
+            # The tracker tables may not exist yet (e.g. apps without migrations)
+            if table not in tables or fts in tables:
+                continue
+            # External-content FTS5 table kept in sync by triggers, so it also
+            # follows bulk_create() and raw deletes. user_id is indexed as a
+            # token so a MATCH can be narrowed to one user's rows.
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5(user_id, description, content='{table}', content_rowid='id')"
+            )
+            cursor.execute(f"""
+                CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, user_id, description)
+                    VALUES (new.id, new.user_id, coalesce(new.description, ''));
+                END""")
+            cursor.execute(f"""
+                CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, user_id, description)
+                    VALUES ('delete', old.id, old.user_id, coalesce(old.description, ''));
+                END""")
+            cursor.execute(f"""
+                CREATE TRIGGER {fts}_au AFTER UPDATE OF user_id, description ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, user_id, description)
+                    VALUES ('delete', old.id, old.user_id, coalesce(old.description, ''));
+                    INSERT INTO {fts}(rowid, user_id, description)
+                    VALUES (new.id, new.user_id, coalesce(new.description, ''));
+                END""")
+            # Index rows that existed before the table was created
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+# ============================
+# QUERYING
+# ============================
+class FtsRank(Func):
+    """
+    A row's ``-bm25()`` (higher is better) for ``match``, looked up by rowid
+    in the first of ``tables`` (FTS5) that holds it. The ledger id is
+    compiled like any column, so the expression keeps working when the
+    queryset is aliased as a subquery.
+    """
+    output_field = FloatField()
+
+    def __init__(self, tables, match, rowid='id'):
+        self.tables, self.match = tables, match
+        super().__init__(F(rowid))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        rowid, params = compiler.compile(self.source_expressions[0])
+        lookups = [
+            f'(SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {rowid})'
+            for fts in self.tables
+        ]
+        sql = lookups[0] if len(lookups) == 1 else f"COALESCE({', '.join(lookups)})"
+        return sql, [param for _ in lookups for param in (self.match, *params)]
+
+
+_backends = {}
+
+
+def search_backend(using='default'):
+    """Return ``'postgresql'``, ``'fts5'`` or ``'icontains'`` for a database alias."""
+    if using not in _backends:
+        connection = connections[using]
+        backend = 'icontains'
+        if connection.vendor == 'postgresql':
+            backend = 'postgresql'
+        elif connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                tables = connection.introspection.table_names(cursor)
+                if all(fts_table(model) in tables for model in SEARCH_MODELS):
+                    backend = 'fts5'
+        _backends[using] = backend
+    return _backends[using]
+
+
+def search(queryset, terms, user_id=None):
+    """
+    Filter ``queryset`` to rows whose description contains every word of
+    ``terms`` (prefix matches included), annotated with a ``search_rank``
+    where higher is better. Pass the owner's ``user_id`` when the queryset is
+    limited to one user, so the index lookup is too.
+    """
+    tokens = tokenize(terms)
+    if not tokens:
+        return queryset
+    backend = search_backend(queryset.db)
+
+    if backend == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        query = SearchQuery(' & '.join(f'{token}:*' for token in tokens), config='simple', search_type='raw')
+        return (
+            queryset.annotate(search_vector=search_vector())
+            .filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F('search_vector'), query))
+        )
+
+    if backend == 'fts5':
+        tables = [fts_table(part) for part in indexed_parts(queryset.model)]
+        match = 'description : (' + ' '.join(f'"{token}"*' for token in tokens) + ')'
+        if user_id is not None:
+            match = f'user_id : "{int(user_id)}" AND {match}'
+        # The MATCH drives: the id list comes straight from the FTS indexes
+        # (archived rows keep their ids, so hot and archive never collide),
+        # and only matching rows look up their rank
+        ids = ' UNION ALL '.join(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s' for fts in tables)
+        return (
+            queryset
+            .filter(id__in=RawSQL(ids, [match] * len(tables)))
+            .annotate(search_rank=FtsRank(tables, match))
+        )
+
+    q = Q()
+    for token in tokens:
+        q &= Q(description__icontains=token)
+    return queryset.filter(q)
@@ -0,0 +1,153 @@
+import random
+import re
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import rollups
+from .models import Category, Expense, Income, Profile
+
+
+# Category names per kind, with a (low, high) amount range in NGN
+EXPENSE_CATEGORIES = {
+    'Food': (500, 15_000),
+    'Transport': (300, 8_000),
+    'Rent': (80_000, 400_000),
+    'Utilities': (2_000, 40_000),
+    'Airtime & Data': (500, 10_000),
+    'Health': (1_000, 60_000),
+    'Shopping': (2_000, 120_000),
+    'Entertainment': (1_000, 30_000),
+    'Education': (5_000, 250_000),
+    'Gifts': (1_000, 50_000),
+}
+INCOME_CATEGORIES = {
+    'Salary': (150_000, 1_200_000),
+    'Freelance': (20_000, 400_000),
+    'Investments': (5_000, 200_000),
+    'Gifts': (2_000, 100_000),
+}
+DESCRIPTION_WORDS = (
+    'lunch dinner breakfast taxi bus fuel rent electricity water internet airtime data groceries '
+    'market supermarket pharmacy doctor school fees books gym subscription gift church wedding '
+    'birthday repairs plumber mechanic laundry salon shoes clothes bonus invoice dividend transfer'
+).split()
+
+# Share of generated rows that are incomes
+INCOME_SHARE = 0.1
+
+
+class LedgerSeeder:
+    """
+    Generate a realistic multi-user ledger with ``bulk_create``.
+
+    Users are named ``<prefix>-<n>`` and all share one password. Rows are
+    spread over the last ``days`` days and written ``batch_size`` at a time;
+    each user's rollup is rebuilt once at the end instead of being updated
+    row by row. A fixed ``seed`` makes the dataset reproducible.
+    """
+
+    def __init__(self, users=10, categories=8, rows=1000, days=365, prefix='seed',
+                 password='seed-password', seed=0, batch_size=5000):
+        self.users = users
+        self.categories = categories
+        self.rows = rows
+        self.days = days
+        self.prefix = prefix
+        self.password = password
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+
+    def run(self):
+        """Create the dataset and return a report dict."""
+        started = time.monotonic()
+        with transaction.atomic():
+            users = self.create_users()
+            categories = self.create_categories(users)
+            counts = {Expense: 0, Income: 0}
+            for model, batch in self.ledger_batches(users, categories):
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+                counts[model] += len(batch)
+            for user in users:
+                rollups.rebuild(user)
+
+        elapsed = time.monotonic() - started
+        total = counts[Expense] + counts[Income]
+        return {
+            'users': len(users),
+            'categories': sum(len(owned) for owned in categories.values()),
+            'expenses': counts[Expense],
+            'incomes': counts[Income],
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(total / elapsed) if elapsed else None,
+        }
+
+    # ============================
+    # GENERATORS
+    # ============================
+    def create_users(self):
+        # Number on from the highest taken suffix; a count would collide once
+        # any seeded user was deleted
+        taken = User.objects.filter(username__regex=rf'^{re.escape(self.prefix)}-[0-9]+$')
+        existing = max((int(name.rsplit('-', 1)[1]) + 1 for name in taken.values_list('username', flat=True)),
+                       default=0)
+        # Hash once: every seeded user gets the same password
+        password = make_password(self.password)
+        users = User.objects.bulk_create(
+            User(username=f'{self.prefix}-{existing + n}', email=f'{self.prefix}-{existing + n}@example.com',
+                 password=password)
+            for n in range(self.users)
+        )
+        # bulk_create() skips the post_save signal that normally adds the profile
+        Profile.objects.bulk_create(Profile(user=user) for user in users)
+        return users
+
+    def create_categories(self, users):
+        expense_names = list(EXPENSE_CATEGORIES)[:self.categories]
+        income_names = list(INCOME_CATEGORIES)[:max(1, self.categories // 2)]
+        created = Category.objects.bulk_create(
+            [Category(user=user, name=name, type='expense') for user in users for name in expense_names]
+            + [Category(user=user, name=name, type='income') for user in users for name in income_names],
+            batch_size=self.batch_size,
+        )
+        categories = {user.pk: [] for user in users}
+        for category in created:
+            categories[category.user_id].append(category)
+        return categories
+
+    def ledger_batches(self, users, categories):
+        """Yield ``(model, instances)`` batches covering every user's rows."""
+        now = timezone.now()
+        pending = {Expense: [], Income: []}
+        for user in users:
+            owned = {
+                'expense': [c for c in categories[user.pk] if c.type == 'expense'],
+                'income': [c for c in categories[user.pk] if c.type == 'income'],
+            }
+            for _ in range(self.rows):
+                model = Income if self.random.random() < INCOME_SHARE else Expense
+                pending[model].append(self.row(model, user, owned, now))
+                if len(pending[model]) >= self.batch_size:
+                    yield model, pending[model]
+                    pending[model] = []
+        for model, batch in pending.items():
+            if batch:
+                yield model, batch
+
+    def row(self, model, user, owned, now):
+        kind = 'income' if model is Income else 'expense'
+        ranges = INCOME_CATEGORIES if model is Income else EXPENSE_CATEGORIES
+        # A few rows have no category, like real data
+        category = self.random.choice(owned[kind]) if owned[kind] and self.random.random() > 0.05 else None
+        low, high = ranges[category.name] if category else (100, 20_000)
+        amount = Decimal(self.random.triangular(low, high, low + (high - low) / 5)).quantize(Decimal('0.01'))
+        description = None
+        if self.random.random() > 0.2:
+            description = ' '.join(self.random.choices(DESCRIPTION_WORDS, k=self.random.randint(1, 5)))
+        date = now - timedelta(seconds=self.random.randint(0, self.days * 86400))
+        return model(user=user, category=category, amount=amount, description=description, date=date)
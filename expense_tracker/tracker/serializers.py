@@ -1,6 +1,22 @@
-from .models import Expense, Category, Income, Profile
+from .models import Budget, Expense, Category, Income, Profile, RecurringRule
+from . import budgets, images, recurring
+from .instrumentation import TimedSerializerMixin
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from django.utils import timezone
+from datetime import timedelta
+
+
+# ============================
+# TIMED BASE CLASSES
+# ============================
+# Serializer time shows up in the Server-Timing header and request metrics
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+class TimedModelSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    pass
 
 
 # ============================
@@ -46,29 +62,69 @@ class RegisterSerializer(serializers.ModelSerializer):
 # ============================
 # SIMPLE USER DATA SERIALIZER
 # ============================
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedModelSerializer):
     profile_pic = serializers.SerializerMethodField()
+    profile_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'profile_pic']
+        fields = ['id', 'username', 'email', 'first_name', 'profile_pic', 'profile_thumbnails']
 
     def get_profile_pic(self, obj):
         if hasattr(obj, 'profile') and obj.profile.profile_pic:
             return obj.profile.profile_pic.url
         return None
 
+    def get_profile_thumbnails(self, obj):
+        # Empty until the background task has resized the current picture
+        if hasattr(obj, 'profile'):
+            return images.thumbnail_urls(obj.profile)
+        return {}
+
+
+# ============================
+# CATEGORY REFERENCE FIELD
+# ============================
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category reference restricted to the requesting user's own categories.
+
+    Batch endpoints pass a prefetched ``category_map`` in the serializer
+    context so validating hundreds of rows costs one category query in total.
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Category.objects.none()
+        return Category.objects.filter(user=request.user)
+
+    def to_internal_value(self, data):
+        category_map = self.context.get('category_map')
+        if category_map is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return category_map[int(data)]
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+
 
 # ============================
 # EXPENSE SERIALIZER
 # ============================
-class ExpenseSerializer(serializers.ModelSerializer):
+class ExpenseSerializer(TimedModelSerializer):
+    category = UserCategoryField(required=False, allow_null=True)
     category_name = serializers.SerializerMethodField()
 
     class Meta:
         model = Expense
-        fields = ['id', 'user', 'amount', 'category', 'category_name', 'description', 'date']
+        fields = ['id', 'user', 'amount', 'category', 'category_name', 'description', 'date', 'updated_at']
         read_only_fields = ['user']  # Ensures users can't create expenses for others
+        list_serializer_class = TimedListSerializer
 
     def get_category_name(self, obj):
         try:
@@ -80,26 +136,198 @@ class ExpenseSerializer(serializers.ModelSerializer):
 # ============================
 # CATEGORY SERIALIZER
 # ============================
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedModelSerializer):
     class Meta:
         model = Category
-        fields = ['id', 'name', 'user', 'type']
+        fields = ['id', 'name', 'user', 'type', 'updated_at']
         read_only_fields = ['user']  # Link to user automatically in view
+        list_serializer_class = TimedListSerializer
+
+
+class CategoryMergeSerializer(serializers.Serializer):
+    """Merge request: ``sources`` (category ids) are folded into ``target``."""
+    MAX_SOURCES = 100
+
+    target = UserCategoryField()
+    sources = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=MAX_SOURCES)
+
+    def validate(self, attrs):
+        target, ids = attrs['target'], set(attrs['sources'])
+        if target.pk in ids:
+            raise serializers.ValidationError({"sources": "A category can't be merged into itself."})
+        # One query for every source, limited to the user's own categories
+        sources = list(Category.objects.filter(user=target.user_id, pk__in=ids))
+        missing = ids - {category.pk for category in sources}
+        if missing:
+            raise serializers.ValidationError({"sources": f"Unknown categories: {sorted(missing)}."})
+        if any(category.type != target.type for category in sources):
+            raise serializers.ValidationError({"sources": "Only categories of the same type can be merged."})
+        attrs['sources'] = sources
+        return attrs
+
+
+class RecategorizeSerializer(serializers.Serializer):
+    """Bulk re-categorization: the category (or null) every matching row moves to."""
+    category = UserCategoryField(allow_null=True)
 
 
 
 # ============================
 # INCOME SERIALIZER
 # ============================
-class IncomeSerializer(serializers.ModelSerializer):
+class IncomeSerializer(TimedModelSerializer):
+    category = UserCategoryField(required=False, allow_null=True)
     category_name = serializers.SerializerMethodField()
 
     class Meta:
         model = Income
-        fields = ['id', 'user', 'amount', 'category', 'category_name', 'description', 'date']
+        fields = ['id', 'user', 'amount', 'category', 'category_name', 'description', 'date', 'updated_at']
         read_only_fields = ['user']  # Prevent users from assigning income to others
+        list_serializer_class = TimedListSerializer
 
     def get_category_name(self, obj):
         return obj.category.name if obj.category else "No Category"
 
 
+# ============================
+# UNIFIED LEDGER SERIALIZER
+# ============================
+class LedgerEntrySerializer(TimedSerializerMixin, serializers.Serializer):
+    """A row of ``tracker.ledger.UnifiedLedger`` (a dict, not a model instance)."""
+    kind = serializers.CharField()
+    id = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    category = serializers.IntegerField(source='category_id', allow_null=True)
+    category_name = serializers.SerializerMethodField()
+    description = serializers.CharField(allow_null=True)
+    date = serializers.DateTimeField()
+    balance = serializers.DecimalField(max_digits=16, decimal_places=2)
+
+    class Meta:
+        list_serializer_class = TimedListSerializer
+
+    def get_category_name(self, row):
+        return row['category_name'] or "No Category"
+
+
+
+# ============================
+# BUDGET SERIALIZER
+# ============================
+class BudgetListSerializer(TimedListSerializer):
+    def to_representation(self, data):
+        # Evaluate every budget on the page with one spend query
+        items = list(data.all() if hasattr(data, 'all') else data)
+        self._context['budget_status'] = budgets.evaluate(items)
+        return super().to_representation(items)
+
+
+class BudgetSerializer(TimedModelSerializer):
+    category = UserCategoryField()
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    alert_threshold = serializers.IntegerField(min_value=1, max_value=100, default=80)
+
+    class Meta:
+        model = Budget
+        fields = ['id', 'category', 'category_name', 'limit', 'period', 'alert_threshold', 'updated_at']
+        list_serializer_class = BudgetListSerializer
+
+    def validate_limit(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Limit must be greater than zero.")
+        return value
+
+    def validate(self, attrs):
+        category = attrs.get('category', getattr(self.instance, 'category', None))
+        period = attrs.get('period', getattr(self.instance, 'period', 'monthly'))
+        if category.type != 'expense':
+            raise serializers.ValidationError({"category": "Budgets can only track expense categories."})
+
+        duplicates = Budget.objects.filter(category=category, period=period)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError({"period": "This category already has a budget for that period."})
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        status = self.context.get('budget_status', {}).get(instance.pk)
+        if status is None:
+            status = budgets.evaluate([instance])[instance.pk]
+        data.update(status)
+        return data
+
+
+# ============================
+# RECURRING RULE SERIALIZER
+# ============================
+class RecurringRuleSerializer(TimedModelSerializer):
+    # Changing any of these moves next_run onto the new schedule
+    SCHEDULE_FIELDS = ('start_date', 'end_date', 'frequency', 'interval')
+
+    category = UserCategoryField(required=False, allow_null=True)
+    interval = serializers.IntegerField(min_value=1, max_value=366, default=1)
+
+    class Meta:
+        model = RecurringRule
+        fields = ['id', 'kind', 'amount', 'category', 'description', 'frequency', 'interval',
+                  'start_date', 'end_date', 'next_run', 'active', 'updated_at']
+        read_only_fields = ['next_run']
+        list_serializer_class = TimedListSerializer
+
+    def validate(self, attrs):
+        def current(name):
+            return attrs.get(name, getattr(self.instance, name, None))
+
+        category = current('category')
+        if category is not None and category.type != current('kind'):
+            raise serializers.ValidationError({"category": "Category type must match the rule kind."})
+        if current('end_date') and current('start_date') and current('end_date') < current('start_date'):
+            raise serializers.ValidationError({"end_date": "End date must not be before start date."})
+        return attrs
+
+    def create(self, validated_data):
+        rule = RecurringRule(**validated_data)
+        rule.next_run = recurring.first_run(rule)
+        rule.save()
+        return rule
+
+    def update(self, instance, validated_data):
+        # A PUT resends every field, so only a changed value counts
+        if any(name in validated_data and validated_data[name] != getattr(instance, name)
+               for name in self.SCHEDULE_FIELDS):
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            validated_data['next_run'] = recurring.resume_run(instance, timezone.localdate())
+        return super().update(instance, validated_data)
+
+
+# ============================
+# TIME SERIES QUERY SERIALIZER
+# ============================
+class TimeSeriesQuerySerializer(serializers.Serializer):
+    # Default range per interval when ?start= is omitted
+    DEFAULT_SPANS = {'day': 30, 'week': 12 * 7, 'month': 365, 'year': 5 * 365}
+    MAX_BUCKETS = 1000
+
+    interval = serializers.ChoiceField(choices=['day', 'week', 'month', 'year'], default='month')
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    by_category = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        end = attrs.get('end') or timezone.localdate()
+        start = attrs.get('start') or end - timedelta(days=self.DEFAULT_SPANS[attrs['interval']])
+        if start > end:
+            raise serializers.ValidationError({"start": "Start must not be after end."})
+
+        # Keep zero-filled responses bounded
+        span_days = (end - start).days
+        approximate_buckets = {'day': span_days, 'week': span_days // 7, 'month': span_days // 28,
+                               'year': span_days // 365}[attrs['interval']]
+        if approximate_buckets > self.MAX_BUCKETS:
+            raise serializers.ValidationError({"interval": f"At most {self.MAX_BUCKETS} buckets per request."})
+
+        attrs['start'], attrs['end'] = start, end
+        return attrs
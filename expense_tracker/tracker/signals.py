@@ -0,0 +1,127 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import rollups, summary_cache, versioning
+from .authentication import user_cache
+from .models import ArchivedExpense, ArchivedIncome, Category, DailyRollup, Expense, Income, Profile, Tombstone
+
+
+def deleting_user(origin):
+    """True when a delete cascades from removing a whole user account."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, User)
+
+
+# ============================
+# LEDGER ROLLUP MAINTENANCE
+# ============================
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Income)
+def remember_previous_values(sender, instance, **kwargs):
+    # Updates need the old row so its contribution can be taken back out
+    instance._rollup_previous = None
+    if instance.pk:
+        instance._rollup_previous = (
+            sender.objects.filter(pk=instance.pk)
+            .values('user_id', 'date', 'category_id', 'amount')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+def update_rollup_on_save(sender, instance, **kwargs):
+    kind = rollups.KIND_BY_MODEL[sender]
+    deltas = rollups.new_deltas()
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        rollups.add_delta(deltas, kind, previous, -1)
+    rollups.add_delta(deltas, kind, rollups.snapshot(instance), 1)
+    rollups.apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    # The user's rollup rows are being deleted along with everything else
+    if deleting_user(origin):
+        return
+    rollups.record([instance], sign=-1)
+
+
+@receiver(pre_delete, sender=Category)
+def fold_rollup_into_no_category(sender, instance, origin=None, **kwargs):
+    # Ledger rows fall back to "No Category" (SET_NULL), so their totals must too
+    if deleting_user(origin):
+        return
+    deltas = rollups.new_deltas()
+    for row in DailyRollup.objects.filter(category=instance).values('user_id', 'day', 'kind', 'total', 'count'):
+        entry = deltas[(row['user_id'], row['day'], None, row['kind'])]
+        entry[0] += row['total']
+        entry[1] += row['count']
+    rollups.apply_deltas(deltas)
+
+
+# ============================
+# CHANGE TRACKING
+# ============================
+@receiver(post_save, sender=Expense)
+@receiver(post_save, sender=Income)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Category)
+def mark_ledger_changed(sender, instance, origin=None, **kwargs):
+    # origin is only sent with delete signals
+    if deleting_user(origin):
+        return
+    # Bumps the ETag version stamp and drops cached summaries
+    versioning.ledger_changed([instance.user_id])
+
+
+@receiver(post_save, sender=User)
+def reset_summaries_for_new_user(sender, instance, created, **kwargs):
+    # Start new accounts from a clean slate, even if their id was used before
+    if created:
+        summary_cache.invalidate(instance.pk)
+
+
+# ============================
+# DELTA SYNC BOOKKEEPING
+# ============================
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Income)
+@receiver(post_delete, sender=Category)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    if deleting_user(origin):
+        return
+    Tombstone.objects.create(user_id=instance.user_id, kind=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def touch_rows_losing_category(sender, instance, origin=None, **kwargs):
+    # SET_NULL is a plain UPDATE; bump updated_at so sync clients refetch these rows
+    if deleting_user(origin):
+        return
+    now = timezone.now()
+    for model in (Expense, Income, ArchivedExpense, ArchivedIncome):
+        model.objects.filter(category=instance).update(updated_at=now)
+
+
+# ============================
+# AUTHENTICATION CACHE
+# ============================
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_cached_user(sender, instance, **kwargs):
+    # Covers deactivation and password changes, which both save the user
+    user_cache.evict(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def evict_cached_profile_owner(sender, instance, **kwargs):
+    user_cache.evict(instance.user_id)
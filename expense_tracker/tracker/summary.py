@@ -0,0 +1,268 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+
+from .models import DailyRollup
+
+
+# Summary buckets in response order
+PERIODS = ('today', 'week', 'month', 'year', 'total')
+
+
+# ============================
+# PERIOD BOUNDARIES
+# ============================
+def local_midnight(day):
+    """Return the aware datetime for the start of ``day`` in the active timezone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def period_days(today=None):
+    """
+    Map each summary period to a half-open ``(first_day, end_day)`` date range.
+
+    Either side may be None (unbounded).
+    """
+    today = today or timezone.localdate()
+    start_week = today - timedelta(days=today.weekday())  # Monday of this week
+    start_month = today.replace(day=1)
+    start_year = today.replace(month=1, day=1)
+
+    return {
+        'today': (today, today + timedelta(days=1)),
+        'week': (start_week, None),
+        'month': (start_month, None),
+        'year': (start_year, None),
+        'total': (None, None),  # All time
+    }
+
+
+def period_bounds(today=None):
+    """
+    Map each summary period to a half-open ``(start, end)`` datetime range.
+
+    Ranges are computed in the active timezone so that filtering on the raw
+    ``date`` column can use an index, instead of comparing on ``date__date``.
+    """
+    return {
+        period: tuple(local_midnight(day) if day else None for day in days)
+        for period, days in period_days(today).items()
+    }
+
+
+def range_q(start=None, end=None, field='date'):
+    """Build a ``Q`` for ``start <= field < end``, skipping missing bounds."""
+    q = Q()
+    if start is not None:
+        q &= Q(**{f'{field}__gte': start})
+    if end is not None:
+        q &= Q(**{f'{field}__lt': end})
+    return q
+
+
+# ============================
+# SUMMARY ENGINE
+# ============================
+def summarize_totals(user, today=None):
+    """
+    Compute income, expense and balance for every summary period.
+
+    Reads the pre-aggregated ``DailyRollup`` table in a single query, so the
+    cost depends on the number of active days rather than ledger rows.
+    """
+    days = period_days(today)
+    return shape_totals(totals_query(user, days), days)
+
+
+async def asummarize_totals(user, today=None):
+    """Async ``summarize_totals()``, on the async ORM."""
+    days = period_days(today)
+    return shape_totals([row async for row in totals_query(user, days)], days)
+
+
+def totals_query(user, days):
+    return (
+        DailyRollup.objects.filter(user=user)
+        .values('kind')
+        .annotate(**{
+            period: Sum('total', filter=range_q(start, end, 'day'))
+            for period, (start, end) in days.items()
+        })
+        .order_by()
+    )
+
+
+def shape_totals(rows, days):
+    by_kind = {row['kind']: row for row in rows}
+    incomes = by_kind.get('income', {})
+    expenses = by_kind.get('expense', {})
+
+    summary = {}
+    for period in days:
+        income = incomes.get(period) or 0
+        expense = expenses.get(period) or 0
+        summary[period] = {
+            "income": income,
+            "expense": expense,
+            "balance": income - expense,
+        }
+    return summary
+
+
+def summarize_categories(user, periods=None, today=None):
+    """
+    Break down income and expense totals by category for every period.
+
+    One grouped query over the rollup computes a filtered ``SUM`` per period,
+    grouped by category id (so same-named categories of different types stay
+    apart) and joined to the category name and type. ``periods`` limits the
+    buckets computed; by default all of them are.
+    """
+    days = category_period_days(periods, today)
+    return shape_categories(categories_query(user, days), days)
+
+
+async def asummarize_categories(user, periods=None, today=None):
+    """Async ``summarize_categories()``, on the async ORM."""
+    days = category_period_days(periods, today)
+    return shape_categories([row async for row in categories_query(user, days)], days)
+
+
+def parse_periods(requested):
+    """
+    Parse a ``?periods=today,month`` value into periods in response order.
+
+    Returns None (every period) for an empty value and raises ``ValueError``
+    for unknown names.
+    """
+    if not requested:
+        return None
+    names = requested.split(',')
+    periods = [period for period in PERIODS if period in names]
+    if set(names) - set(PERIODS) or not periods:
+        raise ValueError(f"Choose from: {', '.join(PERIODS)}.")
+    return periods
+
+
+def category_period_days(periods, today):
+    days = period_days(today)
+    if periods is not None:
+        days = {period: days[period] for period in periods}
+    return days
+
+
+def categories_query(user, days):
+    queryset = DailyRollup.objects.filter(user=user)
+    starts = [start for start, _end in days.values()]
+    if None not in starts:
+        # No all-time bucket requested: skip days older than the earliest period
+        queryset = queryset.filter(day__gte=min(starts))
+
+    return (
+        queryset
+        .values('kind', 'category_id', 'category__name', 'category__type')
+        .annotate(**{
+            period: Sum('total', filter=range_q(start, end, 'day'))
+            for period, (start, end) in days.items()
+        })
+        .order_by()
+    )
+
+
+def shape_categories(rows, days):
+    summary = {period: {"incomes": [], "expenses": []} for period in days}
+    for row in rows:
+        section = "incomes" if row['kind'] == 'income' else "expenses"
+        for period in days:
+            if row[period] is None:
+                continue
+            summary[period][section].append({
+                "category": row['category_id'],
+                "category__name": row['category__name'],
+                "category__type": row['category__type'],
+                "total": row[period],
+            })
+    return summary
+
+
+# ============================
+# TIME SERIES
+# ============================
+# Database-side truncation of the (already local) rollup day per interval
+BUCKET_TRUNCS = {
+    'day': lambda field: F(field),
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+
+
+def bucket_start(day, interval):
+    """Return the first day of the bucket ``day`` falls in."""
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    if interval == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_bucket(start, interval):
+    if interval == 'day':
+        return start + timedelta(days=1)
+    if interval == 'week':
+        return start + timedelta(days=7)
+    if interval == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    return start.replace(year=start.year + 1)
+
+
+def bucket_starts(start, end, interval):
+    """Yield every bucket start between ``start`` and ``end`` (inclusive days)."""
+    current = bucket_start(start, interval)
+    while current <= end:
+        yield current
+        current = next_bucket(current, interval)
+
+
+def timeseries(user, interval, start, end, by_category=False):
+    """
+    Income and expense totals per ``interval`` bucket between two local days.
+
+    Grouping happens in one ``GROUP BY`` query on the rollup, whose days are
+    already local to ``TIME_ZONE``; empty buckets are zero-filled here.
+    """
+    fields = ['bucket', 'kind'] + (['category_id', 'category__name'] if by_category else [])
+    rows = (
+        DailyRollup.objects.filter(user=user, day__gte=bucket_start(start, interval), day__lte=end)
+        .annotate(bucket=BUCKET_TRUNCS[interval]('day'))
+        .values(*fields)
+        .annotate(sum_total=Sum('total'))
+        .order_by()
+    )
+
+    totals = {}
+    categories = {}
+    for row in rows:
+        key = (row['bucket'], row['kind'])
+        totals[key] = totals.get(key, 0) + row['sum_total']
+        if by_category:
+            categories.setdefault(row['bucket'], []).append({
+                'kind': row['kind'],
+                'category': row['category_id'],
+                'category_name': row['category__name'],
+                'total': row['sum_total'],
+            })
+
+    buckets = []
+    for bucket in bucket_starts(start, end, interval):
+        income = totals.get((bucket, 'income'), 0)
+        expense = totals.get((bucket, 'expense'), 0)
+        entry = {'start': bucket, 'income': income, 'expense': expense, 'balance': income - expense}
+        if by_category:
+            entry['categories'] = categories.get(bucket, [])
+        buckets.append(entry)
+    return buckets
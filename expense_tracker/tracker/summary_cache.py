@@ -0,0 +1,142 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+
+# ============================
+# HIT / MISS COUNTERS
+# ============================
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    """Return this process's summary cache counters."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+# ============================
+# GENERATIONS
+# ============================
+# Every cache key embeds a per-user generation (plus a global one). Writes
+# replace the generation instead of deleting keys, so entries computed before a
+# write can never be read again, even if they are stored after it.
+
+GLOBAL_GENERATION_KEY = 'summary:gen'
+
+
+def _user_generation_key(user_id):
+    return f'summary:gen:{user_id}'
+
+
+def _new_generation():
+    return time.time_ns()
+
+
+def generations(user_id):
+    """Return ``(global, user)`` generations, creating missing ones."""
+    keys = [GLOBAL_GENERATION_KEY, _user_generation_key(user_id)]
+    found = cache.get_many(keys)
+    values = []
+    for key in keys:
+        if key not in found:
+            # add() keeps whichever value another worker stored first
+            cache.add(key, _new_generation(), None)
+            found[key] = cache.get(key)
+        values.append(found[key])
+    return tuple(values)
+
+
+async def agenerations(user_id):
+    """Async ``generations()``."""
+    keys = [GLOBAL_GENERATION_KEY, _user_generation_key(user_id)]
+    found = await cache.aget_many(keys)
+    values = []
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, _new_generation(), None)
+            found[key] = await cache.aget(key)
+        values.append(found[key])
+    return tuple(values)
+
+
+def invalidate(user_id=None):
+    """
+    Drop cached summaries for one user, or for everyone when ``user_id`` is None.
+
+    The generation is replaced right away, so reads inside the writing
+    transaction see fresh data, and again once the transaction commits, so a
+    concurrent reader can never keep pre-commit data under a live generation.
+    """
+    key = GLOBAL_GENERATION_KEY if user_id is None else _user_generation_key(user_id)
+
+    def bump():
+        cache.set(key, _new_generation(), None)
+
+    bump()
+    _count('invalidations')
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+# ============================
+# CACHED SUMMARIES
+# ============================
+def summary_key(name, user_id, generation_pair):
+    # The local date is part of the key so "today"/"week" buckets roll over at
+    # midnight without an explicit invalidation
+    parts = [name, user_id, *generation_pair, timezone.localdate().isoformat()]
+    return 'summary:' + ':'.join(str(part) for part in parts)
+
+
+def category_summary_name(periods=None):
+    """Cache name of a category summary limited to ``periods`` (None: all)."""
+    from .summary import PERIODS
+    return 'categories:' + ','.join(periods or PERIODS)
+
+
+def cached_summary(name, user, compute):
+    """Return ``compute(user)``, caching it per user and local date."""
+    key = summary_key(name, user.pk, generations(user.pk))
+
+    payload = cache.get(key)
+    if payload is not None:
+        _count('hits')
+        return payload
+
+    _count('misses')
+    payload = compute(user)
+    cache.set(key, payload, settings.SUMMARY_CACHE_TIMEOUT)
+    return payload
+
+
+async def acached_summary(name, user, compute, generation_pair=None):
+    """
+    Async ``cached_summary()``; ``compute`` is a coroutine function.
+
+    Pass ``generation_pair`` when it was already fetched (e.g. alongside other
+    lookups) to save a cache round trip.
+    """
+    if generation_pair is None:
+        generation_pair = await agenerations(user.pk)
+    key = summary_key(name, user.pk, generation_pair)
+
+    payload = await cache.aget(key)
+    if payload is not None:
+        _count('hits')
+        return payload
+
+    _count('misses')
+    payload = await compute(user)
+    await cache.aset(key, payload, settings.SUMMARY_CACHE_TIMEOUT)
+    return payload
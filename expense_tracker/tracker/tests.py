@@ -3,6 +3,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth.models import User
 from .models import Expense, Income, Category
+from django.utils import timezone
 import datetime
 
 class AuthTestCase(APITestCase):
@@ -55,6 +56,17 @@ class ExpenseTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
 
+    def test_list_query_count_does_not_grow_with_page_size(self):
+        # ETag version stamp, one COUNT and one joined SELECT, however many rows are on the page
+        for total in (3, 10):
+            Expense.objects.all().delete()
+            for _ in range(total):
+                Expense.objects.create(user=self.user, category=self.category, amount=5)
+            with self.assertNumQueries(3):
+                response = self.client.get(self.url)
+            self.assertEqual(len(response.data['results']), total)
+            self.assertEqual(response.data['results'][0]['category_name'], 'Food')
+
 class SummaryTestCase(APITestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='testuser', password='testpassword123')
@@ -80,3 +92,90 @@ class SummaryTestCase(APITestCase):
         # Check today (since we just created them today)
         self.assertEqual(response.data['today']['income'], 500)
         self.assertEqual(response.data['today']['expense'], 100)
+
+    def test_summary_runs_single_query(self):
+        # ETag version stamp, then every period from the daily rollup in one pass
+        with self.assertNumQueries(2):
+            response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_summary_today_excludes_yesterday(self):
+        # Late last night must not count towards today's totals
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        Expense.objects.create(user=self.user, category=self.cat_expense, amount=40,
+                               date=midnight - datetime.timedelta(minutes=1))
+        response = self.client.get(self.summary_url)
+        self.assertEqual(response.data['today']['expense'], 100)
+        self.assertEqual(response.data['total']['expense'], 140)
+
+
+class TimeSeriesTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('summary-timeseries')
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        lagos = timezone.get_default_timezone()
+
+        # 23:30 UTC on Jan 31 is already Feb 1 in Africa/Lagos (UTC+1)
+        Expense.objects.create(user=self.user, category=self.food, amount=10,
+                               date=datetime.datetime(2024, 1, 31, 23, 30, tzinfo=datetime.timezone.utc))
+        Expense.objects.create(user=self.user, amount=5, date=datetime.datetime(2024, 1, 10, 12, 0, tzinfo=lagos))
+        Income.objects.create(user=self.user, amount=100, date=datetime.datetime(2024, 3, 15, 9, 0, tzinfo=lagos))
+
+    def test_monthly_buckets_follow_local_time_and_zero_fill(self):
+        with self.assertNumQueries(2):  # ETag version stamp + one grouped query
+            response = self.client.get(self.url, {'interval': 'month', 'start': '2024-01-01', 'end': '2024-04-30'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        buckets = response.data['buckets']
+        self.assertEqual([str(bucket['start']) for bucket in buckets],
+                         ['2024-01-01', '2024-02-01', '2024-03-01', '2024-04-01'])
+        self.assertEqual([bucket['expense'] for bucket in buckets], [5, 10, 0, 0])
+        self.assertEqual([bucket['income'] for bucket in buckets], [0, 0, 100, 0])
+
+    def test_weekly_buckets_split_by_category(self):
+        response = self.client.get(self.url, {'interval': 'week', 'start': '2024-01-29', 'end': '2024-02-04',
+                                              'by_category': 'true'})
+        (bucket,) = response.data['buckets']
+        self.assertEqual(str(bucket['start']), '2024-01-29')
+        self.assertEqual([(row['category_name'], row['total']) for row in bucket['categories']], [('Food', 10)])
+
+    def test_invalid_ranges_are_rejected(self):
+        response = self.client.get(self.url, {'start': '2024-05-01', 'end': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'interval': 'day', 'start': '2000-01-01', 'end': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CategorySummaryTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('category-summary')
+        # Same name, different types: must not be merged
+        self.gift_expense = Category.objects.create(name='Gifts', type='expense', user=self.user)
+        self.gift_income = Category.objects.create(name='Gifts', type='income', user=self.user)
+        self.old = Category.objects.create(name='Gifts', type='expense', user=self.user)
+
+        Expense.objects.create(user=self.user, category=self.gift_expense, amount=30)
+        Expense.objects.create(user=self.user, category=self.old, amount=70,
+                               date=timezone.now() - datetime.timedelta(days=800))
+        Income.objects.create(user=self.user, category=self.gift_income, amount=50)
+
+    def test_single_grouped_query_keeps_categories_apart(self):
+        with self.assertNumQueries(2):  # ETag version stamp + one grouped query
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'today', 'week', 'month', 'year', 'total'})
+
+        totals = {(row['category'], row['total']) for row in response.data['total']['expenses']}
+        self.assertEqual(totals, {(self.gift_expense.id, 30), (self.old.id, 70)})
+        self.assertEqual(response.data['today']['incomes'][0]['category__type'], 'income')
+        # Categories without activity in a period are left out of it
+        self.assertEqual(len(response.data['year']['expenses']), 1)
+
+    def test_periods_parameter(self):
+        response = self.client.get(self.url, {'periods': 'today,year'})
+        self.assertEqual(set(response.data), {'today', 'year'})
+        response = self.client.get(self.url, {'periods': 'fortnight'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,154 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .models import ArchiveBoundary, ArchivedExpense, ArchivedIncome, Category, Expense, Income
+from .summary import local_midnight
+from . import rollups
+import datetime
+from io import StringIO
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class LedgerArchiveTestCase(APITestCase):
+    def setUp(self):
+        # The archive boundary is cached; never let it leak between tests
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.year = timezone.localdate().year
+        last_year = local_midnight(datetime.date(self.year - 1, 6, 1))
+        self.old_expense = Expense.objects.create(
+            user=self.user, category=self.food, amount=40, description='old groceries', date=last_year
+        )
+        self.old_income = Income.objects.create(user=self.user, amount=300, date=last_year)
+        self.new_expense = Expense.objects.create(
+            user=self.user, category=self.food, amount=15, description='new groceries', date=timezone.now()
+        )
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_ledger', before_year=self.year, settle_seconds=0, stdout=out)
+        return out.getvalue()
+
+    def test_command_moves_old_rows_in_batches(self):
+        self.assertIn("Archived 1 expenses and 1 incomes", self.archive())
+        self.assertEqual(list(Expense.objects.values_list('id', flat=True)), [self.new_expense.id])
+        self.assertFalse(Income.objects.exists())
+        archived = ArchivedExpense.objects.get()
+        self.assertEqual((archived.id, archived.category_id, archived.amount), (self.old_expense.id, self.food.id, 40))
+        self.assertEqual(ArchivedIncome.objects.get().id, self.old_income.id)
+        self.assertEqual(ArchiveBoundary.objects.get().before_year, self.year)
+
+        # A rerun finds nothing left to move
+        self.assertIn("Archived 0 expenses and 0 incomes", self.archive())
+
+    def test_rejects_a_future_year(self):
+        with self.assertRaises(CommandError):
+            call_command('archive_ledger', before_year=self.year + 1, stdout=StringIO())
+
+    def test_lists_read_archived_years_only_when_asked(self):
+        self.archive()
+        url = reverse('expense-list-create')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        response = self.client.get(url, {'date_min': f'{self.year - 1}-01-01'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.new_expense.id, self.old_expense.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'date_min': f'{self.year}-01-01'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertFalse(any('_history' in query['sql'] for query in queries.captured_queries))
+
+    def test_search_covers_archived_rows(self):
+        bulk = Expense.objects.create(user=self.user, amount=5, description='Groceries, groceries and more groceries',
+                                      date=self.old_expense.date)
+        Expense.objects.create(user=self.user, amount=5, description='grocer', date=self.old_expense.date)
+        self.archive()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('expense-list-create'), {'search': 'grocerie'})
+        # Prefix-token matching and ranking, from the indexes of both tables
+        self.assertEqual(response.data['results'][0]['id'], bulk.id)
+        self.assertEqual(response.data['count'], 3)
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        if connection.vendor == 'sqlite':
+            self.assertIn('tracker_archivedexpense_fts', sql)
+            self.assertNotIn('LIKE', sql)
+
+    def test_summaries_and_rollups_are_unchanged(self):
+        before = self.client.get(reverse('summary')).data['total']
+        ledger = self.client.get(reverse('ledger')).data['results']
+        self.archive()
+
+        self.assertEqual(self.client.get(reverse('summary')).data['total'], before)
+        self.assertEqual(self.client.get(reverse('ledger')).data['results'], ledger)
+        self.assertEqual(rollups.verify(), [])
+
+    def test_sync_and_export_include_archived_rows(self):
+        self.archive()
+        data = self.client.get(reverse('sync')).data
+        self.assertEqual(len(data['expenses']), 2)
+        self.assertEqual(len(data['incomes']), 1)
+
+        response = self.client.get(reverse('ledger-export', kwargs={'export_format': 'ndjson'}))
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+
+    def test_deleting_a_category_reaches_archived_rows(self):
+        self.archive()
+        self.food.delete()
+        self.assertIsNone(ArchivedExpense.objects.get().category_id)
+        self.assertEqual(rollups.verify(), [])
+
+    def test_merging_categories_reaches_archived_rows(self):
+        self.archive()
+        target = Category.objects.create(name='food', type='expense', user=self.user)
+        response = self.client.post(reverse('category-merge'),
+                                    {'target': target.pk, 'sources': [self.food.pk]}, format='json')
+        self.assertEqual(response.data['expenses'], 2)
+        self.assertEqual(ArchivedExpense.objects.get().category_id, target.pk)
+        self.assertEqual(rollups.verify(), [])
+
+    def test_archived_rows_are_readable_by_id_but_read_only(self):
+        self.archive()
+        url = reverse('expense-detail', kwargs={'pk': self.old_expense.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['description'], 'old groceries')
+
+        response = self.client.patch(url, {'amount': '1.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['detail'].code, 'archived')
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_409_CONFLICT)
+        url = reverse('income-detail', kwargs={'pk': self.old_income.id})
+        self.assertEqual(self.client.put(url, {'amount': '1.00'}, format='json').status_code,
+                         status.HTTP_409_CONFLICT)
+        self.assertEqual(ArchivedExpense.objects.get().amount, 40)
+
+        # Someone else's archived row is still just missing
+        other = User.objects.create_user(username='other', password='testpassword123')
+        self.client.force_authenticate(user=other)
+        url = reverse('expense-detail', kwargs={'pk': self.old_expense.id})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bulk_reports_archived_rows_as_read_only(self):
+        self.archive()
+        payload = {'update': [{'id': self.old_expense.id, 'amount': '1.00'}], 'delete': [self.old_expense.id, 0]}
+        response = self.client.post(reverse('expense-bulk'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['update'][0]['errors']['id'], ["This entry is archived and read-only."])
+        self.assertEqual([item['errors']['id'] for item in response.data['delete']],
+                         [["This entry is archived and read-only."], ["Not found."]])
+        self.assertEqual(ArchivedExpense.objects.get().amount, 40)
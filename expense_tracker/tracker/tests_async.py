@@ -0,0 +1,94 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .authentication import user_cache
+from .models import Expense, Income, Category
+from .benchmarks import route_reads
+import datetime
+import json
+import re
+
+
+class AsyncReadViewTestCase(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        now = timezone.now()
+        for day in range(25):
+            Expense.objects.create(user=self.user, category=self.food if day % 2 else None,
+                                   amount=10 + day, date=now - datetime.timedelta(days=day))
+        Income.objects.create(user=self.user, amount=500)
+
+        route_reads(True)
+        self.addCleanup(route_reads, False)
+
+    def sync_and_async(self, name, params=None):
+        """Return ``(sync, async)`` responses for the same GET."""
+        route_reads(False)
+        sync_response = self.client.get(reverse(name), params)
+        route_reads(True)
+        return sync_response, self.client.get(reverse(name), params)
+
+    def test_urls_switch_to_async_views(self):
+        match = self.client.get(reverse('summary')).resolver_match
+        self.assertEqual(match.func.view_class.__name__, 'AsyncSummaryView')
+
+    def test_responses_match_the_sync_views(self):
+        cases = [
+            ('summary', None),
+            ('category-summary', None),
+            ('category-summary', {'periods': 'month,total'}),
+            ('category-summary', {'periods': 'decade'}),
+            ('expense-list-create', None),
+            ('expense-list-create', {'page': 2}),
+            ('expense-list-create', {'page': 'last'}),
+            ('expense-list-create', {'page': 9}),
+            ('expense-list-create', {'category': self.food.pk}),
+            ('expense-list-create', {'category': 999}),
+            ('expense-list-create', {'pagination': 'cursor', 'page_size': 5}),
+            ('income-list-create', None),
+        ]
+        for name, params in cases:
+            with self.subTest(name=name, params=params):
+                sync_response, async_response = self.sync_and_async(name, params)
+                self.assertEqual(async_response.status_code, sync_response.status_code)
+                self.assertEqual(json.loads(async_response.content), json.loads(sync_response.content))
+                self.assertEqual(async_response.get('ETag'), sync_response.get('ETag'))
+
+    def test_conditional_get(self):
+        url = reverse('expense-list-create')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_authentication_is_required(self):
+        self.client.credentials()
+        response = self.client.get(reverse('summary'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.client.get(reverse('summary')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_go_to_the_sync_view(self):
+        response = self.client.post(reverse('expense-list-create'), {'amount': '7.00', 'category': self.food.pk},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(json.loads(self.client.get(reverse('expense-list-create')).content)['count'], 26)
+
+    async def test_asgi_stack_reports_queries(self):
+        response = await self.async_client.get(reverse('summary'), headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)['total']['expense'], float(sum(range(10, 35))))
+        # User, version stamp and rollup queries ran on the request's sync thread
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+        # The async view hook ran, so the view's own time is measured too
+        view_ms = re.search(r'view;dur=([\d.]+)', response['Server-Timing']).group(1)
+        self.assertGreater(float(view_ms), 0)
@@ -0,0 +1,73 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.settings import api_settings
+from unittest import mock
+from .authentication import user_cache
+
+
+class CachedAuthenticationTestCase(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.authenticate(self.user)
+
+    def tearDown(self):
+        user_cache.clear()
+
+    def authenticate(self, user):
+        access = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_profile_is_joined_and_then_cached(self):
+        # One query for the user and their profile, then none at all
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['username'], 'testuser')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(reverse('user-profile'))
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True)
+    def test_password_change_revokes_tokens(self):
+        # Tokens issued with revocation on carry a hash of the password
+        self.authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('user-profile')).status_code, status.HTTP_200_OK)
+        self.user.set_password('anotherpassword123')
+        self.user.save()
+
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_changes_evict_the_user(self):
+        self.client.get(reverse('user-profile'))
+        self.user.first_name = 'Ada'
+        self.user.save()
+
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.data['first_name'], 'Ada')
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(reverse('user-profile'))
+        self.user.delete()
+
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_users_are_copies(self):
+        first = user_cache.get(self.user.pk, lambda pk: User.objects.get(pk=pk))
+        first.username = 'changed'
+        second = user_cache.get(self.user.pk, lambda pk: self.fail('should be cached'))
+        self.assertEqual(second.username, 'testuser')
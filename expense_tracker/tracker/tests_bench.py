@@ -0,0 +1,86 @@
+from rest_framework.test import APITestCase
+from django.test import TransactionTestCase
+from django.urls import resolve, reverse
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from .models import Expense, Income, Category, Profile
+from . import benchmarks, rollups
+from io import StringIO
+import json
+import os
+import tempfile
+
+class SeedLedgerTestCase(APITestCase):
+    def test_seed_creates_consistent_dataset(self):
+        out = StringIO()
+        call_command('seed_ledger', users=3, categories=4, rows=200, stdout=out)
+        self.assertIn('Seeded 3 users', out.getvalue())
+
+        users = User.objects.filter(username__startswith='seed-')
+        self.assertEqual(users.count(), 3)
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 3)
+        self.assertEqual(Category.objects.filter(user=users[0], type='expense').count(), 4)
+        self.assertEqual(Expense.objects.count() + Income.objects.count(), 600)
+        self.assertTrue(self.client.login(username='seed-0', password='seed-password'))
+        self.assertEqual(rollups.verify(), [])
+
+        # Reruns add new users instead of clashing with the existing ones
+        call_command('seed_ledger', users=1, rows=10, stdout=StringIO())
+        self.assertTrue(User.objects.filter(username='seed-3').exists())
+
+        # Gaps left by deleted users and unrelated seed-* names are no obstacle
+        User.objects.filter(username__in=['seed-0', 'seed-1']).delete()
+        User.objects.create_user(username='seed-admin')
+        call_command('seed_ledger', users=1, rows=10, stdout=StringIO())
+        self.assertTrue(User.objects.filter(username='seed-4').exists())
+
+
+class BenchApiTestCase(APITestCase):
+    def setUp(self):
+        call_command('seed_ledger', users=1, rows=100, stdout=StringIO())
+        self.user = User.objects.get(username='seed-0')
+
+    def test_every_endpoint_has_a_scenario(self):
+        fixtures = benchmarks.bench_fixtures(self.user)
+        self.assertEqual(benchmarks.uncovered_urls(fixtures), set())
+        names = [scenario['name'] for scenario in benchmarks.scenarios(fixtures)]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_results_and_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command('bench_api', iterations=2, warmup=0, only=['expense-list', 'expense-create', 'summary'],
+                         output=output, stdout=StringIO(), stderr=StringIO())
+            with open(output) as source:
+                report = json.load(source)
+            result = report['results']['expense-list']
+            self.assertEqual(result['status'], [200])
+            self.assertGreater(result['queries'], 0)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            self.assertEqual(report['results']['expense-create']['status'], [201])
+            # Writes made while benchmarking are rolled back
+            self.assertEqual(Expense.objects.filter(description='Bench lunch').count(), 0)
+
+            report['results']['expense-list']['queries'] = 1
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w') as target:
+                json.dump(report, target)
+            with self.assertRaisesMessage(CommandError, '1 benchmark thresholds exceeded'):
+                call_command('bench_api', iterations=1, warmup=0, only=['expense-list'], baseline=baseline,
+                             tolerance=100, stdout=StringIO(), stderr=StringIO())
+
+
+class BenchAsyncTestCase(TransactionTestCase):
+    # Worker threads only see committed rows
+    def test_both_serving_modes_answer(self):
+        call_command('seed_ledger', users=1, rows=50, stdout=StringIO())
+        out = StringIO()
+        call_command('bench_async', requests=8, workers=2, concurrency=4, db_latency_ms=1, stdout=out)
+
+        rows = {line.split()[0]: line.split() for line in out.getvalue().splitlines()[1:3]}
+        self.assertEqual(rows['wsgi'][-1], '200')
+        self.assertEqual(rows['asgi'][-1], '200')
+        self.assertIn('ASGI throughput is', out.getvalue())
+        # The URLconf is back in its configured (sync) mode
+        self.assertEqual(resolve(reverse('summary')).func.view_class.__name__, 'SummaryView')
@@ -0,0 +1,69 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from .models import Expense, Income, Category, Budget
+from .summary import local_midnight
+from . import budgets
+import datetime
+from django.utils import timezone
+
+class BudgetTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('budget-list-create')
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.rent = Category.objects.create(name='Rent', type='expense', user=self.user)
+        self.salary = Category.objects.create(name='Salary', type='income', user=self.user)
+
+    def test_status_reflects_spend_to_date(self):
+        food = Budget.objects.create(user=self.user, category=self.food, limit=100, period='monthly')
+        rent = Budget.objects.create(user=self.user, category=self.rent, limit=100, period='yearly')
+        Expense.objects.create(user=self.user, category=self.food, amount=85)
+        Expense.objects.create(user=self.user, category=self.rent, amount=150)
+        # Outside every period, and income in general, never counts
+        Expense.objects.create(user=self.user, category=self.food, amount=500,
+                               date=timezone.now() - datetime.timedelta(days=800))
+        Income.objects.create(user=self.user, category=self.salary, amount=1000)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = {item['id']: item for item in response.data['results']}
+        self.assertEqual(results[food.id]['spent'], 85)
+        self.assertEqual(results[food.id]['status'], 'warning')
+        self.assertEqual(results[rent.id]['status'], 'exceeded')
+        self.assertEqual(results[rent.id]['remaining'], -50)
+
+    def test_future_expenses_count_toward_their_own_period(self):
+        today = datetime.date(2024, 2, 14)  # A Wednesday
+        limits = [Budget.objects.create(user=self.user, category=self.food, limit=100, period=period)
+                   for period in ('weekly', 'monthly', 'yearly')]
+        for day in (today, datetime.date(2024, 2, 19), datetime.date(2024, 3, 1), datetime.date(2025, 1, 1)):
+            Expense.objects.create(user=self.user, category=self.food, amount=10, date=local_midnight(day))
+
+        spent = [status['spent'] for status in budgets.evaluate(limits, today).values()]
+        self.assertEqual(spent, [10, 20, 30])
+
+    def test_listing_cost_does_not_grow_with_expenses(self):
+        for category in (self.food, self.rent):
+            for period in ('weekly', 'monthly', 'yearly'):
+                Budget.objects.create(user=self.user, category=category, limit=100, period=period)
+        for day in range(60):
+            Expense.objects.create(user=self.user, category=self.food, amount=1,
+                                   date=timezone.now() - datetime.timedelta(days=day))
+
+        with self.assertNumQueries(3):  # Count, budgets page, one spend query
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 6)
+
+    def test_create_validates_category(self):
+        response = self.client.post(self.url, {'category': self.salary.id, 'limit': '50.00'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(self.url, {'category': self.food.id, 'limit': '50.00'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['status'], 'ok')
+
+        response = self.client.post(self.url, {'category': self.food.id, 'limit': '80.00'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
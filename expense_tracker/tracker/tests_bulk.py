@@ -0,0 +1,166 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .models import Expense, Income, Category
+from . import rollups
+from io import StringIO
+import os
+import tempfile
+
+class BulkEndpointTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.other = User.objects.create_user(username='other', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('expense-bulk')
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.foreign = Category.objects.create(name='Theirs', type='expense', user=self.other)
+
+    def test_bulk_create(self):
+        payload = {'create': [
+            {'amount': '10.00', 'category': self.food.id, 'description': f'Item {i}'} for i in range(200)
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 200)
+        self.assertEqual(response.data['create'][0]['data']['category_name'], 'Food')
+        self.assertEqual(rollups.verify(), [])
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def run(size):
+            payload = {'create': [{'amount': '1.00', 'category': self.food.id}] * size}
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        run(1)  # Creates the rollup bucket; later batches only update it
+        # 60 rows still fit in a single INSERT on every backend (SQLite caps bound params)
+        self.assertEqual(run(5), run(60))
+
+    def test_partial_failure_is_reported_per_item(self):
+        payload = {'create': [
+            {'amount': '10.00', 'category': self.food.id},
+            {'amount': 'abc'},
+            {'amount': '5.00', 'category': self.foreign.id},  # Not the user's category
+        ]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([item['status'] for item in response.data['create']], ['created', 'error', 'error'])
+        self.assertIn('category', response.data['create'][2]['errors'])
+        self.assertEqual(Expense.objects.count(), 1)
+
+    def test_atomic_batch_writes_nothing_on_error(self):
+        payload = {'atomic': True, 'create': [{'amount': '10.00'}, {'amount': 'abc'}]}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Expense.objects.count(), 0)
+
+    def test_bulk_update_and_delete(self):
+        keep = Expense.objects.create(user=self.user, category=self.food, amount=10)
+        drop = Expense.objects.create(user=self.user, category=self.food, amount=20)
+        theirs = Expense.objects.create(user=self.other, amount=30)
+        payload = {
+            'update': [{'id': keep.id, 'amount': '15.00', 'category': None}],
+            'delete': [drop.id, theirs.id],
+        }
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['delete'][1]['status'], 'error')
+
+        keep.refresh_from_db()
+        self.assertEqual(keep.amount, 15)
+        self.assertIsNone(keep.category)
+        self.assertFalse(Expense.objects.filter(id=drop.id).exists())
+        self.assertTrue(Expense.objects.filter(id=theirs.id).exists())
+        self.assertEqual(rollups.verify(), [])
+
+    def test_malformed_ids_are_reported_per_item(self):
+        row = Expense.objects.create(user=self.user, category=self.food, amount=10)
+        payload = {
+            'update': [{'id': [row.id], 'amount': '1.00'}, {'id': True, 'amount': '1.00'}, {'amount': '1.00'}],
+            'delete': [[row.id], {'a': 1}, True, 'x'],
+        }
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        for item in response.data['update'] + response.data['delete']:
+            self.assertEqual(item['errors'], {'id': ["A valid integer is required."]})
+        row.refresh_from_db()
+        self.assertEqual(row.amount, 10)
+
+    def test_income_bulk(self):
+        response = self.client.post(reverse('income-bulk'), {'create': [{'amount': '100.00'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Income.objects.count(), 1)
+
+    def test_oversized_batch_is_rejected(self):
+        payload = {'delete': list(range(501))}
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LedgerImportTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.url = reverse('ledger-import')
+
+    def upload(self, content, query=''):
+        upload = SimpleUploadedFile('ledger.csv', content.encode(), content_type='text/csv')
+        return self.client.post(self.url + query, {'file': upload}, format='multipart')
+
+    def test_import_resolves_and_creates_categories(self):
+        content = (
+            "kind,date,amount,category,description\n"
+            "expense,2024-01-05,12.50,food,Groceries\n"
+            "expense,2024-01-06T18:30:00,7.00,Transport,Bus\n"
+            "income,2024-01-31,1000.00,Salary,\n"
+        )
+        response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['rows_imported'], 3)
+        self.assertEqual(response.data['categories_created'], 2)
+        # Existing categories are matched case-insensitively
+        self.assertEqual(Expense.objects.get(description='Groceries').category, self.food)
+        self.assertEqual(rollups.verify(), [])
+
+    def test_invalid_rows_are_reported_by_line(self):
+        content = "date,amount\n2024-01-05,10\nnot-a-date,5\n2024-01-07,lots\n"
+        response = self.upload(content, '?kind=expense')
+        self.assertEqual(response.data['rows_imported'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4])
+
+    def test_rows_with_extra_fields_are_reported(self):
+        content = (
+            "kind,date,amount,category,description\n"
+            "expense,2024-01-05,12.50,food,Groceries, extra\n"
+            "expense,2024-01-06,7.00,food,Bus\n"
+        )
+        response = self.upload(content)
+        self.assertEqual(response.data['rows_imported'], 1)
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+        self.assertIn("more fields than the header", response.data['errors'][0]['errors'][0])
+
+    def test_missing_header_is_rejected(self):
+        response = self.upload("foo,bar\n1,2\n")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_command_imports_in_chunks_and_rebuilds_rollup(self):
+        lines = ["kind,date,amount,category"]
+        lines += [f"expense,2024-02-{day % 28 + 1:02d},{day}.00,Bulk" for day in range(250)]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as source:
+            source.write("\n".join(lines))
+        self.addCleanup(os.remove, source.name)
+
+        out = StringIO()
+        call_command('import_ledger', source.name, user='testuser', batch_size=100,
+                     rebuild_rollups=True, stdout=out, stderr=StringIO())
+        self.assertIn('Imported 250 of 250 rows', out.getvalue())
+        self.assertEqual(Category.objects.filter(user=self.user, name='Bulk').count(), 1)
+        self.assertEqual(rollups.verify(), [])
@@ -0,0 +1,58 @@
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from .models import Expense, Income, Category
+from . import summary_cache
+
+class SummaryCacheTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('summary')
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        Expense.objects.create(user=self.user, category=self.food, amount=100)
+
+    def test_repeated_polls_hit_the_cache(self):
+        before = summary_cache.stats()
+        self.client.get(self.url)
+        # Only the ETag version stamp is read from the database
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['total']['expense'], 100)
+
+        after = summary_cache.stats()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_writes_invalidate_cached_summaries(self):
+        self.client.get(self.url)
+        income = Income.objects.create(user=self.user, amount=500)
+        self.assertEqual(self.client.get(self.url).data['total']['income'], 500)
+
+        income.delete()
+        self.assertEqual(self.client.get(self.url).data['total']['income'], 0)
+
+        self.client.post(reverse('expense-bulk'), {'create': [{'amount': '5.00'}]}, format='json')
+        self.assertEqual(self.client.get(self.url).data['total']['expense'], 105)
+
+    def test_category_changes_invalidate_category_summary(self):
+        url = reverse('category-summary')
+        self.assertEqual(self.client.get(url).data['total']['expenses'][0]['category__name'], 'Food')
+        self.food.name = 'Groceries'
+        self.food.save()
+        self.assertEqual(self.client.get(url).data['total']['expenses'][0]['category__name'], 'Groceries')
+
+    def test_entries_are_per_user(self):
+        self.client.get(self.url)
+        other = User.objects.create_user(username='other', password='testpassword123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(self.url).data['total']['expense'], 0)
+
+    def test_entries_cached_before_a_write_are_not_served(self):
+        # Whatever was cached before the write belongs to an old generation
+        stale = summary_cache.cached_summary('totals', self.user, lambda user: {'stale': True})
+        Expense.objects.create(user=self.user, category=self.food, amount=1)
+        self.assertTrue(stale['stale'])
+        self.assertEqual(self.client.get(self.url).data['total']['expense'], 101)
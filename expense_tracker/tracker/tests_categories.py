@@ -0,0 +1,168 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .models import Budget, Category, DailyRollup, Expense, Income, RecurringRule, Tombstone
+from .bulk import create_rows
+from . import rollups
+import datetime
+
+
+class CategoryMergeTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.lower = Category.objects.create(name='food', type='expense', user=self.user)
+        self.upper = Category.objects.create(name=' FOOD ', type='expense', user=self.user)
+        self.rent = Category.objects.create(name='Rent', type='expense', user=self.user)
+        self.now = timezone.now()
+        yesterday = self.now - datetime.timedelta(days=1)
+        # Same-day buckets in several categories, plus days only a source has
+        Expense.objects.create(user=self.user, category=self.food, amount=10, date=self.now)
+        Expense.objects.create(user=self.user, category=self.lower, amount=20, date=self.now)
+        Expense.objects.create(user=self.user, category=self.upper, amount=30, date=self.now)
+        Expense.objects.create(user=self.user, category=self.lower, amount=5, date=yesterday)
+        Expense.objects.create(user=self.user, category=self.upper, amount=7, date=yesterday)
+        Expense.objects.create(user=self.user, category=self.rent, amount=500, date=self.now)
+
+    def merge(self, target, *sources):
+        return self.client.post(reverse('category-merge'),
+                                {'target': target.pk, 'sources': [source.pk for source in sources]}, format='json')
+
+    def test_merge_moves_rows_and_rollups(self):
+        rule = RecurringRule.objects.create(user=self.user, kind='expense', amount=3, category=self.lower,
+                                            start_date=self.now.date())
+        Budget.objects.create(user=self.user, category=self.lower, limit=100, period='monthly')
+        Budget.objects.create(user=self.user, category=self.food, limit=50, period='yearly')
+        Budget.objects.create(user=self.user, category=self.upper, limit=80, period='yearly')
+
+        response = self.merge(self.food, self.lower, self.upper)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['expenses'], 4)
+        self.assertEqual(response.data['recurring_rules'], 1)
+
+        self.assertEqual(Expense.objects.filter(category=self.food).count(), 5)
+        self.assertFalse(Category.objects.filter(pk__in=[self.lower.pk, self.upper.pk]).exists())
+        self.assertEqual(rollups.verify(), [])
+        self.assertEqual(DailyRollup.objects.get(category=self.food, day=timezone.localdate(self.now)).total, 60)
+        rule.refresh_from_db()
+        self.assertEqual(rule.category, self.food)
+        # The target keeps its own yearly budget; the monthly one moves over
+        self.assertEqual(sorted(Budget.objects.filter(category=self.food).values_list('period', 'limit')),
+                         [('monthly', 100), ('yearly', 50)])
+        self.assertEqual(Tombstone.objects.filter(kind='category').count(), 2)
+
+    def test_merge_uses_a_fixed_number_of_queries(self):
+        def merge_queries(rows):
+            target = Category.objects.create(name='Target', type='expense', user=self.user)
+            source = Category.objects.create(name='Source', type='expense', user=self.user)
+            # One row per day, so the rollup has as many buckets to re-key as rows
+            create_rows(Expense, [
+                Expense(user=self.user, category=source, amount=1, date=self.now - datetime.timedelta(days=day))
+                for day in range(rows)
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.merge(target, source).data['expenses'], rows)
+            return len(queries)
+
+        self.assertEqual(merge_queries(5), merge_queries(50))
+        self.assertEqual(rollups.verify(), [])
+
+    def test_merge_rejects_invalid_sources(self):
+        other = User.objects.create_user(username='other', password='testpassword123')
+        foreign = Category.objects.create(name='food', type='expense', user=other)
+        salary = Category.objects.create(name='Salary', type='income', user=self.user)
+
+        self.assertEqual(self.merge(self.food, self.food).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.merge(self.food, foreign).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.merge(self.food, salary).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(Category.objects.filter(pk=foreign.pk).exists())
+
+    def test_dedupe_merges_case_insensitive_duplicates(self):
+        Category.objects.create(name='food', type='income', user=self.user)
+        response = self.client.post(reverse('category-dedupe'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['merged']), 1)
+        self.assertEqual(response.data['merged'][0]['category'], self.food.pk)
+
+        names = sorted(Category.objects.filter(user=self.user).values_list('name', 'type'))
+        self.assertEqual(names, [('Food', 'expense'), ('Rent', 'expense'), ('food', 'income')])
+        self.assertEqual(rollups.verify(), [])
+        self.assertEqual(self.client.post(reverse('category-dedupe')).data['merged'], [])
+
+
+class RecategorizeTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.dining = Category.objects.create(name='Dining', type='expense', user=self.user)
+        self.now = timezone.now()
+        self.last_month = self.now - datetime.timedelta(days=40)
+        self.recent = Expense.objects.create(user=self.user, category=self.food, amount=12,
+                                             description='pizza night', date=self.now)
+        self.old = Expense.objects.create(user=self.user, category=self.food, amount=8,
+                                          description='pizza lunch', date=self.last_month)
+        self.other = Expense.objects.create(user=self.user, amount=30, description='groceries', date=self.now)
+
+    def recategorize(self, target, **filters):
+        url = reverse('expense-recategorize')
+        return self.client.post(url + '?' + '&'.join(f'{k}={v}' for k, v in filters.items()),
+                                {'category': target.pk if target else None}, format='json')
+
+    def test_moves_only_matching_rows(self):
+        response = self.recategorize(self.dining, search='pizza', date_min=self.now.date().isoformat())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 1)
+
+        self.recent.refresh_from_db()
+        self.assertEqual(self.recent.category, self.dining)
+        self.assertGreater(self.recent.updated_at, self.now)
+        self.assertEqual(Expense.objects.get(pk=self.old.pk).category, self.food)
+        self.assertEqual(rollups.verify(), [])
+
+    def test_uncategorize_and_category_filter(self):
+        response = self.recategorize(None, category=self.food.pk)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertFalse(Expense.objects.filter(category=self.food).exists())
+        self.assertEqual(rollups.verify(), [])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def recategorize_queries(rows):
+            source = Category.objects.create(name='Source', type='expense', user=self.user)
+            target = Category.objects.create(name='Target', type='expense', user=self.user)
+            create_rows(Expense, [Expense(user=self.user, category=source, amount=1, date=self.now)
+                                  for _ in range(rows)])
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.recategorize(target, category=source.pk).data['updated'], rows)
+            return len(queries)
+
+        self.assertEqual(recategorize_queries(5), recategorize_queries(50))
+        self.assertEqual(rollups.verify(), [])
+
+    def test_locks_the_ledger_version_before_aggregating(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.recategorize(self.dining, category=self.food.pk)
+        sql = [query['sql'] for query in queries.captured_queries]
+        lock = next(i for i, query in enumerate(sql) if query.startswith('UPDATE "tracker_ledgerversion"'))
+        aggregate = next(i for i, query in enumerate(sql) if 'SUM(' in query)
+        self.assertLess(lock, aggregate)
+
+    def test_rejects_bad_input(self):
+        other = User.objects.create_user(username='other', password='testpassword123')
+        foreign = Category.objects.create(name='Food', type='expense', user=other)
+        self.assertEqual(self.recategorize(foreign).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.recategorize(self.dining, date_min='not-a-date').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Expense.objects.filter(category=self.dining).count(), 0)
+
+    def test_incomes(self):
+        salary = Category.objects.create(name='Salary', type='income', user=self.user)
+        Income.objects.create(user=self.user, amount=100, date=self.now)
+        response = self.client.post(reverse('income-recategorize'), {'category': salary.pk}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(rollups.verify(), [])
@@ -0,0 +1,55 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from .models import Expense, Category
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        Expense.objects.create(user=self.user, category=self.food, amount=100)
+
+    def test_unchanged_list_returns_304_without_list_queries(self):
+        url = reverse('expense-list-create')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        # Only the version stamp lookup runs
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_writes_change_the_etag(self):
+        url = reverse('summary')
+        etag = self.client.get(url)['ETag']
+        Expense.objects.create(user=self.user, category=self.food, amount=5)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_category_rename_changes_list_etags(self):
+        url = reverse('category-list-create')
+        etag = self.client.get(url)['ETag']
+        self.food.name = 'Groceries'
+        self.food.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_query_and_user(self):
+        url = reverse('expense-list-create')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url + '?page_size=5&pagination=cursor')['ETag'], etag)
+
+        other = User.objects.create_user(username='other', password='testpassword123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        url = reverse('category-summary')
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,42 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from .models import Expense, Income, Category
+import csv
+import datetime
+import io
+import json
+from django.utils import timezone
+
+class LedgerExportTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Food', type='expense', user=self.user)
+        now = timezone.now()
+        Expense.objects.create(user=self.user, category=self.category, amount=10, date=now, description='Lunch, late')
+        Expense.objects.create(user=self.user, amount=20, date=now - datetime.timedelta(days=30))
+        Income.objects.create(user=self.user, amount=500, date=now)
+
+    def export(self, export_format, query=''):
+        response = self.client.get(reverse('ledger-export', args=[export_format]) + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export_streams_both_kinds(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('csv'))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual({row['kind'] for row in rows}, {'expense', 'income'})
+        lunch = next(row for row in rows if row['description'])
+        self.assertEqual((lunch['category_name'], lunch['description']), ('Food', 'Lunch, late'))
+
+    def test_ndjson_export_applies_list_filters(self):
+        since = (timezone.now() - datetime.timedelta(days=2)).date()
+        lines = self.export('ndjson', f'?kind=expense&date_min={since}').splitlines()
+        self.assertEqual([json.loads(line)['amount'] for line in lines], ['10.00'])
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.client.get(reverse('ledger-export', args=['xml'])).status_code, 400)
+        response = self.client.get(reverse('ledger-export', args=['csv']) + '?date_min=yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -5,6 +5,7 @@ from django.contrib.auth.models import User
 from .models import Expense, Category
 import datetime
 from django.utils import timezone
+from django.db import connection
 
 class DateFilterTestCase(APITestCase):
     def setUp(self):
@@ -32,3 +33,34 @@ class DateFilterTestCase(APITestCase):
         # Note: If date__gte isn't supported, it will likely return all 3.
         # We want to fail if it returns 3.
         self.assertEqual(len(response.data['results']), 2) 
+
+    def test_date_max_includes_whole_day(self):
+        # An expense late in the evening still belongs to that day
+        evening = timezone.localtime().replace(hour=23, minute=30, second=0, microsecond=0)
+        Expense.objects.create(user=self.user, category=self.category, amount=40, date=evening)
+        response = self.client.get(f"{self.url}?date_min={evening.date()}&date_max={evening.date()}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('40.00', [row['amount'] for row in response.data['results']])
+
+
+class QueryPlanTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always get a sequential scan; LOCAL
+            # ends with the test transaction, so later tests plan normally
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def test_date_range_list_uses_user_date_index(self):
+        since = timezone.now() - datetime.timedelta(days=7)
+        plan = self.explain(Expense.objects.filter(user=self.user, date__gte=since))
+        self.assertIn('expense_user_date', plan)
+
+    def test_category_filter_uses_user_category_index(self):
+        category = Category.objects.create(name='Food', type='expense', user=self.user)
+        plan = self.explain(Expense.objects.filter(user=self.user, category=category))
+        self.assertIn('expense_user_category_date', plan)
@@ -0,0 +1,97 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from .models import Profile
+from . import images
+import io
+import shutil
+import tempfile
+
+
+def image_upload(size=(1200, 900), image_format='JPEG', name='photo.jpg'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 120, 40)).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{image_format.lower()}')
+
+
+class ProfilePictureTestCase(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(
+            MEDIA_ROOT=media_root, BACKGROUND_TASKS_EAGER=True,
+            PROFILE_THUMBNAIL_SIZES={'small': 64, 'large': 512},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, file):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('profile-update'), {'profile_pic': file}, format='multipart')
+
+    def test_thumbnails_are_generated_after_upload(self):
+        response = self.upload(image_upload())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual(profile.thumbnails['source'], profile.profile_pic.name)
+        storage = profile.profile_pic.storage
+        for label, edge in (('small', 64), ('large', 512)):
+            with storage.open(profile.thumbnails['sizes'][label]) as thumb, Image.open(thumb) as image:
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(max(image.size), edge)
+
+        # A fresh user, as the authentication cache would hand out after eviction
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        thumbnails = self.client.get(reverse('user-profile')).data['profile_thumbnails']
+        self.assertEqual(set(thumbnails), {'small', 'large'})
+        self.assertTrue(thumbnails['small'].endswith('_64.webp'))
+
+    def test_replacing_the_picture_replaces_thumbnails(self):
+        self.upload(image_upload())
+        old = Profile.objects.get(user=self.user).thumbnails['sizes']['small']
+
+        self.upload(image_upload(size=(300, 300), image_format='PNG', name='photo.png'))
+        profile = Profile.objects.get(user=self.user)
+        storage = profile.profile_pic.storage
+        self.assertFalse(storage.exists(old))
+        self.assertTrue(storage.exists(profile.thumbnails['sizes']['small']))
+
+    def test_stale_thumbnails_are_hidden(self):
+        self.upload(image_upload())
+        Profile.objects.filter(user=self.user).update(profile_pic='profile_pics/other.jpg')
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.data['profile_thumbnails'], {})
+
+    @override_settings(PROFILE_PIC_MAX_UPLOAD_SIZE=1024)
+    def test_oversized_upload_is_rejected_while_streaming(self):
+        # Declared size is under the pre-check, the file itself is not
+        response = self.upload(image_upload(size=(800, 800), image_format='PNG', name='photo.png'))
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(Profile.objects.get(user=self.user).profile_pic)
+
+    @override_settings(PROFILE_PIC_MAX_UPLOAD_SIZE=1024)
+    def test_declared_size_is_checked_before_reading(self):
+        response = self.client.post(reverse('profile-update'), b'x' * 10, content_type='application/octet-stream',
+                                    CONTENT_LENGTH=str(1024 + images.MULTIPART_OVERHEAD + 1))
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_non_images_are_rejected(self):
+        fake = SimpleUploadedFile('photo.jpg', b'not an image at all', content_type='image/jpeg')
+        response = self.upload(fake)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Profile.objects.get(user=self.user).profile_pic)
+
+    def test_unsupported_formats_are_rejected(self):
+        response = self.upload(image_upload(size=(10, 10), image_format='BMP', name='photo.bmp'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('BMP', response.data['error'])
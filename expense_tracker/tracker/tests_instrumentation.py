@@ -0,0 +1,61 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.test import override_settings
+from .models import Expense, Category
+from . import instrumentation
+import datetime
+import json
+from django.utils import timezone
+
+class RequestMetricsTestCase(APITestCase):
+    def setUp(self):
+        instrumentation.reset()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        for day in range(3):
+            Expense.objects.create(user=self.user, category=self.food, amount=10,
+                                   date=timezone.now() - datetime.timedelta(days=day))
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('tracker.requests', 'INFO') as logs:
+            response = self.client.get(reverse('expense-list-create'))
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'ser', 'view', 'total'})
+        self.assertIn('desc="3 queries"', timing['db'])
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line['endpoint'], 'GET api/v1.0/expenses/')
+        self.assertEqual(line['queries'], 3)
+        self.assertEqual(line['user'], self.user.pk)
+        self.assertGreater(line['serializer_ms'], 0)
+
+    @override_settings(N_PLUS_ONE_THRESHOLD=3)
+    def test_repeated_sql_is_flagged(self):
+        # One rollup bucket per day, each updated with the same statement
+        payload = {'create': [
+            {'amount': '1.00', 'date': (timezone.now() - datetime.timedelta(days=day)).isoformat()}
+            for day in range(4)
+        ]}
+        with self.assertLogs('tracker.requests', 'WARNING') as logs:
+            self.client.post(reverse('expense-bulk'), payload, format='json')
+        event = json.loads(logs.records[0].getMessage())
+        self.assertEqual(event['event'], 'n_plus_one')
+        self.assertGreaterEqual(event['count'], 3)
+
+    def test_metrics_endpoint_is_admin_only(self):
+        for _ in range(2):
+            self.client.get(reverse('expense-list-create'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = User.objects.create_user(username='admin', password='testpassword123', is_staff=True)
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        endpoint = response.data['endpoints']['GET api/v1.0/expenses/']
+        self.assertEqual(endpoint['count'], 2)
+        self.assertEqual(endpoint['max_queries'], 3)
+        self.assertEqual(sum(endpoint['buckets'].values()), 2)
+        self.assertIn('hits', response.data['summary_cache'])
@@ -0,0 +1,94 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.utils import timezone
+from .models import Expense, Income, Category
+from decimal import Decimal
+import datetime
+
+
+class UnifiedLedgerTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.salary = Category.objects.create(name='Salary', type='income', user=self.user)
+
+        # 12 days, newest first: an income every third day, an expense every day
+        self.now = timezone.now().replace(microsecond=0)
+        for day in range(12):
+            when = self.now - datetime.timedelta(days=day)
+            Expense.objects.create(user=self.user, amount=10 + day, category=self.food if day % 2 else None,
+                                   description=f'lunch {day}', date=when)
+            if day % 3 == 0:
+                Income.objects.create(user=self.user, amount=100, category=self.salary, date=when)
+
+        other = User.objects.create_user(username='other', password='testpassword123')
+        Expense.objects.create(user=other, amount=999)
+
+    def walk(self, params=None):
+        """Follow ``next`` links and return every row."""
+        response = self.client.get(reverse('ledger'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data['results']
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            rows += response.data['results']
+        return rows
+
+    def expected(self, expenses, incomes):
+        """The ledger computed the slow way, newest first."""
+        rows = [('expense', e.pk, e.date, e.amount) for e in expenses]
+        rows += [('income', i.pk, i.date, i.amount) for i in incomes]
+        rows.sort(key=lambda row: (row[2], row[0], row[1]))
+        balance, result = Decimal('0'), []
+        for kind, pk, date, amount in rows:
+            balance += amount if kind == 'income' else -amount
+            result.append((kind, pk, f'{balance:.2f}'))
+        return result[::-1]
+
+    def test_rows_interleave_with_running_balance(self):
+        rows = self.walk({'page_size': 5})
+        self.assertEqual(
+            [(row['kind'], row['id'], row['balance']) for row in rows],
+            self.expected(Expense.objects.filter(user=self.user), Income.objects.filter(user=self.user)),
+        )
+        # Same timestamp: the income comes first
+        self.assertEqual([rows[0]['kind'], rows[1]['kind']], ['income', 'expense'])
+        self.assertEqual(rows[0]['category_name'], 'Salary')
+        self.assertEqual(rows[1]['category_name'], 'No Category')
+
+    def test_filters_apply_to_both_kinds(self):
+        start = timezone.localdate(self.now) - datetime.timedelta(days=5)
+        rows = self.walk({'date_min': start, 'page_size': 3})
+        expenses = Expense.objects.filter(user=self.user, date__date__gte=start)
+        incomes = Income.objects.filter(user=self.user, date__date__gte=start)
+        self.assertEqual([(row['kind'], row['id'], row['balance']) for row in rows],
+                         self.expected(expenses, incomes))
+
+        rows = self.walk({'category': self.food.pk})
+        self.assertEqual({row['kind'] for row in rows}, {'expense'})
+        self.assertEqual(len(rows), 6)
+
+        rows = self.walk({'kind': 'income'})
+        self.assertEqual(rows[0]['balance'], '400.00')
+
+    def test_search_balance_matches_rows(self):
+        rows = self.walk({'search': 'lunch', 'page_size': 4})
+        self.assertEqual([(row['kind'], row['id'], row['balance']) for row in rows],
+                         self.expected(Expense.objects.filter(user=self.user), []))
+
+    def test_one_query_per_page(self):
+        url = reverse('ledger')
+        self.client.get(url)  # Warm the version stamp
+        with self.assertNumQueries(2):  # Version stamp + the page
+            response = self.client.get(url, {'page_size': 4})
+        with self.assertNumQueries(2):
+            self.client.get(response.data['next'])
+
+    def test_invalid_parameters(self):
+        url = reverse('ledger')
+        self.assertEqual(self.client.get(url, {'kind': 'loan'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'date_min': 'soon'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, status.HTTP_404_NOT_FOUND)
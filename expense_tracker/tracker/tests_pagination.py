@@ -0,0 +1,69 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from .models import Expense, Category
+from .pagination import KeysetPagination
+import datetime
+from django.utils import timezone
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('expense-list-create')
+        self.category = Category.objects.create(name='Food', type='expense', user=self.user)
+
+        # Several rows share a timestamp so the id tie-breaker matters
+        now = timezone.now()
+        for i in range(25):
+            Expense.objects.create(user=self.user, category=self.category, amount=i + 1,
+                                   date=now - datetime.timedelta(hours=i // 3))
+
+    def test_default_mode_is_page_number(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+
+    def test_walks_every_row_once_despite_concurrent_inserts(self):
+        seen = []
+        url = f"{self.url}?pagination=cursor&page_size=7"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(row['id'] for row in response.data['results'])
+            # A new row arriving mid-walk must not shift the remaining pages
+            Expense.objects.create(user=self.user, category=self.category, amount=99)
+            url = response.data['next']
+
+        expected = list(Expense.objects.filter(amount__lt=99).order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_never_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f"{self.url}?pagination=cursor")
+        self.assertFalse(any('COUNT(' in query['sql'].upper() for query in queries))
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get(f"{self.url}?pagination=cursor&page_size=5").data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual([row['id'] for row in back['results']], [row['id'] for row in first['results']])
+
+    def test_page_size_is_capped(self):
+        Expense.objects.bulk_create(
+            Expense(user=self.user, category=self.category, amount=1)
+            for _ in range(KeysetPagination.max_page_size)
+        )
+        response = self.client.get(f"{self.url}?pagination=cursor&page_size=100000")
+        self.assertEqual(len(response.data['results']), KeysetPagination.max_page_size)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(f"{self.url}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # Well-formed JSON that is not a cursor object (here ``[1]``)
+        response = self.client.get(f"{self.url}?cursor=WzFd")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
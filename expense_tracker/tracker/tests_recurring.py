@@ -0,0 +1,102 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from .models import ArchivedExpense, Expense, Income, Category, RecurringRule
+from . import recurring, rollups
+from io import StringIO
+import datetime
+
+class RecurringRuleTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.rent = Category.objects.create(name='Rent', type='expense', user=self.user)
+
+    def rule(self, **kwargs):
+        values = dict(user=self.user, kind='expense', amount=100, category=self.rent,
+                      frequency='monthly', start_date=datetime.date(2024, 1, 31))
+        values.update(kwargs)
+        values.setdefault('next_run', values['start_date'])
+        return RecurringRule.objects.create(**values)
+
+    def test_monthly_schedule_keeps_day_of_month(self):
+        rule = self.rule()
+        occurrences, next_run = recurring.due_occurrences(rule, datetime.date(2024, 4, 29))
+        self.assertEqual(occurrences, [datetime.date(2024, 1, 31), datetime.date(2024, 2, 29),
+                                       datetime.date(2024, 3, 31)])
+        self.assertEqual(next_run, datetime.date(2024, 4, 30))
+
+    def test_materialize_is_idempotent(self):
+        rule = self.rule()
+        salary = self.rule(kind='income', category=None, frequency='weekly', interval=2,
+                           start_date=datetime.date(2024, 1, 1), end_date=datetime.date(2024, 1, 31))
+
+        report = recurring.materialize(datetime.date(2024, 3, 31), batch_size=1)
+        self.assertEqual(report['rows_created'], 3 + 3)
+        self.assertEqual(report['batches'], 2)
+        self.assertEqual(rollups.verify(), [])
+
+        salary.refresh_from_db()
+        self.assertIsNone(salary.next_run)  # Past its end date
+
+        # A second run, even one that starts from a stale next_run, adds nothing
+        RecurringRule.objects.filter(pk=rule.pk).update(next_run=rule.start_date)
+        self.assertEqual(recurring.materialize(datetime.date(2024, 3, 31))['rows_created'], 0)
+        self.assertEqual(Expense.objects.count(), 3)
+        self.assertEqual(Income.objects.count(), 3)
+        latest = Expense.objects.filter(recurring_rule=rule).latest('occurrence_date')
+        self.assertEqual(rollups.local_day(latest.date), datetime.date(2024, 3, 31))
+
+    def test_archived_occurrences_are_not_recreated(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        rule = self.rule()
+        recurring.materialize(datetime.date(2024, 3, 31))
+        call_command('archive_ledger', before_year=2025, settle_seconds=0, stdout=StringIO())
+        self.assertFalse(Expense.objects.exists())
+
+        RecurringRule.objects.filter(pk=rule.pk).update(next_run=rule.start_date)
+        self.assertEqual(recurring.materialize(datetime.date(2024, 4, 30))['rows_created'], 1)
+        self.assertEqual(Expense.objects.get().occurrence_date, datetime.date(2024, 4, 30))
+        self.assertEqual(ArchivedExpense.objects.count(), 3)
+
+    def test_schedule_edits_resume_without_backfilling(self):
+        today = timezone.localdate()
+        rule = self.rule(frequency='daily', start_date=today - datetime.timedelta(days=10))
+        recurring.materialize(today)
+        url = reverse('recurring-detail', kwargs={'pk': rule.pk})
+        data = self.client.get(url).data
+        self.assertEqual(data['next_run'], (today + datetime.timedelta(days=1)).isoformat())
+
+        # Resending the unchanged schedule leaves next_run alone
+        data.pop('next_run')
+        self.assertEqual(self.client.put(url, data, format='json').data['next_run'],
+                         (today + datetime.timedelta(days=1)).isoformat())
+
+        # A new schedule continues after today's occurrence instead of from start_date
+        response = self.client.patch(url, {'frequency': 'weekly'}, format='json')
+        self.assertEqual(response.data['next_run'], (rule.start_date + datetime.timedelta(weeks=2)).isoformat())
+        response = self.client.patch(url, {'start_date': today.isoformat()}, format='json')
+        self.assertEqual(response.data['next_run'], (today + datetime.timedelta(weeks=1)).isoformat())
+        self.assertEqual(recurring.materialize(today)['rows_created'], 0)
+
+    def test_paused_rules_are_skipped(self):
+        self.rule(active=False)
+        out = StringIO()
+        call_command('materialize_recurring', date='2024-03-31', stdout=out)
+        self.assertIn('Created 0 rows', out.getvalue())
+
+    def test_endpoint_schedules_rule(self):
+        url = reverse('recurring-list-create')
+        response = self.client.post(url, {'kind': 'expense', 'amount': '50.00', 'category': self.rent.id,
+                                          'frequency': 'weekly', 'start_date': '2024-05-01'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['next_run'], '2024-05-01')
+
+        response = self.client.post(url, {'kind': 'income', 'amount': '50.00', 'category': self.rent.id,
+                                          'start_date': '2024-05-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
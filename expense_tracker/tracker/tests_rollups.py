@@ -0,0 +1,59 @@
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from .models import Expense, Income, Category, DailyRollup
+from . import rollups
+import datetime
+from io import StringIO
+from django.utils import timezone
+
+class DailyRollupTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.rent = Category.objects.create(name='Rent', type='expense', user=self.user)
+        self.salary = Category.objects.create(name='Salary', type='income', user=self.user)
+        self.now = timezone.now()
+
+    def assertRollupConsistent(self):
+        self.assertEqual(rollups.verify(), [])
+
+    def test_create_update_delete_keep_rollup_in_sync(self):
+        expense = Expense.objects.create(user=self.user, category=self.food, amount=100, date=self.now)
+        Income.objects.create(user=self.user, category=self.salary, amount=500, date=self.now)
+        self.assertRollupConsistent()
+
+        # Move the expense to another day and category and change its amount
+        expense.date = self.now - datetime.timedelta(days=3)
+        expense.category = self.rent
+        expense.amount = 70
+        expense.save()
+        self.assertRollupConsistent()
+        self.assertFalse(DailyRollup.objects.filter(category=self.food).exists())
+
+        expense.delete()
+        self.assertRollupConsistent()
+        self.assertFalse(DailyRollup.objects.filter(kind='expense').exists())
+
+    def test_deleting_category_moves_totals_to_no_category(self):
+        Expense.objects.create(user=self.user, category=self.food, amount=100, date=self.now)
+        Expense.objects.create(user=self.user, amount=25, date=self.now)
+        self.food.delete()
+        self.assertRollupConsistent()
+        self.assertEqual(DailyRollup.objects.get(category=None).total, 125)
+
+    def test_rebuild_command_restores_rollup(self):
+        Expense.objects.create(user=self.user, category=self.food, amount=100, date=self.now)
+        DailyRollup.objects.all().update(total=1)
+        self.assertNotEqual(rollups.verify(), [])
+
+        call_command('rebuild_rollups', stdout=StringIO())
+        self.assertRollupConsistent()
+
+    def test_deleting_user_removes_derived_state(self):
+        Expense.objects.create(user=self.user, category=self.food, amount=100, date=self.now)
+        Income.objects.create(user=self.user, amount=50, date=self.now)
+        self.user.delete()
+        self.assertFalse(DailyRollup.objects.exists())
+        self.assertFalse(Category.objects.exists())
@@ -0,0 +1,83 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from .authentication import user_cache
+from .models import Expense
+from .routing import REPLICA, pin_key
+from .benchmarks import route_reads
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+
+@unittest.skipUnless(connections['default'].vendor == 'sqlite' and REPLICA not in connections,
+                     "Sets up its own SQLite replica file")
+class ReplicaRoutingTestCase(APITestCase):
+    """
+    A second SQLite file plays the replica. Nothing copies rows into it, so
+    whether a row shows up tells which database served the read.
+
+    The alias only exists while this class runs, so the rest of the suite
+    never sees a replica.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.mkdtemp()
+        primary = connections['default'].settings_dict
+        connections.settings[REPLICA] = {
+            **primary,
+            'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3'),
+            'TEST': {**primary['TEST'], 'MIRROR': None},
+        }
+        call_command('migrate', database=REPLICA, run_syncdb=True, verbosity=0)
+        cls.databases = {'default', REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.expense = Expense.objects.create(user=self.user, amount=25, description='primary only')
+
+    def test_list_reads_go_to_the_replica(self):
+        response = self.client.get(reverse('expense-list-create'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(self.client.get(reverse('summary')).data['total']['expense'], 0)
+
+    def test_writer_reads_primary_until_the_pin_expires(self):
+        response = self.client.post(reverse('expense-list-create'), {'amount': '5.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Expense.objects.using('default').filter(user=self.user).count(), 2)
+        self.assertFalse(Expense.objects.using(REPLICA).exists())
+
+        self.assertEqual(self.client.get(reverse('expense-list-create')).data['count'], 2)
+        cache.delete(pin_key(self.user.pk))
+        self.assertEqual(self.client.get(reverse('expense-list-create')).data['count'], 0)
+
+    def test_other_views_read_the_primary(self):
+        response = self.client.get(reverse('expense-detail', kwargs={'pk': self.expense.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['description'], 'primary only')
+
+    def test_async_views_read_the_replica(self):
+        route_reads(True)
+        self.addCleanup(route_reads, False)
+        response = self.client.get(reverse('expense-list-create'))
+        self.assertEqual(json.loads(response.content)['count'], 0)
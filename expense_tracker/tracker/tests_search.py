@@ -0,0 +1,83 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.db.utils import ConnectionHandler
+from unittest import mock
+from .models import Expense, Income, Category
+from . import archive, search
+
+class SearchTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.other = User.objects.create_user(username='other', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('expense-list-create')
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+
+        self.lunch = Expense.objects.create(user=self.user, category=self.food, amount=10,
+                                            description='Lunch at the office canteen')
+        self.double = Expense.objects.create(user=self.user, amount=20,
+                                             description='Lunch, lunch and more lunch')
+        Expense.objects.create(user=self.user, amount=30, description='Taxi home')
+        Expense.objects.create(user=self.user, amount=40)
+        Expense.objects.create(user=self.other, amount=50, description='Lunch with friends')
+
+    def ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['id'] for item in response.data['results']]
+
+    def test_search_ranks_user_rows(self):
+        self.assertEqual(search.search_backend(), 'fts5')
+        self.assertEqual(self.ids({'search': 'lunch'}), [self.double.id, self.lunch.id])
+        # Every word must match, and words match as prefixes
+        self.assertEqual(self.ids({'search': 'lun cant'}), [self.lunch.id])
+
+    def test_search_combines_with_filters(self):
+        self.assertEqual(self.ids({'search': 'lunch', 'category': self.food.id}), [self.lunch.id])
+        self.assertEqual(self.ids({'search': 'lunch', 'date_max': '2000-01-01'}), [])
+
+    def test_index_follows_writes(self):
+        self.lunch.description = 'Dinner'
+        self.lunch.save()
+        self.double.delete()
+        Expense.objects.bulk_create([Expense(user=self.user, amount=5, description='Late lunch')])
+        self.assertEqual(len(self.ids({'search': 'lunch'})), 1)
+        self.assertEqual(len(self.ids({'search': 'dinner'})), 1)
+
+    def test_query_syntax_is_ignored(self):
+        self.assertEqual(len(self.ids({'search': '"lunch*) ^('})), 2)
+        self.assertEqual(len(self.ids({'search': '!!!'})), 4)  # No words: no filtering
+
+    def test_icontains_fallback(self):
+        with mock.patch.dict(search._backends, {'default': 'icontains'}):
+            self.assertEqual(len(self.ids({'search': 'taxi'})), 1)
+
+    def test_income_search(self):
+        Income.objects.create(user=self.user, amount=100, description='June salary')
+        response = self.client.get(reverse('income-list-create'), {'search': 'salary'})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_export_accepts_search(self):
+        response = self.client.get(reverse('ledger-export', args=['ndjson']), {'kind': 'expense', 'search': 'taxi'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1)
+
+    def test_search_works_as_a_subquery(self):
+        # Relabelled table aliases must not break the MATCH or the rank
+        matches = search.search(Expense.objects.filter(user=self.user), 'lunch', user_id=self.user.pk)
+        ranked = Expense.objects.filter(pk__in=matches.values('pk'))
+        self.assertEqual(set(ranked.values_list('id', flat=True)), {self.lunch.id, self.double.id})
+        self.assertEqual(list(matches.order_by('-search_rank').values_list('id', flat=True)),
+                         [self.double.id, self.lunch.id])
+
+    def test_install_skips_missing_ledger_tables(self):
+        # post_migrate also runs when the tracker tables were never created
+        bare = ConnectionHandler({'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}})
+        self.addCleanup(bare.close_all)
+        with mock.patch.object(search, 'connections', bare), mock.patch.object(archive, 'connections', bare):
+            search.install_search_indexes()
+            archive.install_history_views()
+        with bare['default'].cursor() as cursor:
+            self.assertEqual(bare['default'].introspection.table_names(cursor, include_views=True), [])
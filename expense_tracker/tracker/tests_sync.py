@@ -0,0 +1,87 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.test import override_settings
+from .models import Expense, Income, Category
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class DeltaSyncTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('sync')
+        self.food = Category.objects.create(name='Food', type='expense', user=self.user)
+        self.expenses = [
+            Expense.objects.create(user=self.user, category=self.food, amount=i + 1) for i in range(5)
+        ]
+
+    def sync(self, token=None, limit=None):
+        params = {}
+        if token:
+            params['since'] = token
+        if limit:
+            params['limit'] = limit
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_initial_sync_returns_everything(self):
+        data = self.sync()
+        self.assertEqual(len(data['expenses']), 5)
+        self.assertEqual(len(data['categories']), 1)
+        self.assertFalse(data['has_more'])
+
+    def test_warm_sync_only_returns_changes(self):
+        token = self.sync()['next']
+        self.expenses[0].amount = 99
+        self.expenses[0].save()
+        Income.objects.create(user=self.user, amount=10)
+        deleted_id = self.expenses[1].id
+        self.expenses[1].delete()
+
+        data = self.sync(token)
+        self.assertEqual([row['id'] for row in data['expenses']], [self.expenses[0].id])
+        self.assertEqual(len(data['incomes']), 1)
+        self.assertEqual(data['deleted'], [{'kind': 'expense', 'id': deleted_id, 'deleted_at': data['deleted'][0]['deleted_at']}])
+
+        # Nothing new since the latest token
+        data = self.sync(data['next'])
+        self.assertEqual((data['expenses'], data['incomes'], data['deleted']), ([], [], []))
+
+    def test_batches_continue_with_token(self):
+        seen = []
+        data = self.sync(limit=2)
+        seen += [row['id'] for row in data['expenses']]
+        while data['has_more']:
+            data = self.sync(data['next'], limit=2)
+            seen += [row['id'] for row in data['expenses']]
+        self.assertEqual(sorted(seen), sorted(expense.id for expense in self.expenses))
+
+    def test_warm_sync_cost_does_not_depend_on_account_size(self):
+        token = self.sync()['next']
+        Expense.objects.bulk_create(Expense(user=self.user, amount=1) for _ in range(300))
+        token = self.sync(token, limit=1000)['next']
+        # One keyset query per stream
+        with self.assertNumQueries(4):
+            self.sync(token)
+
+    def test_category_delete_reports_tombstone_and_touches_rows(self):
+        token = self.sync()['next']
+        category_id = self.food.id
+        self.food.delete()
+        data = self.sync(token)
+        self.assertEqual([(row['kind'], row['id']) for row in data['deleted']], [('category', category_id)])
+        self.assertEqual(len(data['expenses']), 5)
+        self.assertTrue(all(row['category'] is None for row in data['expenses']))
+
+    def test_bulk_delete_leaves_tombstones(self):
+        token = self.sync()['next']
+        ids = [expense.id for expense in self.expenses[:2]]
+        self.client.post(reverse('expense-bulk'), {'delete': ids}, format='json')
+        data = self.sync(token)
+        self.assertEqual(sorted(row['id'] for row in data['deleted']), sorted(ids))
+
+    def test_invalid_token(self):
+        response = self.client.get(self.url, {'since': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -2,15 +2,20 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     SignupAPIView,
-    ExpenseListCreateView, ExpenseDetailView,
-    IncomeListCreateView, IncomeDetailView,
-    CategoryListCreateView, CategoryDetailView,
-    SummaryView, CategorySummaryView,
+    ExpenseListCreateView, ExpenseDetailView, ExpenseBulkView, ExpenseRecategorizeView,
+    IncomeListCreateView, IncomeDetailView, IncomeBulkView, IncomeRecategorizeView,
+    CategoryListCreateView, CategoryDetailView, CategoryMergeView, CategoryDedupeView,
+    BudgetListCreateView, BudgetDetailView,
+    RecurringRuleListCreateView, RecurringRuleDetailView,
+    SummaryView, CategorySummaryView, TimeSeriesView,
+    LedgerView, LedgerExportView, LedgerImportView, SyncView, MetricsView,
     home, UserProfileView, ProfileUpdateView
 )
+from .async_views import read_view
 
 
 #Write your urls here
+# read_view(): served by an async counterpart for GETs when ASYNC_VIEWS is on
 urlpatterns = [
     path("", home),
 
@@ -23,20 +28,50 @@ urlpatterns = [
 
 
     #Expense Endpoints
-    path('expenses/', ExpenseListCreateView.as_view(), name='expense-list-create'),
+    path('expenses/', read_view(ExpenseListCreateView), name='expense-list-create'),
     path('expenses/<int:pk>/', ExpenseDetailView.as_view(), name='expense-detail'),
+    path('expenses/bulk/', ExpenseBulkView.as_view(), name='expense-bulk'),
+    path('expenses/recategorize/', ExpenseRecategorizeView.as_view(), name='expense-recategorize'),
 
     #Income Endpoints
-    path('incomes/', IncomeListCreateView.as_view(), name='income-list-create'),
+    path('incomes/', read_view(IncomeListCreateView), name='income-list-create'),
     path('incomes/<int:pk>/', IncomeDetailView.as_view(), name='income-detail'),
+    path('incomes/bulk/', IncomeBulkView.as_view(), name='income-bulk'),
+    path('incomes/recategorize/', IncomeRecategorizeView.as_view(), name='income-recategorize'),
 
     #Category Endpoints
     path('categories/', CategoryListCreateView.as_view(), name='category-list-create'),
     path('categories/<int:pk>/', CategoryDetailView.as_view(), name='category-detail'), 
+    path('categories/merge/', CategoryMergeView.as_view(), name='category-merge'),
+    path('categories/dedupe/', CategoryDedupeView.as_view(), name='category-dedupe'),
+
+    #Budget Endpoints
+    path('budgets/', BudgetListCreateView.as_view(), name='budget-list-create'),
+    path('budgets/<int:pk>/', BudgetDetailView.as_view(), name='budget-detail'),
+
+    #Recurring Transaction Endpoints
+    path('recurring/', RecurringRuleListCreateView.as_view(), name='recurring-list-create'),
+    path('recurring/<int:pk>/', RecurringRuleDetailView.as_view(), name='recurring-detail'),
+
+    #Unified Ledger Endpoint (expenses and incomes together)
+    path('ledger/', LedgerView.as_view(), name='ledger'),
+
+    #Delta Sync Endpoint
+    path('sync/', SyncView.as_view(), name='sync'),
+
+    #Export & Import Endpoints
+    path('export/<str:export_format>/', LedgerExportView.as_view(), name='ledger-export'),
+    path('import/', LedgerImportView.as_view(), name='ledger-import'),
 
     #Summary Endpoint
-    path('summary/', SummaryView.as_view(), name='summary'),
+    path('summary/', read_view(SummaryView), name='summary'),
 
     #Summary by category Endpoint
-    path('category/summary/', CategorySummaryView.as_view(), name='category-summary'),
-]
\ No newline at end of file
+    path('category/summary/', read_view(CategorySummaryView), name='category-summary'),
+
+    #Time series Endpoint (charts)
+    path('summary/timeseries/', TimeSeriesView.as_view(), name='summary-timeseries'),
+
+    #Request metrics Endpoint (admins only)
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
@@ -0,0 +1,135 @@
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from . import summary_cache
+from .models import LedgerVersion
+from .summary import local_midnight
+
+
+# ============================
+# VERSION STAMPS
+# ============================
+def touch(user_id):
+    """Bump one user's ledger version inside the current transaction."""
+    changes = dict(version=F('version') + 1, modified_at=timezone.now())
+    if LedgerVersion.objects.filter(user_id=user_id).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            LedgerVersion.objects.create(user_id=user_id, version=1)
+    except IntegrityError:
+        # Another writer created the row first
+        LedgerVersion.objects.filter(user_id=user_id).update(**changes)
+
+
+def ledger_changed(user_ids=None):
+    """
+    Record that the ledger of ``user_ids`` (everyone when None) changed.
+
+    Bumps the version stamps used for conditional GETs and invalidates the
+    cached summaries. Every write path, signal-driven or bulk, ends here.
+    """
+    if user_ids is None:
+        LedgerVersion.objects.update(version=F('version') + 1, modified_at=timezone.now())
+        summary_cache.invalidate()
+        return
+    for user_id in set(user_ids):
+        touch(user_id)
+        summary_cache.invalidate(user_id)
+
+
+def current(user):
+    """Return ``(version, modified_at)`` for a user with a single query."""
+    stamp = LedgerVersion.objects.filter(user=user).values_list('version', 'modified_at').first()
+    return stamp or (0, user.date_joined)
+
+
+async def acurrent(user):
+    """Async ``current()``."""
+    stamp = await LedgerVersion.objects.filter(user=user).values_list('version', 'modified_at').afirst()
+    return stamp or (0, user.date_joined)
+
+
+# ============================
+# CONDITIONAL REQUESTS
+# ============================
+def etag_for(*parts):
+    """Build a strong ETag from everything the representation depends on."""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def conditional_validators(request, name, stamp, daily=False, media_type=None):
+    """
+    Return ``(etag, last_modified)`` for view ``name`` answering ``request``.
+
+    ``stamp`` is the user's ``(version, modified_at)``. Sync and async views
+    serving the same endpoint pass the same ``name``, so their validators are
+    interchangeable.
+    """
+    version, modified_at = stamp
+    parts = [name, request.user.pk, version, request.build_absolute_uri(), media_type]
+    if daily:
+        today = timezone.localdate()
+        parts.append(today.isoformat())
+        modified_at = max(modified_at, local_midnight(today))
+    return etag_for(*parts), int(modified_at.timestamp())
+
+
+def add_validator_headers(response, validators):
+    etag, last_modified = validators
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Per-user data: browsers may keep it but must revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+
+
+class NotModified(Exception):
+    """Raised from ``initial()`` to skip the handler; carries the 304/412 response."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    Adds strong ``ETag`` and ``Last-Modified`` headers to GET responses and
+    answers ``If-None-Match`` / ``If-Modified-Since`` with 304 right after
+    authentication, before any list or aggregate query runs.
+
+    Set ``conditional_daily = True`` when the representation also depends on
+    the local date (e.g. summaries with a "today" bucket).
+    """
+    conditional_daily = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        self.conditional_validators = conditional_validators(
+            request, type(self).__name__, current(request.user),
+            daily=self.conditional_daily, media_type=request.accepted_media_type,
+        )
+        etag, last_modified = self.conditional_validators
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'conditional_validators', None)
+        if validators and response.status_code in (200, 304):
+            add_validator_headers(response, validators)
+        return response
@@ -1,24 +1,45 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models import Sum
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
-from django.http import HttpResponse
-from datetime import timedelta
-from django_filters.rest_framework import DjangoFilterBackend
+from django.template.defaultfilters import filesizeformat
+from django.core.exceptions import ValidationError as DjangoValidationError
 
 from .serializers import (
     ExpenseSerializer, 
     CategorySerializer, 
     IncomeSerializer, 
     RegisterSerializer,
-    UserSerializer
+    UserSerializer,
+    BudgetSerializer,
+    RecurringRuleSerializer,
+    TimeSeriesQuerySerializer,
+    LedgerEntrySerializer,
+    CategoryMergeSerializer,
+    RecategorizeSerializer
 )
-from .models import Income, Expense, Profile
-from .filters import ExpenseFilter, IncomeFilter
+from .models import Budget, Income, Expense, Category, Profile, RecurringRule
+from .filters import ExpenseFilter, IncomeFilter, LedgerFilterBackend
+from .bulk import LedgerBatch
+from .export import ENCODERS, EXPORT_FORMATS, EXPORT_SOURCES, export_querysets, export_rows
+from .importer import LedgerImporter, open_text
+from .ledger import UnifiedLedger, UnifiedLedgerPagination
+from .pagination import LedgerPagination
+from .archive import ArchivedReadOnlyMixin
+from .routing import ReplicaReadMixin
+from .summary import parse_periods, summarize_categories, summarize_totals, timeseries
+from .summary_cache import cached_summary, category_summary_name
+from .sync import DEFAULT_SYNC_LIMIT, DeltaSync
+from .versioning import ConditionalGetMixin
+from . import archive, background, categories, images, instrumentation, summary_cache
+
+logger = logging.getLogger(__name__)
 
 
 # ==========================================================
@@ -65,37 +86,60 @@ class UserProfileView(APIView):
 
 
 class ProfileUpdateView(APIView):
+    """
+    Store a new profile picture.
+
+    The upload is size-capped while it streams in and its header is checked
+    with Pillow; resizing to thumbnails happens in a background task after
+    the response, so request time does not grow with the photo's size.
+    """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
+        if images.content_too_large(request):
+            # Refuse before reading the body at all
+            return self.too_large()
+        size_cap = images.SizeCapUploadHandler(images.max_upload_size(), request)
+        request.upload_handlers.insert(0, size_cap)
+
         try:
             # Use get_or_create to ensure the profile exists for the user
             profile, created = Profile.objects.get_or_create(user=request.user)
             
             if 'profile_pic' in request.FILES:
                 file = request.FILES['profile_pic']
-                print(f"Received file: {file.name}, size: {file.size}, content_type: {file.content_type}")
-                
+                logger.info("Received profile picture %s (%s bytes, %s)", file.name, file.size, file.content_type)
+                try:
+                    images.validate_image(file)
+                except ValueError as e:
+                    return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
                 profile.profile_pic = file
                 profile.save()
+                background.submit(images.generate_thumbnails, profile.pk, profile.profile_pic.name)
                 
                 # Build the full URL for the profile picture
                 pic_url = request.build_absolute_uri(profile.profile_pic.url) if profile.profile_pic else None
-                print(f"Saved successfully. URL: {pic_url}")
+                logger.info("Saved profile picture for user %s: %s", request.user.pk, pic_url)
                 return Response({'profile_pic': pic_url}, status=status.HTTP_200_OK)
+            if size_cap.exceeded:
+                return self.too_large()
             return Response({'error': 'No image provided'}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            import traceback
-            print(f"Error in ProfileUpdateView: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Profile update failed for user %s", request.user.pk)
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def too_large(self):
+        limit = filesizeformat(images.max_upload_size())
+        return Response({'error': f'Image is larger than {limit}'},
+                        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
 
 # ==========================================================
 # 💸 EXPENSE VIEWS
 # ==========================================================
 
-class ExpenseListCreateView(ListCreateAPIView):
+class ExpenseListCreateView(ReplicaReadMixin, ConditionalGetMixin, ListCreateAPIView):
     """
     Allows users to:
     - List all their expenses
@@ -103,19 +147,23 @@ class ExpenseListCreateView(ListCreateAPIView):
     """
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [LedgerFilterBackend]
     filterset_class = ExpenseFilter
+    pagination_class = LedgerPagination  # ?pagination=cursor for keyset pages
 
     def perform_create(self, serializer):
         # Automatically link expense to the logged-in user
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
-        # Return only the authenticated user's expenses
-        return Expense.objects.filter(user=self.request.user)
+        # Return only the authenticated user's expenses, joining the category
+        # so category_name never costs an extra query per row. Archived years
+        # are only read when the date range reaches them
+        model = archive.source(Expense, self.request.query_params)
+        return model.objects.filter(user=self.request.user).select_related('category')
 
 
-class ExpenseDetailView(RetrieveUpdateDestroyAPIView):
+class ExpenseDetailView(ArchivedReadOnlyMixin, RetrieveUpdateDestroyAPIView):
     """
     Allows users to:
     - Retrieve details of a single expense
@@ -125,15 +173,42 @@ class ExpenseDetailView(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        # Restrict access to user's own expenses
-        return Expense.objects.filter(user=self.request.user)
+        # Restrict access to user's own expenses; archived ones are read-only
+        return self.readable(Expense).objects.filter(user=self.request.user).select_related('category')
+
+
+class ExpenseBulkView(APIView):
+    """
+    Batch create, update and delete expenses in one request.
+    Useful for syncing entries recorded offline.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        results, status_code = LedgerBatch(Expense, ExpenseSerializer, request).run(request.data)
+        return Response(results, status=status_code)
+
+
+class ExpenseRecategorizeView(APIView):
+    """
+    Move every expense matching the list filters in the query string
+    (``category``, ``date_min``, ``search``...) to the body's ``category``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = RecategorizeSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        updated = categories.recategorize(
+            request.user, 'expense', request.query_params, serializer.validated_data['category'], request)
+        return Response({'updated': updated})
 
 
 # ==========================================================
 # 💰 INCOME VIEWS
 # ==========================================================
 
-class IncomeListCreateView(ListCreateAPIView):
+class IncomeListCreateView(ReplicaReadMixin, ConditionalGetMixin, ListCreateAPIView):
     """
     Allows users to:
     - List all their income records
@@ -141,17 +216,19 @@ class IncomeListCreateView(ListCreateAPIView):
     """
     serializer_class = IncomeSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [LedgerFilterBackend]
     filterset_class = IncomeFilter
+    pagination_class = LedgerPagination  # ?pagination=cursor for keyset pages
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
     def get_queryset(self):
-        return Income.objects.filter(user=self.request.user)
+        model = archive.source(Income, self.request.query_params)
+        return model.objects.filter(user=self.request.user).select_related('category')
 
 
-class IncomeDetailView(RetrieveUpdateDestroyAPIView):
+class IncomeDetailView(ArchivedReadOnlyMixin, RetrieveUpdateDestroyAPIView):
     """
     Allows users to:
     - Retrieve, update, or delete a specific income record
@@ -160,14 +237,40 @@ class IncomeDetailView(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Income.objects.filter(user=self.request.user)
+        return self.readable(Income).objects.filter(user=self.request.user).select_related('category')
+
+
+class IncomeBulkView(APIView):
+    """
+    Batch create, update and delete income records in one request.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        results, status_code = LedgerBatch(Income, IncomeSerializer, request).run(request.data)
+        return Response(results, status=status_code)
+
+
+class IncomeRecategorizeView(APIView):
+    """
+    Move every income record matching the list filters in the query string
+    to the body's ``category``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = RecategorizeSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        updated = categories.recategorize(
+            request.user, 'income', request.query_params, serializer.validated_data['category'], request)
+        return Response({'updated': updated})
 
 
 # ==========================================================
 # 🏷️ CATEGORY VIEWS
 # ==========================================================
 
-class CategoryListCreateView(ListCreateAPIView):
+class CategoryListCreateView(ReplicaReadMixin, ConditionalGetMixin, ListCreateAPIView):
     """
     Allows users to:
     - List all their categories
@@ -195,101 +298,280 @@ class CategoryDetailView(RetrieveUpdateDestroyAPIView):
         return Category.objects.filter(user=self.request.user)
 
 
+class CategoryMergeView(APIView):
+    """
+    Merge duplicate categories into one: every expense, income, recurring
+    rule and budget of the ``sources`` moves to ``target``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CategoryMergeSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        report = categories.merge_categories(request.user, **serializer.validated_data)
+        return Response(report)
+
+
+class CategoryDedupeView(APIView):
+    """
+    Merge every set of categories whose names differ only in case
+    (e.g. "Food" and "food") into the oldest of them.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({'merged': categories.dedupe_categories(request.user)})
+
+
 # ==========================================================
-# 📊 SUMMARY & REPORT VIEWS
+# 🎯 BUDGET VIEWS
 # ==========================================================
 
-class SummaryView(APIView):
+class BudgetListCreateView(ReplicaReadMixin, ListCreateAPIView):
     """
-    Returns a summary of a user's financial overview:
-    - Total income
-    - Total expense
-    - Net balance
+    Allows users to:
+    - List their budgets with spend-to-date and status (ok/warning/exceeded)
+    - Create a budget for an expense category
+    """
+    serializer_class = BudgetSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def get_queryset(self):
+        return Budget.objects.filter(user=self.request.user).select_related('category').order_by('id')
+
+
+class BudgetDetailView(RetrieveUpdateDestroyAPIView):
+    """
+    Allows users to:
+    - Retrieve, update, or delete a specific budget
+    """
+    serializer_class = BudgetSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return Budget.objects.filter(user=self.request.user).select_related('category')
+
+
+# ==========================================================
+# 🔁 RECURRING VIEWS
+# ==========================================================
+
+class RecurringRuleListCreateView(ListCreateAPIView):
+    """
+    Allows users to:
+    - List their recurring expenses and incomes
+    - Create a rule; due rows are generated by `manage.py materialize_recurring`
+    """
+    serializer_class = RecurringRuleSerializer
+    permission_classes = [IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def get_queryset(self):
+        return RecurringRule.objects.filter(user=self.request.user).order_by('id')
+
+
+class RecurringRuleDetailView(RetrieveUpdateDestroyAPIView):
+    """
+    Allows users to:
+    - Retrieve, update, pause (active=false) or delete a recurring rule
+    """
+    serializer_class = RecurringRuleSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return RecurringRule.objects.filter(user=self.request.user)
+
+
+# ==========================================================
+# 📒 UNIFIED LEDGER VIEWS
+# ==========================================================
+
+class LedgerView(ReplicaReadMixin, ConditionalGetMixin, APIView):
+    """
+    Expenses and incomes interleaved by date, newest first, each row with
+    its kind and the running balance after it. Accepts the same filters as
+    the list endpoints plus ?kind=expense|income; pages are keyset-only
+    (follow ``next``).
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        today = timezone.localdate()
+        kind = request.query_params.get('kind', 'all')
+        if kind != 'all' and kind not in EXPORT_SOURCES:
+            return Response({'kind': "Must be 'expense', 'income' or 'all'."}, status=status.HTTP_400_BAD_REQUEST)
+        kinds = list(EXPORT_SOURCES) if kind == 'all' else [kind]
 
-        def get_totals(start_date=None, end_date=None):
-            expenses = Expense.objects.filter(user=user)
-            incomes = Income.objects.filter(user=user)
+        ledger = UnifiedLedger(request.user, kinds, request.query_params, request=request)
+        paginator = UnifiedLedgerPagination()
+        rows = paginator.paginate_ledger(ledger, request)
+        return paginator.get_paginated_response(LedgerEntrySerializer(rows, many=True).data)
 
-            if start_date:
-                expenses = expenses.filter(date__date__gte=start_date)
-                incomes = incomes.filter(date__date__gte=start_date)
-            
-            if end_date:
-                expenses = expenses.filter(date__date__lte=end_date)
-                incomes = incomes.filter(date__date__lte=end_date)
 
-            total_expense = expenses.aggregate(total=Sum('amount'))['total'] or 0
-            total_income = incomes.aggregate(total=Sum('amount'))['total'] or 0
-            
-            return {
-                "income": total_income,
-                "expense": total_expense,
-                "balance": total_income - total_expense
-            }
+# ==========================================================
+# 🔄 SYNC VIEWS
+# ==========================================================
 
-        # Calculate dates
-        start_week = today - timedelta(days=today.weekday()) # Monday of this week
-        start_month = today.replace(day=1)
-        start_year = today.replace(month=1, day=1)
+class SyncView(APIView):
+    """
+    Delta sync for offline clients.
+    Returns categories, expenses and incomes changed since ?since=<token>,
+    plus ids of deleted rows, in batches of at most ?limit= per kind.
+    Call again with the returned ``next`` token while ``has_more`` is true.
+    """
+    permission_classes = [IsAuthenticated]
 
-        return Response({
-            "today": get_totals(start_date=today, end_date=today),
-            "week": get_totals(start_date=start_week),
-            "month": get_totals(start_date=start_month),
-            "year": get_totals(start_date=start_year),
-            "total": get_totals() # All time
-        })
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_SYNC_LIMIT))
+        except ValueError:
+            return Response({'limit': 'Must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        sync = DeltaSync(request.user, request.query_params.get('since'), limit, {'request': request})
+        return Response(sync.run())
 
 
-class CategorySummaryView(APIView):
+# ==========================================================
+# 📤 EXPORT & IMPORT VIEWS
+# ==========================================================
+
+class LedgerExportView(APIView):
+    """
+    Streams the user's full ledger (expenses and incomes with category names)
+    as CSV or NDJSON. Accepts the same filters as the list endpoints plus
+    ?kind=expense|income.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body is not rendered by DRF, so never answer 406 to Accept: text/csv
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, export_format):
+        if export_format not in EXPORT_FORMATS:
+            return Response({'error': f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        kind = request.query_params.get('kind', 'all')
+        if kind != 'all' and kind not in EXPORT_SOURCES:
+            return Response({'kind': "Must be 'expense', 'income' or 'all'."}, status=status.HTTP_400_BAD_REQUEST)
+        kinds = list(EXPORT_SOURCES) if kind == 'all' else [kind]
+
+        querysets, errors = export_querysets(request.user, kinds, request.query_params)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            ENCODERS[export_format](export_rows(querysets)),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        filename = f"ledger-{timezone.localdate():%Y%m%d}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class LedgerImportView(APIView):
+    """
+    Imports historical transactions from an uploaded CSV file (field ``file``).
+    The file is parsed incrementally and written in fixed-size chunks.
+    Optional ?kind=expense|income sets the kind for rows without a kind column.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        importer = LedgerImporter(request.user, default_kind=request.query_params.get('kind'))
+        try:
+            report = importer.run(open_text(upload.file))
+        except (DjangoValidationError, UnicodeDecodeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_201_CREATED if report['rows_imported'] else status.HTTP_200_OK)
+
+
+# ==========================================================
+# 📊 SUMMARY & REPORT VIEWS
+# ==========================================================
+
+class SummaryView(ReplicaReadMixin, ConditionalGetMixin, APIView):
+    """
+    Returns a summary of a user's financial overview:
+    - Total income
+    - Total expense
+    - Net balance
+    """
+    permission_classes = [IsAuthenticated]
+    conditional_daily = True  # "today"/"week" buckets roll over at midnight
+
+    def get(self, request):
+        # All periods come from a single query against the daily rollup,
+        # cached until the user's next write
+        return Response(cached_summary('totals', request.user, summarize_totals))
+
+
+class CategorySummaryView(ReplicaReadMixin, ConditionalGetMixin, APIView):
     """
     Returns a breakdown of total income and expenses by category.
     Useful for visualizing spending patterns.
+    Pass ?periods=today,month to compute only some of the buckets.
     """
     permission_classes = [IsAuthenticated]
+    conditional_daily = True
 
     def get(self, request):
-        user = request.user
-        today = timezone.localdate()
+        try:
+            periods = parse_periods(request.query_params.get('periods'))
+        except ValueError as e:
+            return Response({'periods': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        def get_category_totals(start_date=None, end_date=None):
-            expenses = Expense.objects.filter(user=user)
-            incomes = Income.objects.filter(user=user)
+        name = category_summary_name(periods)
+        return Response(cached_summary(name, request.user, lambda user: summarize_categories(user, periods)))
 
-            if start_date:
-                expenses = expenses.filter(date__date__gte=start_date)
-                incomes = incomes.filter(date__date__gte=start_date)
-            
-            if end_date:
-                expenses = expenses.filter(date__date__lte=end_date)
-                incomes = incomes.filter(date__date__lte=end_date)
 
-            expense_summary = expenses.values('category__name').annotate(total=Sum('amount'))
-            income_summary = incomes.values('category__name').annotate(total=Sum('amount'))
-            
-            return {
-                "incomes": income_summary,
-                "expenses": expense_summary
-            }
+class TimeSeriesView(ReplicaReadMixin, ConditionalGetMixin, APIView):
+    """
+    Returns income and expense totals bucketed by day, week, month or year
+    for charts. Query params: interval, start, end (local dates) and
+    by_category=true to split every bucket by category.
+    """
+    permission_classes = [IsAuthenticated]
+    conditional_daily = True  # The default range ends today
 
-        # Calculate dates
-        start_week = today - timedelta(days=today.weekday())
-        start_month = today.replace(day=1)
-        start_year = today.replace(month=1, day=1)
+    def get(self, request):
+        query = TimeSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
 
+        buckets = timeseries(request.user, params['interval'], params['start'], params['end'],
+                             by_category=params['by_category'])
         return Response({
-            "today": get_category_totals(start_date=today, end_date=today),
-            "week": get_category_totals(start_date=start_week),
-            "month": get_category_totals(start_date=start_month),
-            "year": get_category_totals(start_date=start_year),
-            "total": get_category_totals()
+            "interval": params['interval'],
+            "start": params['start'],
+            "end": params['end'],
+            "buckets": buckets,
         })
 
 
+# ==========================================================
+# 📈 METRICS VIEWS
+# ==========================================================
+
+class MetricsView(APIView):
+    """
+    Admin-only view of this process's request metrics: per-endpoint counts,
+    latency histograms, DB/serializer time and N+1 hits, plus the summary
+    cache hit rate. Counters reset when the process restarts.
+    """
+    permission_classes = [IsAdminUser]
 
+    def get(self, request):
+        return Response({
+            'endpoints': instrumentation.snapshot(),
+            'summary_cache': summary_cache.stats(),
+        })